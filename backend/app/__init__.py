@@ -1,13 +1,25 @@
-from flask import Flask
-from flask_cors import CORS
+from config import Config
 
 def create_app():
+    # Imported here so scripts that only need app.database never load Flask
+    from flask import Flask
+    from flask_cors import CORS
+    
     app = Flask(__name__)
     app.config['SECRET_KEY'] = 'dev-secret-key-change-in-production'
     
     # Enable CORS for React frontend
     CORS(app)
     
+    # Return pooled database connections at the end of each request
+    from app import database
+    database.init_app(app)
+    
+    # Time every request and its SQL statements
+    from app import metrics
+    if Config.METRICS_ENABLED:
+        metrics.init_app(app)
+    
     # Register blueprints
     from app.routes.auth_routes import auth_bp
     from app.routes.feedback_routes import feedback_bp
@@ -0,0 +1,100 @@
+import contextvars
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from config import Config
+
+# Blocking work is split by kind so a burst of one cannot starve the other:
+# SQLite calls get as many threads as the pool has connections, CPU-bound
+# scoring (TextBlob) gets its own small pool. bcrypt already has one.
+_executors = {}
+_executors_lock = threading.Lock()
+
+def get_executor(kind: str) -> ThreadPoolExecutor:
+    """
+    Return the shared executor for 'db' or 'cpu' work, creating it on first use.
+    
+    Args:
+        kind: 'db' or 'cpu'
+    
+    Returns:
+        The executor
+    """
+    executor = _executors.get(kind)
+    if executor is None:
+        with _executors_lock:
+            executor = _executors.get(kind)
+            if executor is None:
+                workers = Config.DB_POOL_SIZE if kind == 'db' else Config.ASYNC_CPU_WORKERS
+                executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix=f'async-{kind}')
+                _executors[kind] = executor
+    return executor
+
+def _submit(kind: str, function, *args, **kwargs):
+    # asyncio is imported here: the sync (Flask) server imports this module
+    # through the services but never awaits, and should not load it
+    import asyncio
+    
+    # Run in a copy of the caller's context so per-request metrics follow the call
+    loop = asyncio.get_running_loop()
+    context = contextvars.copy_context()
+    return loop.run_in_executor(get_executor(kind), functools.partial(context.run, function, *args, **kwargs))
+
+async def run_db(function, *args, **kwargs):
+    """
+    Run a synchronous service call that uses SQLite on the DB executor.
+    
+    Args:
+        function: Service function (it checks out its own pooled connection)
+        *args, **kwargs: Arguments for the function
+    
+    Returns:
+        The function's return value
+    """
+    return await _submit('db', function, *args, **kwargs)
+
+async def run_cpu(function, *args, **kwargs):
+    """
+    Run a CPU-bound call (e.g. TextBlob scoring) on the CPU executor.
+    
+    Args:
+        function: Function to call
+        *args, **kwargs: Arguments for the function
+    
+    Returns:
+        The function's return value
+    """
+    return await _submit('cpu', function, *args, **kwargs)
+
+async def iterate_in_executor(iterator, kind: str = 'db'):
+    """
+    Drive a blocking iterator (e.g. FeedbackService.iter_feedback) from async code.
+    
+    Each next() runs on the executor, so the event loop never waits on SQLite.
+    
+    Args:
+        iterator: Iterator or generator to consume
+        kind: Executor to use ('db' or 'cpu')
+    
+    Yields:
+        The iterator's items
+    """
+    done = object()
+    try:
+        while True:
+            item = await _submit(kind, next, iterator, done)
+            if item is done:
+                break
+            yield item
+    finally:
+        close = getattr(iterator, 'close', None)
+        if close is not None:
+            await _submit(kind, close)
+
+def shutdown_executors():
+    """Shut down the executors (on application shutdown)."""
+    with _executors_lock:
+        executors = list(_executors.values())
+        _executors.clear()
+    for executor in executors:
+        executor.shutdown(wait=True)
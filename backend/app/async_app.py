@@ -0,0 +1,49 @@
+from quart import Quart
+from quart_cors import cors
+from config import Config
+
+def create_async_app():
+    """
+    Create the ASGI (Quart) variant of the app.
+    
+    It serves the same API as create_app() through async blueprints that call
+    the same services, with SQLite and CPU-bound work run on executors.
+    """
+    app = Quart(__name__)
+    app.config['SECRET_KEY'] = 'dev-secret-key-change-in-production'
+    
+    # Imports stream their body to the importer, so no whole-body size cap
+    app.config['MAX_CONTENT_LENGTH'] = None
+    
+    # Enable CORS for React frontend
+    app = cors(app, allow_origin='*')
+    
+    # Time every request and its SQL statements
+    from app import metrics
+    if Config.METRICS_ENABLED:
+        metrics.init_async_app(app)
+    
+    # Register blueprints
+    from app.routes.async_auth_routes import auth_bp
+    from app.routes.async_feedback_routes import feedback_bp
+    from app.routes.async_admin_routes import admin_bp
+    
+    app.register_blueprint(auth_bp)
+    app.register_blueprint(feedback_bp)
+    app.register_blueprint(admin_bp)
+    
+    @app.before_serving
+    async def startup():
+        # Classify feedback in the background, requeueing what the last run left unscored
+        from app.services.sentiment_queue import sentiment_queue
+        if Config.SENTIMENT_ASYNC:
+            sentiment_queue.start(requeue=True)
+    
+    @app.after_serving
+    async def shutdown():
+        from app.aio import shutdown_executors
+        from app.services.sentiment_queue import sentiment_queue
+        sentiment_queue.stop()
+        shutdown_executors()
+    
+    return app
@@ -0,0 +1,128 @@
+import threading
+import time
+from collections import OrderedDict
+
+class TTLCache:
+    """Thread-safe, size-bounded LRU cache whose entries expire after a TTL."""
+    
+    def __init__(self, maxsize: int, ttl: float, clock=time.monotonic):
+        """
+        Initialize an empty cache.
+        
+        Args:
+            maxsize: Maximum number of entries kept before LRU eviction
+            ttl: Default time-to-live of an entry in seconds
+            clock: Function returning the current time in seconds
+        """
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._clock = clock
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._expirations = 0
+    
+    def get(self, key, default=None):
+        """
+        Look up a key, refreshing its LRU position.
+        
+        Args:
+            key: Cache key
+            default: Value returned on a miss or an expired entry
+        
+        Returns:
+            Cached value or default
+        """
+        now = self._clock()
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self._misses += 1
+                return default
+            
+            value, expires = entry
+            if now >= expires:
+                del self._data[key]
+                self._expirations += 1
+                self._misses += 1
+                return default
+            
+            self._data.move_to_end(key)
+            self._hits += 1
+            return value
+    
+    def set(self, key, value, ttl: float = None):
+        """
+        Store a value, evicting expired and then least recently used entries.
+        
+        Args:
+            key: Cache key
+            value: Value to cache
+            ttl: Optional per-entry time-to-live overriding the default
+        """
+        now = self._clock()
+        ttl = self.ttl if ttl is None else min(ttl, self.ttl)
+        with self._lock:
+            self._data[key] = (value, now + ttl)
+            self._data.move_to_end(key)
+            if len(self._data) > self.maxsize:
+                self._purge_expired(now)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self._evictions += 1
+    
+    def invalidate(self, key) -> bool:
+        """
+        Remove a key from the cache.
+        
+        Args:
+            key: Cache key
+        
+        Returns:
+            True if an entry was removed, False otherwise
+        """
+        with self._lock:
+            return self._data.pop(key, None) is not None
+    
+    def clear(self):
+        """Remove every entry (counters are kept)."""
+        with self._lock:
+            self._data.clear()
+    
+    def purge_expired(self) -> int:
+        """
+        Drop every expired entry.
+        
+        Returns:
+            Number of entries removed
+        """
+        with self._lock:
+            return self._purge_expired(self._clock())
+    
+    def _purge_expired(self, now: float) -> int:
+        expired = [key for key, (_, expires) in self._data.items() if now >= expires]
+        for key in expired:
+            del self._data[key]
+        self._expirations += len(expired)
+        return len(expired)
+    
+    def stats(self) -> dict:
+        """
+        Return cache size and hit/miss counters.
+        
+        Returns:
+            Dictionary with size, maxsize, hits, misses, hit_ratio, evictions and expirations
+        """
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                'size': len(self._data),
+                'maxsize': self.maxsize,
+                'hits': self._hits,
+                'misses': self._misses,
+                'hit_ratio': round(self._hits / lookups, 4) if lookups else 0.0,
+                'evictions': self._evictions,
+                'expirations': self._expirations
+            }
@@ -0,0 +1,401 @@
+import copy
+import json
+import os
+import sqlite3
+import tempfile
+import threading
+import zlib
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone
+from app import partitions
+from app.database import TREND_COUNTERS, compute_stats_from_scratch, compute_trends_from_scratch
+from config import Config
+
+# Months past the archive age leave the live partitions for the cold tier:
+# <YYYY-MM>.seg holds zlib-compressed blocks of NDJSON rows and is only ever
+# appended to; <YYYY-MM>.idx is a small JSON index with each block's offset,
+# row count and created_at/id range, plus the month's dashboard_stats and
+# feedback_trends counters, so the rollups stay correct without the rows.
+# The index is replaced atomically after the blocks are synced, so a crash
+# mid-append leaves only unreferenced bytes, cut off by the next append.
+FORMAT_VERSION = 1
+
+# Dashboard counters a segment carries (dashboard_stats without total_users)
+STATS_COUNTERS = ('total_feedback', 'rating_sum', 'positive_count', 'negative_count', 'neutral_count')
+
+# Columns of a stored row, in order
+ROW_COLUMNS = ('id', 'user_id', 'rating', 'comment', 'sentiment', 'created_at')
+
+# Parsed indexes by path, reloaded when the file changes
+_indexes = {}
+_indexes_lock = threading.Lock()
+
+# One archiver per process at a time
+_archive_lock = threading.Lock()
+
+def directory() -> str:
+    """Return the cold archive directory (inside the partition directory)."""
+    return os.path.join(partitions.directory(), 'cold')
+
+def segment_path(key: str) -> str:
+    """Return the segment file of a month."""
+    return os.path.join(directory(), key + '.seg')
+
+def index_path(key: str) -> str:
+    """Return the index file of a month."""
+    return os.path.join(directory(), key + '.idx')
+
+def keys(newest_first: bool = True, first: str = None, last: str = None) -> list:
+    """
+    List the months that have rows in the cold archive.
+    
+    Args:
+        newest_first: Order of the keys
+        first: Optional oldest key to include
+        last: Optional newest key to include
+    
+    Returns:
+        List of month keys ('YYYY-MM')
+    """
+    try:
+        names = os.listdir(directory())
+    except FileNotFoundError:
+        return []
+    found = sorted(
+        (name[:-4] for name in names if name.endswith('.idx') and partitions._KEY.match(name[:-4])),
+        reverse=newest_first
+    )
+    return [key for key in found if (first is None or key >= first) and (last is None or key <= last)]
+
+def load_index(key: str) -> dict:
+    """
+    Return the parsed index of a month, or None if nothing is archived.
+    
+    Indexes are cached and reloaded only when the file changes, so the
+    dashboard can sum the cold counters on every request.
+    """
+    path = index_path(key)
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    
+    version = (stat.st_mtime_ns, stat.st_size)
+    with _indexes_lock:
+        cached = _indexes.get(path)
+    if cached and cached[0] == version:
+        return cached[1]
+    
+    with open(path, 'r', encoding='utf-8') as f:
+        index = json.load(f)
+    with _indexes_lock:
+        _indexes[path] = (version, index)
+    return index
+
+def forget_indexes(partition_directory: str):
+    """Drop the cached indexes of a partition directory (a deleted replica generation)."""
+    prefix = os.path.join(partition_directory, 'cold', '')
+    with _indexes_lock:
+        for path in [path for path in _indexes if path.startswith(prefix)]:
+            del _indexes[path]
+
+def max_id(key: str) -> int:
+    """Return the highest feedback id archived for a month (0 if none)."""
+    index = load_index(key)
+    return index['max_id'] if index else 0
+
+def _empty_index(key: str) -> dict:
+    return {
+        'version': FORMAT_VERSION,
+        'key': key,
+        'max_id': 0,
+        'bytes': 0,
+        'blocks': [],
+        'stats': dict.fromkeys(STATS_COUNTERS, 0),
+        'trends': {'hour': {}, 'day': {}}
+    }
+
+def _write_index(key: str, index: dict):
+    """Replace the index atomically (the blocks it references are already synced)."""
+    path = index_path(key)
+    temp = path + '.tmp'
+    with open(temp, 'w', encoding='utf-8') as f:
+        json.dump(index, f, separators=(',', ':'))
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temp, path)
+
+def _encode_block(rows: list, level: int) -> bytes:
+    lines = (json.dumps([row[column] for column in ROW_COLUMNS], ensure_ascii=False, separators=(',', ':'))
+             for row in rows)
+    return zlib.compress('\n'.join(lines).encode('utf-8'), level)
+
+def _read_blocks(key: str, before: str = None):
+    """
+    Yield the rows of a month's segment block by block, oldest first.
+    
+    Args:
+        key: Month key
+        before: Optional created_at; blocks that start after it are skipped
+    
+    Yields:
+        Lists of row tuples in ROW_COLUMNS order
+    """
+    index = load_index(key)
+    if not index:
+        return
+    with open(segment_path(key), 'rb') as f:
+        for block in index['blocks']:
+            if before is not None and block['first_created_at'] > before:
+                continue
+            f.seek(block['offset'])
+            data = zlib.decompress(f.read(block['length'])).decode('utf-8')
+            yield [tuple(json.loads(line)) for line in data.split('\n')]
+
+def eligible_keys(older_than_days: int = None, now: datetime = None) -> list:
+    """
+    List the live partitions whose whole month is older than the archive age.
+    
+    Args:
+        older_than_days: Age in days (defaults to COLD_ARCHIVE_AFTER_DAYS)
+        now: Reference time (defaults to now, UTC)
+    
+    Returns:
+        Partition keys, oldest first
+    """
+    days = Config.COLD_ARCHIVE_AFTER_DAYS if older_than_days is None else older_than_days
+    cutoff = (now or datetime.now(timezone.utc).replace(tzinfo=None)) - timedelta(days=days)
+    eligible = []
+    for key in partitions.keys(newest_first=False):
+        year, month = (int(part) for part in key.split('-'))
+        month_end = datetime(year + month // 12, month % 12 + 1, 1)
+        if month_end <= cutoff:
+            eligible.append(key)
+    return eligible
+
+def archive_month(key: str, block_rows: int = None, level: int = None) -> int:
+    """
+    Move a live partition's rows into the month's cold segment.
+    
+    The rows and their counters are read from one snapshot of the
+    partition, appended as new blocks, and recorded in the index; then the
+    partition file is dropped (or, if rows arrived meanwhile, only the
+    archived rows are deleted from it). Rerunning after a crash skips the
+    rows the index already covers. Call data_version.bump() after.
+    
+    Args:
+        key: Partition key
+        block_rows: Rows per compressed block
+        level: zlib compression level
+    
+    Returns:
+        Number of rows archived
+    """
+    block_rows = block_rows or Config.COLD_ARCHIVE_BLOCK_ROWS
+    level = Config.COLD_ARCHIVE_COMPRESSION_LEVEL if level is None else level
+    
+    with _archive_lock:
+        # A copy: the cached index must not change before the new one is written
+        index = copy.deepcopy(load_index(key)) or _empty_index(key)
+        floor = index['max_id']
+        conn = partitions.connect(key)
+        archived = 0
+        
+        try:
+            # One read snapshot for the counters and the rows they describe
+            conn.execute('BEGIN')
+            cursor = conn.cursor()
+            stats = compute_stats_from_scratch(cursor, include_users=False, after_id=floor)
+            trends = {granularity: compute_trends_from_scratch(cursor, granularity, after_id=floor)
+                      for granularity in ('hour', 'day')}
+            
+            os.makedirs(directory(), exist_ok=True)
+            blocks = []
+            with open(segment_path(key), 'ab') as f:
+                # Bytes past the indexed end are a torn append; overwrite them
+                f.truncate(index['bytes'])
+                offset = index['bytes']
+                cursor.execute(
+                    f"SELECT {', '.join(ROW_COLUMNS)} FROM feedback WHERE id > ? ORDER BY created_at, id",
+                    (floor,)
+                )
+                while True:
+                    rows = cursor.fetchmany(block_rows)
+                    if not rows:
+                        break
+                    data = _encode_block(rows, level)
+                    f.write(data)
+                    blocks.append({
+                        'offset': offset,
+                        'length': len(data),
+                        'rows': len(rows),
+                        'first_created_at': rows[0]['created_at'],
+                        'last_created_at': rows[-1]['created_at'],
+                        'min_id': min(row['id'] for row in rows),
+                        'max_id': max(row['id'] for row in rows)
+                    })
+                    offset += len(data)
+                    archived += len(rows)
+                f.flush()
+                os.fsync(f.fileno())
+            conn.rollback()
+        finally:
+            conn.close()
+        
+        if blocks:
+            index['blocks'].extend(blocks)
+            index['bytes'] = offset
+            index['max_id'] = max(index['max_id'], max(block['max_id'] for block in blocks))
+            for name in STATS_COUNTERS:
+                index['stats'][name] += stats[name]
+            for granularity, buckets in trends.items():
+                stored = index['trends'][granularity]
+                for bucket, counters in buckets.items():
+                    values = [counters[column] for column in TREND_COUNTERS]
+                    previous = stored.get(bucket)
+                    stored[bucket] = [a + b for a, b in zip(previous, values)] if previous else values
+            _write_index(key, index)
+        
+        _retire_partition(key, index['max_id'])
+        return archived
+
+def _retire_partition(key: str, archived_max_id: int):
+    """Remove the archived rows from the live partition, dropping it if nothing else is left."""
+    conn = partitions.connect(key)
+    try:
+        conn.execute('BEGIN IMMEDIATE')
+        newer = conn.execute('SELECT COUNT(*) FROM feedback WHERE id > ?', (archived_max_id,)).fetchone()[0]
+        if newer:
+            # The triggers take the deleted rows out of the partition's rollups
+            conn.execute('DELETE FROM feedback WHERE id <= ?', (archived_max_id,))
+        conn.commit()
+    finally:
+        conn.close()
+    if not newer:
+        partitions.drop(key)
+
+def archive_old(older_than_days: int = None, verbose: bool = True) -> dict:
+    """
+    Move every month older than the archive age into the cold tier.
+    
+    Args:
+        older_than_days: Age in days (defaults to COLD_ARCHIVE_AFTER_DAYS)
+        verbose: Print each month
+    
+    Returns:
+        Dictionary of month key -> rows archived
+    """
+    from app.data_version import data_version
+    
+    archived = {}
+    for key in eligible_keys(older_than_days):
+        archived[key] = archive_month(key)
+        data_version.bump()
+        if verbose:
+            index = load_index(key)
+            size = index['bytes'] if index else 0
+            print(f"✓ {key}: {archived[key]} rows archived ({size / 1024:.1f} KiB compressed)")
+    return archived
+
+@contextmanager
+def attached(conn, key: str, before: str = None):
+    """
+    Attach a month's cold rows to a pooled connection as a temporary partition.
+    
+    The blocks are decompressed into a temporary SQLite file with the
+    partition schema (indexes and full-text index included), together with
+    the month's live rows if it has any, so the listing, search and export
+    queries run on it unchanged. Meant for explicit archive reads, not the
+    hot path. The file is removed when the block ends.
+    
+    Args:
+        conn: Connection from get_db_connection() (not inside a transaction)
+        key: Month key
+        before: Optional created_at; blocks that start after it are skipped
+    """
+    fd, path = tempfile.mkstemp(prefix=f'feedback-{key}-', suffix='.db')
+    os.close(fd)
+    schema = 'c' + key.replace('-', '_')
+    
+    try:
+        build = sqlite3.connect(path, isolation_level=None, uri=True)
+        build.row_factory = sqlite3.Row
+        try:
+            build.execute('PRAGMA journal_mode = OFF')
+            build.execute('PRAGMA synchronous = OFF')
+            build.execute('BEGIN')
+            partitions.create_schema(build.cursor(), key)
+            insert = f"INSERT INTO feedback ({', '.join(ROW_COLUMNS)}) VALUES (?, ?, ?, ?, ?, ?)"
+            for rows in _read_blocks(key, before):
+                build.executemany(insert, rows)
+            build.execute('COMMIT')
+            
+            live = partitions.path_for(key)
+            if os.path.exists(live):
+                columns = ', '.join(ROW_COLUMNS)
+                # Read-only URI: a partition retired meanwhile is not recreated empty
+                build.execute('ATTACH DATABASE ? AS live', (partitions._uri(live, 'ro'),))
+                build.execute(f'INSERT INTO main.feedback ({columns}) SELECT {columns} FROM live.feedback')
+                build.execute('DETACH DATABASE live')
+        finally:
+            build.close()
+        
+        conn.execute('ATTACH DATABASE ? AS ' + schema, (path,))
+        try:
+            yield schema
+        finally:
+            if conn.in_transaction:
+                conn.rollback()
+            conn.execute('DETACH DATABASE ' + schema)
+    finally:
+        os.remove(path)
+
+def totals() -> dict:
+    """Return the dashboard counters of every cold segment, summed."""
+    summed = dict.fromkeys(STATS_COUNTERS, 0)
+    for key in keys():
+        index = load_index(key)
+        if index:
+            for name in STATS_COUNTERS:
+                summed[name] += index['stats'][name]
+    return summed
+
+def trend_rows(granularity: str, first_bucket: str, last_bucket: str) -> dict:
+    """
+    Return the archived trend counters of the buckets in a range.
+    
+    Args:
+        granularity: 'hour' or 'day'
+        first_bucket: First bucket to include
+        last_bucket: Last bucket to include
+    
+    Returns:
+        Dictionary of bucket -> counters (same columns as feedback_trends)
+    """
+    rows = {}
+    for key in keys(first=first_bucket[:7], last=last_bucket[:7]):
+        index = load_index(key)
+        for bucket, values in (index['trends'][granularity] if index else {}).items():
+            if first_bucket <= bucket <= last_bucket:
+                rows[bucket] = dict(zip(TREND_COUNTERS, values))
+    return rows
+
+def segments() -> list:
+    """
+    Describe every cold segment, newest first.
+    
+    Returns:
+        List of dictionaries with key, rows, blocks, compressed bytes and max_id
+    """
+    described = []
+    for key in keys():
+        index = load_index(key)
+        if index:
+            described.append({
+                'key': key,
+                'rows': index['stats']['total_feedback'],
+                'blocks': len(index['blocks']),
+                'bytes': index['bytes'],
+                'max_id': index['max_id']
+            })
+    return described
@@ -0,0 +1,108 @@
+import mmap
+import os
+import secrets
+import struct
+import threading
+import app.database as database
+
+try:
+    import fcntl
+except ImportError:
+    # No flock (Windows): bumps are only serialized within this process
+    fcntl = None
+
+# <database>-version holds two little-endian uint64s: a random epoch chosen
+# when the file is created and the version counter
+_LAYOUT = struct.Struct('<QQ')
+
+class DataVersion:
+    """
+    Counter of committed changes to the data admin reads are built from.
+    
+    Every process serving a database maps the same small file next to it, so
+    a write in one worker is seen by the others without a query: reading the
+    version is a memory read. ETags are '<epoch>-<version>', so a recreated
+    file never repeats an old tag.
+    """
+    
+    def __init__(self):
+        self._maps = {}
+        self._lock = threading.Lock()
+        if hasattr(os, 'register_at_fork'):
+            # flock belongs to the open file, which a forked worker would
+            # share with its parent: reopen it in the child instead
+            os.register_at_fork(after_in_child=self._forget)
+    
+    def _forget(self):
+        self._maps = {}
+        self._lock = threading.Lock()
+    
+    def _map(self) -> tuple:
+        """Return (file, mmap) for the current DATABASE_PATH, creating the file on first use."""
+        path = database.DATABASE_PATH + '-version'
+        entry = self._maps.get(path)
+        if entry is not None:
+            return entry
+        
+        with self._lock:
+            entry = self._maps.get(path)
+            if entry is None:
+                handle = os.fdopen(os.open(path, os.O_RDWR | os.O_CREAT, 0o644), 'r+b')
+                self._flock(handle, True)
+                try:
+                    if os.fstat(handle.fileno()).st_size < _LAYOUT.size:
+                        handle.write(_LAYOUT.pack(secrets.randbits(64), 0))
+                        handle.flush()
+                finally:
+                    self._flock(handle, False)
+                entry = (handle, mmap.mmap(handle.fileno(), _LAYOUT.size))
+                self._maps[path] = entry
+        return entry
+    
+    @staticmethod
+    def _flock(handle, exclusive: bool):
+        if fcntl is not None:
+            fcntl.flock(handle.fileno(), fcntl.LOCK_EX if exclusive else fcntl.LOCK_UN)
+    
+    def current(self) -> int:
+        """Return the current version."""
+        return _LAYOUT.unpack_from(self._map()[1])[1]
+    
+    def etag(self, version: int = None) -> str:
+        """
+        Return the (unquoted) strong ETag for a version.
+        
+        Args:
+            version: Version read before building the response (default: current)
+        """
+        epoch, current = _LAYOUT.unpack_from(self._map()[1])
+        return f'{epoch:x}-{current if version is None else version}'
+    
+    def bump(self) -> int:
+        """
+        Record a committed write. Call after commit, never before: a reader
+        that sees the new version must also see the new data.
+        
+        Returns:
+            The new version
+        """
+        handle, view = self._map()
+        with self._lock:
+            self._flock(handle, True)
+            try:
+                epoch, version = _LAYOUT.unpack_from(view)
+                _LAYOUT.pack_into(view, 0, epoch, version + 1)
+            finally:
+                self._flock(handle, False)
+        return version + 1
+    
+    def close(self):
+        """Unmap every version file (used by tests and benchmarks)."""
+        with self._lock:
+            maps = list(self._maps.values())
+            self._maps.clear()
+        for handle, view in maps:
+            view.close()
+            handle.close()
+
+data_version = DataVersion()
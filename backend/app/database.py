@@ -1,20 +1,430 @@
+import contextvars
 import sqlite3
 import os
+import queue
+import sys
+import threading
+import time
+from contextlib import contextmanager
 from datetime import datetime
+from urllib.parse import quote
+from app.metrics import registry, record_db_time
+from config import Config
 
 DATABASE_PATH = os.path.join(os.path.dirname(__file__), '..', 'feedback.db')
 
-def get_db_connection():
-    """Create and return a database connection."""
-    conn = sqlite3.connect(DATABASE_PATH)
-    conn.row_factory = sqlite3.Row
-    return conn
+# One pool per database file, so tests that swap DATABASE_PATH get their own
+_pools = {}
+_pools_lock = threading.Lock()
 
-def init_db():
-    """Initialize the database with required tables."""
-    conn = get_db_connection()
-    cursor = conn.cursor()
+# Whether each database has the FTS5 feedback index, checked once per path
+_search_index_state = {}
+
+# Snapshot replica file the current request reads from (see app/replica.py);
+# connections and partition paths resolve against it instead of DATABASE_PATH
+_replica_path = contextvars.ContextVar('replica_path', default=None)
+
+class ConnectionPool:
+    """Bounded pool of long-lived, pre-configured SQLite connections."""
+    
+    def __init__(self, database_path: str, max_size: int = None, timeout: float = None, read_only: bool = False):
+        """
+        Initialize an empty pool; connections are opened lazily.
+        
+        Args:
+            database_path: Path of the SQLite database file
+            max_size: Maximum number of open connections
+            timeout: Seconds to wait for a free connection before failing
+            read_only: Open the file read-only (snapshot replicas)
+        """
+        self.database_path = database_path
+        self.read_only = read_only
+        self.max_size = max_size or Config.DB_POOL_SIZE
+        self.timeout = timeout if timeout is not None else Config.DB_POOL_TIMEOUT
+        self._idle = queue.LifoQueue()
+        self._lock = threading.Lock()
+        self._closed = False
+        self._stats = {
+            'created': 0,
+            'acquired': 0,
+            'reused': 0,
+            'released': 0,
+            'waits': 0,
+            'timeouts': 0,
+            'in_use': 0,
+            'peak_in_use': 0
+        }
+    
+    def _connect(self) -> sqlite3.Connection:
+        """Open a new connection and apply the performance PRAGMAs."""
+        if self.read_only:
+            # Attached partitions inherit the read-only open flags
+            conn = sqlite3.connect(
+                'file:' + quote(os.path.abspath(self.database_path)) + '?mode=ro',
+                uri=True,
+                timeout=Config.DB_BUSY_TIMEOUT_MS / 1000,
+                check_same_thread=False
+            )
+            conn.row_factory = sqlite3.Row
+            conn.execute('PRAGMA query_only = 1')
+            conn.execute(f'PRAGMA mmap_size = {int(Config.DB_MMAP_SIZE)}')
+            return conn
+        
+        # Opened as a URI so partitions can be attached with an access mode
+        conn = sqlite3.connect(
+            'file:' + quote(os.path.abspath(self.database_path)),
+            uri=True,
+            timeout=Config.DB_BUSY_TIMEOUT_MS / 1000,
+            check_same_thread=False
+        )
+        conn.row_factory = sqlite3.Row
+        conn.execute('PRAGMA journal_mode = WAL')
+        conn.execute('PRAGMA synchronous = NORMAL')
+        conn.execute(f'PRAGMA busy_timeout = {int(Config.DB_BUSY_TIMEOUT_MS)}')
+        conn.execute(f'PRAGMA mmap_size = {int(Config.DB_MMAP_SIZE)}')
+        return conn
+    
+    def acquire(self) -> sqlite3.Connection:
+        """
+        Check a connection out of the pool, opening one if below max_size.
+        
+        Returns:
+            A raw sqlite3 connection owned by the caller until release()
+        
+        Raises:
+            sqlite3.OperationalError: If the pool is closed, or no connection
+                frees up within timeout
+        """
+        if self._closed:
+            raise sqlite3.OperationalError('Connection pool is closed')
+        
+        try:
+            conn = self._idle.get_nowait()
+            reused = True
+        except queue.Empty:
+            conn = None
+            reused = False
+        
+        if conn is None:
+            with self._lock:
+                can_create = self._stats['created'] < self.max_size
+                if can_create:
+                    self._stats['created'] += 1
+            if can_create:
+                try:
+                    conn = self._connect()
+                except Exception:
+                    with self._lock:
+                        self._stats['created'] -= 1
+                    raise
+            else:
+                with self._lock:
+                    self._stats['waits'] += 1
+                try:
+                    conn = self._idle.get(timeout=self.timeout)
+                    reused = True
+                except queue.Empty:
+                    with self._lock:
+                        self._stats['timeouts'] += 1
+                    raise sqlite3.OperationalError(
+                        f'Connection pool exhausted ({self.max_size} connections in use)'
+                    )
+        
+        with self._lock:
+            closed = self._closed
+            if closed:
+                # Closed while this caller waited or connected
+                self._stats['created'] -= 1
+            else:
+                self._stats['acquired'] += 1
+                if reused:
+                    self._stats['reused'] += 1
+                self._stats['in_use'] += 1
+                self._stats['peak_in_use'] = max(self._stats['peak_in_use'], self._stats['in_use'])
+        if closed:
+            conn.close()
+            raise sqlite3.OperationalError('Connection pool is closed')
+        return conn
+    
+    def release(self, conn: sqlite3.Connection):
+        """
+        Return a connection to the pool, discarding any uncommitted work.
+        
+        Args:
+            conn: Connection previously obtained from acquire()
+        """
+        with self._lock:
+            self._stats['released'] += 1
+            self._stats['in_use'] -= 1
+        
+        try:
+            if conn.in_transaction:
+                conn.rollback()
+        except sqlite3.Error:
+            # Broken connection: drop it so a fresh one can be opened
+            with self._lock:
+                self._stats['created'] -= 1
+            conn.close()
+            return
+        
+        with self._lock:
+            if not self._closed:
+                self._idle.put(conn)
+                return
+            self._stats['created'] -= 1
+        conn.close()
+    
+    def stats(self) -> dict:
+        """
+        Return a snapshot of pool usage counters.
+        
+        Returns:
+            Dictionary with sizing counters and current idle/in-use counts
+        """
+        with self._lock:
+            snapshot = dict(self._stats)
+        snapshot['max_size'] = self.max_size
+        snapshot['idle'] = self._idle.qsize()
+        return snapshot
+    
+    def close(self):
+        """Close every idle connection and refuse new checkouts; in-use ones close on release."""
+        with self._lock:
+            self._closed = True
+        while True:
+            try:
+                conn = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            conn.close()
+
+class TimedCursor:
+    """Cursor proxy that records time spent in execute and fetch calls."""
+    
+    def __init__(self, cursor: sqlite3.Cursor):
+        self._cursor = cursor
+    
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+    
+    def __iter__(self):
+        return iter(self._cursor)
+    
+    def _timed(self, function, args, sql=None):
+        started = time.perf_counter()
+        try:
+            return function(*args)
+        finally:
+            record_db_time(time.perf_counter() - started, sql)
+    
+    def execute(self, sql, parameters=()):
+        self._timed(self._cursor.execute, (sql, parameters), sql)
+        return self
+    
+    def executemany(self, sql, seq_of_parameters):
+        self._timed(self._cursor.executemany, (sql, seq_of_parameters), sql)
+        return self
+    
+    def fetchone(self):
+        return self._timed(self._cursor.fetchone, ())
+    
+    def fetchmany(self, size=None):
+        return self._timed(self._cursor.fetchmany, (size or self._cursor.arraysize,))
+    
+    def fetchall(self):
+        return self._timed(self._cursor.fetchall, ())
+
+class PooledConnection:
+    """
+    Thin proxy around a pooled sqlite3 connection.
+    
+    Services keep calling close() in their finally blocks; for pooled
+    connections that returns the connection to the pool instead of closing
+    it, and for app-context scoped connections it is a no-op until teardown.
+    """
+    
+    def __init__(self, conn: sqlite3.Connection, pool: ConnectionPool, scoped: bool = False):
+        self._conn = conn
+        self._pool = pool
+        self._scoped = scoped
+        self._released = False
+    
+    def __getattr__(self, name):
+        return getattr(self._conn, name)
+    
+    def cursor(self):
+        cursor = self._conn.cursor()
+        return TimedCursor(cursor) if Config.METRICS_ENABLED else cursor
+    
+    def execute(self, sql, parameters=()):
+        return self.cursor().execute(sql, parameters)
+    
+    def executemany(self, sql, seq_of_parameters):
+        return self.cursor().executemany(sql, seq_of_parameters)
     
+    def commit(self):
+        if not Config.METRICS_ENABLED:
+            return self._conn.commit()
+        started = time.perf_counter()
+        try:
+            return self._conn.commit()
+        finally:
+            record_db_time(time.perf_counter() - started, 'COMMIT')
+    
+    def __enter__(self):
+        self._conn.__enter__()
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        return self._conn.__exit__(exc_type, exc_value, traceback)
+    
+    def close(self):
+        """Release the underlying connection back to its pool."""
+        if self._scoped or self._released:
+            return
+        self._released = True
+        self._pool.release(self._conn)
+
+def database_path() -> str:
+    """Return the database file this context reads: the pinned replica, else DATABASE_PATH."""
+    return _replica_path.get() or DATABASE_PATH
+
+@contextmanager
+def use_replica(path: str):
+    """
+    Point connections and partition paths at a snapshot replica for a block.
+    
+    Args:
+        path: Replica copy of the database file (see app/replica.py)
+    """
+    token = _replica_path.set(path)
+    try:
+        yield path
+    finally:
+        _replica_path.reset(token)
+
+def get_pool(name: str = 'default') -> ConnectionPool:
+    """
+    Return the connection pool for the current DATABASE_PATH (or replica, see use_replica).
+    
+    Args:
+        name: 'default' for the main pool; any other name is a small side
+            pool (DB_SIDE_POOL_SIZE) for helpers such as the sentiment cache
+            that may run while their caller holds a default connection, so
+            they can never wait on the main pool
+    """
+    path = database_path()
+    key = (path, name)
+    pool = _pools.get(key)
+    if pool is None:
+        with _pools_lock:
+            pool = _pools.get(key)
+            if pool is None:
+                pool = ConnectionPool(
+                    path,
+                    None if name == 'default' else Config.DB_SIDE_POOL_SIZE,
+                    read_only=path != DATABASE_PATH
+                )
+                _pools[key] = pool
+    return pool
+
+def get_pool_stats() -> dict:
+    """Return usage statistics for the current database's connection pool."""
+    stats = get_pool().stats()
+    stats['database_path'] = os.path.abspath(DATABASE_PATH)
+    return stats
+
+registry.gauge('db_pool_connections_in_use', 'Pooled SQLite connections checked out', lambda: get_pool().stats()['in_use'])
+registry.gauge('db_pool_connections_open', 'SQLite connections opened by the pool', lambda: get_pool().stats()['created'])
+
+def _forget_pools():
+    """Drop the pools a forked worker inherited; their connections belong to the parent."""
+    global _pools_lock
+    _pools.clear()
+    _pools_lock = threading.Lock()
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_forget_pools)
+
+def close_pools(path: str):
+    """Close and forget the pools of one database file (a retired replica generation)."""
+    with _pools_lock:
+        pools = [_pools.pop(key) for key in list(_pools) if key[0] == path]
+    for pool in pools:
+        pool.close()
+
+def close_all_pools():
+    """Close and forget every connection pool (used by tests and shutdown)."""
+    with _pools_lock:
+        pools = list(_pools.values())
+        _pools.clear()
+    for pool in pools:
+        pool.close()
+
+def get_db_connection(pool_name: str = 'default'):
+    """
+    Return a database connection.
+    
+    Inside a Flask app context every call shares a single pooled connection
+    that is returned to the pool on teardown; outside of one (scripts, worker
+    threads) each call checks out its own connection and close() returns it.
+    Reads from a snapshot replica (see use_replica) are never shared.
+    
+    Args:
+        pool_name: Side pool to check out from instead (see get_pool); such
+            connections are never shared with the request
+    """
+    pool = get_pool(pool_name)
+    g = _app_context_globals() if pool_name == 'default' and _replica_path.get() is None else None
+    
+    if g is not None:
+        if getattr(g, '_db_conn', None) is None:
+            g._db_conn = pool.acquire()
+            g._db_pool = pool
+        return PooledConnection(g._db_conn, g._db_pool, scoped=True)
+    
+    return PooledConnection(pool.acquire(), pool)
+
+def _app_context_globals():
+    """Return flask.g inside a Flask app context, else None (without importing Flask)."""
+    flask = sys.modules.get('flask')
+    if flask is None or not flask.has_app_context():
+        return None
+    return flask.g
+
+def release_db_connection(exception=None):
+    """Return the app-context connection to its pool (teardown handler)."""
+    from flask import g
+    conn = g.pop('_db_conn', None)
+    pool = g.pop('_db_pool', None)
+    if conn is not None:
+        pool.release(conn)
+
+def init_app(app):
+    """Register the connection teardown handler on a Flask app."""
+    app.teardown_appcontext(release_db_connection)
+
+def init_db(verbose: bool = True):
+    """
+    Initialize the database by applying any pending schema migrations.
+    
+    Args:
+        verbose: Print each migration as it is applied
+    """
+    from app.migrations import migrate
+    from app.partitions import adopt_legacy_feedback
+    migrate(verbose=verbose)
+    # Feedback written before partitioning moves into the monthly files
+    adopt_legacy_feedback(verbose=verbose)
+    print("Database initialized successfully!")
+
+def create_base_tables(cursor):
+    """
+    Create the users, feedback and sessions tables if missing.
+    
+    Args:
+        cursor: Cursor on an open connection (caller commits)
+    """
     # Users table
     cursor.execute('''
         CREATE TABLE IF NOT EXISTS users (
@@ -51,10 +461,329 @@ def init_db():
             FOREIGN KEY (user_id) REFERENCES users(id)
         )
     ''')
+
+def init_stats_rollup(cursor, include_users: bool = True):
+    """
+    Create the dashboard_stats rollup row and its maintenance triggers.
     
-    conn.commit()
-    conn.close()
-    print("Database initialized successfully!")
+    The triggers run inside the same transaction as the write that fires
+    them, so the counters can never disagree with committed data. A newly
+    created rollup is computed from the existing tables.
+    
+    Args:
+        cursor: Cursor on an open connection (caller commits)
+        include_users: False for a feedback partition, which has no users
+            table (total_users stays 0)
+    """
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS dashboard_stats (
+            id INTEGER PRIMARY KEY CHECK (id = 1),
+            total_users INTEGER NOT NULL DEFAULT 0,
+            total_feedback INTEGER NOT NULL DEFAULT 0,
+            rating_sum INTEGER NOT NULL DEFAULT 0,
+            positive_count INTEGER NOT NULL DEFAULT 0,
+            negative_count INTEGER NOT NULL DEFAULT 0,
+            neutral_count INTEGER NOT NULL DEFAULT 0
+        )
+    ''')
+    
+    if include_users:
+        cursor.execute('''
+            CREATE TRIGGER IF NOT EXISTS dashboard_stats_user_insert AFTER INSERT ON users BEGIN
+                UPDATE dashboard_stats SET total_users = total_users + 1 WHERE id = 1;
+            END
+        ''')
+        cursor.execute('''
+            CREATE TRIGGER IF NOT EXISTS dashboard_stats_user_delete AFTER DELETE ON users BEGIN
+                UPDATE dashboard_stats SET total_users = total_users - 1 WHERE id = 1;
+            END
+        ''')
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS dashboard_stats_feedback_insert AFTER INSERT ON feedback BEGIN
+            UPDATE dashboard_stats SET
+                total_feedback = total_feedback + 1,
+                rating_sum = rating_sum + new.rating,
+                positive_count = positive_count + (new.sentiment IS 'positive'),
+                negative_count = negative_count + (new.sentiment IS 'negative'),
+                neutral_count = neutral_count + (new.sentiment IS 'neutral')
+            WHERE id = 1;
+        END
+    ''')
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS dashboard_stats_feedback_delete AFTER DELETE ON feedback BEGIN
+            UPDATE dashboard_stats SET
+                total_feedback = total_feedback - 1,
+                rating_sum = rating_sum - old.rating,
+                positive_count = positive_count - (old.sentiment IS 'positive'),
+                negative_count = negative_count - (old.sentiment IS 'negative'),
+                neutral_count = neutral_count - (old.sentiment IS 'neutral')
+            WHERE id = 1;
+        END
+    ''')
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS dashboard_stats_feedback_update
+        AFTER UPDATE OF rating, sentiment ON feedback BEGIN
+            UPDATE dashboard_stats SET
+                rating_sum = rating_sum - old.rating + new.rating,
+                positive_count = positive_count - (old.sentiment IS 'positive') + (new.sentiment IS 'positive'),
+                negative_count = negative_count - (old.sentiment IS 'negative') + (new.sentiment IS 'negative'),
+                neutral_count = neutral_count - (old.sentiment IS 'neutral') + (new.sentiment IS 'neutral')
+            WHERE id = 1;
+        END
+    ''')
+    
+    cursor.execute('SELECT 1 FROM dashboard_stats WHERE id = 1')
+    if not cursor.fetchone():
+        rebuild_stats_rollup(cursor, include_users)
+
+def compute_stats_from_scratch(cursor, include_users: bool = True, after_id: int = None) -> dict:
+    """
+    Recompute the dashboard counters with full scans of users and feedback.
+    
+    Args:
+        cursor: Cursor on an open connection
+        include_users: False for a feedback partition (total_users is 0)
+        after_id: Only count feedback with a greater id
+        
+    Returns:
+        Dictionary with the same columns as dashboard_stats (without id)
+    """
+    total_users = '(SELECT COUNT(*) FROM users)' if include_users else '0'
+    cursor.execute(f'''
+        SELECT
+            {total_users} AS total_users,
+            COUNT(*) AS total_feedback,
+            COALESCE(SUM(rating), 0) AS rating_sum,
+            COALESCE(SUM(sentiment = 'positive'), 0) AS positive_count,
+            COALESCE(SUM(sentiment = 'negative'), 0) AS negative_count,
+            COALESCE(SUM(sentiment = 'neutral'), 0) AS neutral_count
+        FROM feedback
+        WHERE id > ?
+    ''', (after_id or 0,))
+    return dict(cursor.fetchone())
+
+def rebuild_stats_rollup(cursor, include_users: bool = True) -> dict:
+    """
+    Overwrite the dashboard_stats row with freshly computed counters.
+    
+    Args:
+        cursor: Cursor on an open connection (caller commits)
+        include_users: False for a feedback partition (see init_stats_rollup)
+        
+    Returns:
+        The recomputed counters
+    """
+    stats = compute_stats_from_scratch(cursor, include_users)
+    cursor.execute(
+        '''INSERT OR REPLACE INTO dashboard_stats
+           (id, total_users, total_feedback, rating_sum, positive_count, negative_count, neutral_count)
+           VALUES (1, :total_users, :total_feedback, :rating_sum, :positive_count, :negative_count, :neutral_count)''',
+        stats
+    )
+    return stats
+
+# Counters kept per trend bucket, and the SQL for one feedback row's
+# contribution to each (row is 'new', 'old' or a table alias)
+TREND_COUNTERS = (
+    'feedback_count', 'rating_sum', 'positive_count', 'negative_count', 'neutral_count',
+    'rating_1', 'rating_2', 'rating_3', 'rating_4', 'rating_5'
+)
+
+def _trend_terms(row: str) -> list:
+    return [
+        '1', f'{row}.rating',
+        f"{row}.sentiment IS 'positive'", f"{row}.sentiment IS 'negative'", f"{row}.sentiment IS 'neutral'"
+    ] + [f'{row}.rating = {rating}' for rating in range(1, 6)]
+
+def _trend_buckets(row: str) -> dict:
+    # created_at is 'YYYY-MM-DD HH:MM:SS' (UTC); NULLs land in a bucket no range reaches
+    created_at = f"COALESCE({row}.created_at, '0000-00-00 00:00:00')"
+    return {
+        'hour': f"substr({created_at}, 1, 13) || ':00:00'",
+        'day': f"substr({created_at}, 1, 10) || ' 00:00:00'"
+    }
+
+def _trend_add(row: str) -> str:
+    terms = ', '.join(_trend_terms(row))
+    values = ', '.join(f"('{granularity}', {bucket}, {terms})" for granularity, bucket in _trend_buckets(row).items())
+    return (
+        f"INSERT INTO feedback_trends (granularity, bucket, {', '.join(TREND_COUNTERS)}) VALUES {values} "
+        'ON CONFLICT (granularity, bucket) DO UPDATE SET '
+        + ', '.join(f'{column} = {column} + excluded.{column}' for column in TREND_COUNTERS) + ';'
+    )
+
+def _trend_subtract(row: str) -> str:
+    changes = ', '.join(f'{column} = {column} - ({term})' for column, term in zip(TREND_COUNTERS, _trend_terms(row)))
+    return '\n'.join(
+        f"UPDATE feedback_trends SET {changes} WHERE granularity = '{granularity}' AND bucket = {bucket};"
+        for granularity, bucket in _trend_buckets(row).items()
+    )
+
+def init_trend_rollup(cursor):
+    """
+    Create the hourly/daily feedback_trends rollup and its maintenance triggers.
+    
+    Like dashboard_stats, the buckets are updated by triggers in the same
+    transaction as the feedback write, including the later sentiment update,
+    so a trend range is read from at most TRENDS_MAX_BUCKETS rows whatever
+    the size of the feedback table. A newly created rollup is backfilled.
+    
+    Args:
+        cursor: Cursor on an open connection (caller commits)
+    """
+    counters = ',\n'.join(f'            {column} INTEGER NOT NULL DEFAULT 0' for column in TREND_COUNTERS)
+    cursor.execute(f'''
+        CREATE TABLE IF NOT EXISTS feedback_trends (
+            granularity TEXT NOT NULL CHECK (granularity IN ('hour', 'day')),
+            bucket TEXT NOT NULL,
+{counters},
+            PRIMARY KEY (granularity, bucket)
+        ) WITHOUT ROWID
+    ''')
+    
+    cursor.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS feedback_trends_insert AFTER INSERT ON feedback BEGIN
+            {_trend_add('new')}
+        END
+    ''')
+    cursor.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS feedback_trends_delete AFTER DELETE ON feedback BEGIN
+            {_trend_subtract('old')}
+        END
+    ''')
+    cursor.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS feedback_trends_update
+        AFTER UPDATE OF rating, sentiment, created_at ON feedback BEGIN
+            {_trend_subtract('old')}
+            {_trend_add('new')}
+        END
+    ''')
+    
+    cursor.execute('SELECT 1 FROM feedback_trends LIMIT 1')
+    if not cursor.fetchone():
+        rebuild_trend_rollup(cursor)
+
+def compute_trends_from_scratch(cursor, granularity: str, after_id: int = None) -> dict:
+    """
+    Recompute the trend buckets of one granularity with a full scan of feedback.
+    
+    Args:
+        cursor: Cursor on an open connection
+        granularity: 'hour' or 'day'
+        after_id: Only count feedback with a greater id
+    
+    Returns:
+        Dictionary of bucket -> counters (same columns as feedback_trends)
+    """
+    sums = ', '.join(f'SUM({term}) AS {column}' for column, term in zip(TREND_COUNTERS, _trend_terms('f')))
+    cursor.execute(
+        f'SELECT {_trend_buckets("f")[granularity]} AS bucket, {sums} FROM feedback f WHERE f.id > ? GROUP BY 1',
+        (after_id or 0,)
+    )
+    return {row['bucket']: {column: row[column] for column in TREND_COUNTERS} for row in cursor.fetchall()}
+
+def rebuild_trend_rollup(cursor):
+    """
+    Overwrite feedback_trends with freshly computed hourly and daily buckets.
+    
+    Args:
+        cursor: Cursor on an open connection (caller commits)
+    """
+    columns = ', '.join(TREND_COUNTERS)
+    sums = ', '.join(f'SUM({term})' for term in _trend_terms('f'))
+    cursor.execute('DELETE FROM feedback_trends')
+    cursor.execute(
+        f"INSERT INTO feedback_trends (granularity, bucket, {columns}) "
+        f"SELECT 'hour', {_trend_buckets('f')['hour']}, {sums} FROM feedback f GROUP BY 2"
+    )
+    # Days are summed from the hours rather than rescanning feedback
+    cursor.execute(
+        f"INSERT INTO feedback_trends (granularity, bucket, {columns}) "
+        f"SELECT 'day', substr(bucket, 1, 10) || ' 00:00:00', {', '.join(f'SUM({c})' for c in TREND_COUNTERS)} "
+        "FROM feedback_trends WHERE granularity = 'hour' GROUP BY 2"
+    )
+
+def init_search_index(cursor) -> bool:
+    """
+    Create the feedback_fts FTS5 table and its sync triggers if missing.
+    
+    Args:
+        cursor: Cursor on an open connection (caller commits)
+        
+    Returns:
+        True if the index was newly created and needs a backfill
+    """
+    cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'feedback_fts'")
+    if cursor.fetchone():
+        return False
+    
+    try:
+        cursor.execute('''
+            CREATE VIRTUAL TABLE feedback_fts USING fts5(
+                comment,
+                content='feedback',
+                content_rowid='id',
+                tokenize='unicode61 remove_diacritics 2'
+            )
+        ''')
+    except sqlite3.OperationalError as e:
+        print(f"Full-text search unavailable, falling back to LIKE: {str(e)}")
+        return False
+    
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS feedback_fts_insert AFTER INSERT ON feedback BEGIN
+            INSERT INTO feedback_fts(rowid, comment) VALUES (new.id, new.comment);
+        END
+    ''')
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS feedback_fts_delete AFTER DELETE ON feedback BEGIN
+            INSERT INTO feedback_fts(feedback_fts, rowid, comment) VALUES ('delete', old.id, old.comment);
+        END
+    ''')
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS feedback_fts_update AFTER UPDATE OF comment ON feedback BEGIN
+            INSERT INTO feedback_fts(feedback_fts, rowid, comment) VALUES ('delete', old.id, old.comment);
+            INSERT INTO feedback_fts(rowid, comment) VALUES (new.id, new.comment);
+        END
+    ''')
+    _search_index_state.pop(DATABASE_PATH, None)
+    return True
+
+def has_search_index() -> bool:
+    """Return True if the current database has the feedback_fts index."""
+    path = DATABASE_PATH
+    if path not in _search_index_state:
+        conn = get_db_connection()
+        try:
+            row = conn.execute(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'feedback_fts'"
+            ).fetchone()
+            _search_index_state[path] = row is not None
+        finally:
+            conn.close()
+    return _search_index_state[path]
+
+def rebuild_search_index() -> int:
+    """
+    Rebuild feedback_fts from the feedback table, and that of every partition (backfill).
+    
+    Returns:
+        Number of feedback rows indexed
+    """
+    from app import partitions
+    conn = get_db_connection()
+    try:
+        conn.execute("INSERT INTO feedback_fts(feedback_fts) VALUES ('rebuild')")
+        conn.commit()
+        count = conn.execute('SELECT COUNT(*) FROM feedback').fetchone()[0]
+        for key in partitions.keys():
+            with partitions.writing(key) as partition:
+                partition.execute("INSERT INTO feedback_fts(feedback_fts) VALUES ('rebuild')")
+                partition.commit()
+                count += partition.execute('SELECT COUNT(*) FROM feedback').fetchone()[0]
+        return count
+    finally:
+        conn.close()
 
 if __name__ == '__main__':
     init_db()
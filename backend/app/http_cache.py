@@ -0,0 +1,149 @@
+from contextlib import nullcontext
+from app import wire_format
+from app.aio import run_cpu
+from app.cache import TTLCache
+from app.data_version import data_version
+from app.metrics import registry
+from app.replica import read_replica
+from config import Config
+
+# Encoded bodies keyed by (endpoint, query arguments, ETag, media type,
+# encoding). A write bumps the data version and with it the ETag, so stale
+# bodies are never served; they simply age out.
+response_cache = TTLCache(Config.RESPONSE_CACHE_SIZE, Config.RESPONSE_CACHE_TTL_SECONDS)
+
+# Query arguments that identify the caller rather than the data
+IGNORED_ARGS = ('session_token',)
+
+# Admin data: only the browser may keep it, and must revalidate every time
+CACHE_CONTROL = 'private, no-cache'
+
+def cache_key(endpoint: str, args, etag: str) -> tuple:
+    """
+    Build the response cache key for a request.
+    
+    Args:
+        endpoint: Endpoint name
+        args: Request query arguments (MultiDict)
+        etag: ETag of the data version the body is built from
+    
+    Returns:
+        Hashable key
+    """
+    filters = tuple(sorted((name, tuple(values)) for name, values in args.lists() if name not in IGNORED_ARGS))
+    return (endpoint, filters, etag)
+
+def _count(endpoint: str, result: str):
+    registry.counter(
+        'http_response_cache_total', 'Conditional admin reads by result (not_modified, hit, miss)',
+        endpoint=endpoint, result=result
+    ).inc()
+
+def _finish(app, body: bytes, etag: str, representation, encoding: str = None, status: int = 200):
+    response = app.response_class(body, status=status, mimetype=representation.media_type)
+    response.set_etag(etag)
+    if encoding:
+        response.headers['Content-Encoding'] = encoding
+    response.headers['Cache-Control'] = CACHE_CONTROL
+    response.headers['Vary'] = wire_format.VARY
+    return response
+
+def _not_modified(request, endpoint: str, etag: str, representation):
+    """
+    Return the tag If-None-Match holds for this representation, or None.
+    
+    Bodies below COMPRESSION_MIN_BYTES go out uncompressed, so the identity
+    tag is current as well as the one of the negotiated encoding.
+    """
+    for encoding in {representation.encoding, None}:
+        tag = wire_format.representation_etag(etag, representation, encoding)
+        if request.if_none_match.contains_weak(tag):
+            _count(endpoint, 'not_modified')
+            return tag
+    return None
+
+def _source(replica: bool):
+    """Return the context reads run in: the snapshot replica, or the primary (yields None)."""
+    return read_replica.reading() if replica else nullcontext()
+
+def cached_json(endpoint: str, build, replica: bool = False):
+    """
+    Serve a read with a strong ETag from the data version (Flask).
+    
+    The body is JSON or MessagePack and gzip/br compressed as negotiated
+    (see wire_format.negotiate), and every representation has its own tag.
+    If-None-Match with the current tag returns 304 without calling build;
+    otherwise the encoded body is reused while the version is unchanged.
+    Call it after authorization and argument validation.
+    
+    With replica, build reads the snapshot replica while it is within its
+    staleness bound, and the tag is that of the snapshot's data version.
+    
+    Args:
+        endpoint: Endpoint name, part of the cache key
+        build: Function returning the payload for a 200 response
+        replica: Build from the read-only snapshot (app/replica.py)
+    
+    Returns:
+        Flask response
+    """
+    from flask import current_app, jsonify, request
+    
+    try:
+        representation = wire_format.negotiate(request)
+    except ValueError as e:
+        return jsonify({'success': False, 'message': str(e)}), 400
+    
+    with _source(replica) as manifest:
+        # Read the version before the data, so a concurrent write can only make
+        # the body newer than its tag, never older
+        etag = data_version.etag(manifest['version'] if manifest else None)
+        tag = _not_modified(request, endpoint, etag, representation)
+        if tag:
+            return _finish(current_app, b'', tag, representation, status=304)
+        
+        key = cache_key(endpoint, request.args, etag) + representation
+        cached = response_cache.get(key)
+        if cached is None:
+            _count(endpoint, 'miss')
+            cached = wire_format.encode(build(), representation, current_app.json.dumps)
+            if len(cached[0]) <= Config.RESPONSE_CACHE_MAX_BODY_BYTES:
+                response_cache.set(key, cached)
+        else:
+            _count(endpoint, 'hit')
+    body, encoding = cached
+    return _finish(current_app, body, wire_format.representation_etag(etag, representation, encoding),
+                   representation, encoding)
+
+async def cached_json_async(endpoint: str, build, replica: bool = False):
+    """
+    Serve a read with a strong ETag from the data version (Quart).
+    
+    Same as cached_json, with build a coroutine function; serialization and
+    compression run on the CPU executor.
+    """
+    from quart import current_app, jsonify, request
+    
+    try:
+        representation = wire_format.negotiate(request)
+    except ValueError as e:
+        return jsonify({'success': False, 'message': str(e)}), 400
+    
+    with _source(replica) as manifest:
+        etag = data_version.etag(manifest['version'] if manifest else None)
+        tag = _not_modified(request, endpoint, etag, representation)
+        if tag:
+            return _finish(current_app, b'', tag, representation, status=304)
+        
+        key = cache_key(endpoint, request.args, etag) + representation
+        cached = response_cache.get(key)
+        if cached is None:
+            _count(endpoint, 'miss')
+            cached = await run_cpu(wire_format.encode, await build(), representation, current_app.json.dumps)
+            if len(cached[0]) <= Config.RESPONSE_CACHE_MAX_BODY_BYTES:
+                response_cache.set(key, cached)
+        else:
+            _count(endpoint, 'hit')
+    body, encoding = cached
+    return _finish(current_app, body, wire_format.representation_etag(etag, representation, encoding),
+                   representation, encoding)
@@ -0,0 +1,302 @@
+import bisect
+import threading
+import time
+from contextvars import ContextVar
+
+# Latency buckets in seconds, from sub-millisecond queries to slow bcrypt calls
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+class Histogram:
+    """Thread-safe cumulative histogram of observed durations."""
+    
+    def __init__(self, buckets: tuple = DEFAULT_BUCKETS):
+        """
+        Initialize an empty histogram.
+        
+        Args:
+            buckets: Sorted upper bounds of the buckets, in seconds
+        """
+        self.buckets = tuple(buckets)
+        self._counts = [0] * (len(self.buckets) + 1)
+        self._sum = 0.0
+        self._max = 0.0
+        self._lock = threading.Lock()
+    
+    def observe(self, value: float):
+        """
+        Record one observation.
+        
+        Args:
+            value: Observed duration in seconds
+        """
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            self._counts[index] += 1
+            self._sum += value
+            if value > self._max:
+                self._max = value
+    
+    def snapshot(self) -> dict:
+        """
+        Return the histogram state.
+        
+        Returns:
+            Dictionary with count, sum, max, mean and cumulative bucket counts
+        """
+        with self._lock:
+            counts = list(self._counts)
+            total = self._sum
+            maximum = self._max
+        
+        cumulative = []
+        running = 0
+        for bound, count in zip(self.buckets, counts):
+            running += count
+            cumulative.append((bound, running))
+        count = running + counts[-1]
+        
+        return {
+            'count': count,
+            'sum': round(total, 6),
+            'max': round(maximum, 6),
+            'mean': round(total / count, 6) if count else 0.0,
+            'buckets': cumulative
+        }
+
+# Buckets for per-request counts (e.g. SQL statements per request)
+COUNT_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000)
+
+class Counter:
+    """Thread-safe monotonically increasing counter."""
+    
+    def __init__(self):
+        self.value = 0
+        self._lock = threading.Lock()
+    
+    def inc(self, amount: float = 1):
+        """
+        Add to the counter.
+        
+        Args:
+            amount: Amount to add
+        """
+        with self._lock:
+            self.value += amount
+
+class MetricsRegistry:
+    """
+    Named metric families with labels, rendered in Prometheus text format.
+    
+    histogram() and counter() return the same child object for the same name
+    and labels, so hot paths can look a metric up once and keep it.
+    """
+    
+    def __init__(self):
+        self._families = {}
+        self._lock = threading.Lock()
+    
+    def _child(self, kind: str, name: str, description: str, labels: dict, factory):
+        key = tuple(sorted(labels.items()))
+        family = self._families.get(name)
+        if family is None or key not in family['children']:
+            with self._lock:
+                family = self._families.setdefault(
+                    name, {'type': kind, 'help': description, 'children': {}}
+                )
+                if key not in family['children']:
+                    family['children'][key] = factory()
+        return family['children'][key]
+    
+    def histogram(self, name: str, description: str, buckets: tuple = DEFAULT_BUCKETS, **labels) -> Histogram:
+        """
+        Get or create a histogram.
+        
+        Args:
+            name: Metric name
+            description: Help text
+            buckets: Bucket upper bounds (used when the histogram is created)
+            **labels: Label values identifying the child
+        
+        Returns:
+            The Histogram for these labels
+        """
+        return self._child('histogram', name, description, labels, lambda: Histogram(buckets))
+    
+    def counter(self, name: str, description: str, **labels) -> Counter:
+        """
+        Get or create a counter.
+        
+        Args:
+            name: Metric name (conventionally ending in _total)
+            description: Help text
+            **labels: Label values identifying the child
+        
+        Returns:
+            The Counter for these labels
+        """
+        return self._child('counter', name, description, labels, Counter)
+    
+    def gauge(self, name: str, description: str, function):
+        """
+        Register a gauge whose value is read when metrics are rendered.
+        
+        Args:
+            name: Metric name
+            description: Help text
+            function: Callable returning the current value
+        """
+        with self._lock:
+            self._families[name] = {'type': 'gauge', 'help': description, 'children': {(): function}}
+    
+    @staticmethod
+    def _labels(key: tuple, extra: tuple = ()) -> str:
+        pairs = list(key) + list(extra)
+        if not pairs:
+            return ''
+        escaped = (
+            (name, str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n'))
+            for name, value in pairs
+        )
+        return '{' + ','.join(f'{name}="{value}"' for name, value in escaped) + '}'
+    
+    def render(self) -> str:
+        """
+        Render every metric in the Prometheus text exposition format (0.0.4).
+        
+        Returns:
+            Exposition text
+        """
+        with self._lock:
+            families = [(name, dict(family, children=dict(family['children'])))
+                        for name, family in self._families.items()]
+        
+        lines = []
+        for name, family in families:
+            lines.append(f"# HELP {name} {family['help']}")
+            lines.append(f"# TYPE {name} {family['type']}")
+            for key, child in sorted(family['children'].items()):
+                if family['type'] == 'histogram':
+                    snapshot = child.snapshot()
+                    for bound, count in snapshot['buckets']:
+                        lines.append(f"{name}_bucket{self._labels(key, (('le', repr(float(bound))),))} {count}")
+                    lines.append(f"{name}_bucket{self._labels(key, (('le', '+Inf'),))} {snapshot['count']}")
+                    lines.append(f"{name}_sum{self._labels(key)} {snapshot['sum']}")
+                    lines.append(f"{name}_count{self._labels(key)} {snapshot['count']}")
+                elif family['type'] == 'counter':
+                    lines.append(f"{name}{self._labels(key)} {child.value}")
+                else:
+                    try:
+                        value = child()
+                    except Exception as e:
+                        print(f"Failed to read gauge {name}: {str(e)}")
+                        continue
+                    lines.append(f"{name}{self._labels(key)} {value}")
+        return '\n'.join(lines) + '\n'
+
+# Shared registry exposed at GET /api/admin/metrics
+registry = MetricsRegistry()
+
+# Per-request SQL totals; a context variable rather than g so the executor
+# threads of the async mode (which copy the request context) add to them too
+_request_db = ContextVar('request_db', default=None)
+
+def start_request() -> float:
+    """
+    Begin per-request accounting.
+    
+    Returns:
+        perf_counter timestamp to hand to finish_request
+    """
+    _request_db.set({'queries': 0, 'seconds': 0.0})
+    return time.perf_counter()
+
+def finish_request(started: float, endpoint: str, method: str, status: int):
+    """
+    Record the duration, status and SQL totals of a finished request.
+    
+    Args:
+        started: Value returned by start_request
+        endpoint: Matched endpoint name (None when no route matched)
+        method: HTTP method
+        status: Response status code
+    """
+    stats = _request_db.get() or {'queries': 0, 'seconds': 0.0}
+    _request_db.set(None)
+    endpoint = endpoint or 'unmatched'
+    
+    registry.histogram(
+        'http_request_duration_seconds',
+        'Time from request start until the response is returned (streamed bodies excluded)',
+        endpoint=endpoint, method=method
+    ).observe(time.perf_counter() - started)
+    registry.counter(
+        'http_requests_total', 'Requests handled',
+        endpoint=endpoint, method=method, status=status
+    ).inc()
+    registry.histogram(
+        'http_request_db_queries', 'SQL statements executed per request',
+        COUNT_BUCKETS, endpoint=endpoint
+    ).observe(stats['queries'])
+    registry.histogram(
+        'http_request_db_seconds', 'Time spent in SQLite execute and fetch calls per request',
+        endpoint=endpoint
+    ).observe(stats['seconds'])
+
+def record_db_time(seconds: float, sql: str = None):
+    """
+    Record time spent in an execute, fetch or commit call.
+    
+    Args:
+        seconds: Duration of the call
+        sql: Statement text for execute and commit calls (None for fetches)
+    """
+    if sql is not None:
+        operation = statement_operation(sql)
+        registry.counter('db_statements_total', 'SQL statements executed', operation=operation).inc()
+        registry.histogram(
+            'db_statement_seconds', 'Duration of SQLite execute and commit calls',
+            operation=operation
+        ).observe(seconds)
+    stats = _request_db.get()
+    if stats is not None:
+        stats['seconds'] += seconds
+        if sql is not None:
+            stats['queries'] += 1
+
+def statement_operation(sql: str) -> str:
+    """Return the statement's leading keyword (SELECT, INSERT, ...) as a low-cardinality label."""
+    words = sql.lstrip().split(None, 1)
+    keyword = words[0].upper() if words else ''
+    return keyword if keyword.isalpha() else 'OTHER'
+
+def init_app(app):
+    """Register the request timing hooks on a Flask app."""
+    from flask import g, request
+    
+    def before():
+        g._metrics_started = start_request()
+    
+    def after(response):
+        started = g.pop('_metrics_started', None)
+        if started is not None:
+            finish_request(started, request.endpoint, request.method, response.status_code)
+        return response
+    
+    app.before_request(before)
+    app.after_request(after)
+
+def init_async_app(app):
+    """Register the request timing hooks on a Quart app."""
+    from quart import g, request
+    
+    async def before():
+        g._metrics_started = start_request()
+    
+    async def after(response):
+        started = g.pop('_metrics_started', None)
+        if started is not None:
+            finish_request(started, request.endpoint, request.method, response.status_code)
+        return response
+    
+    app.before_request(before)
+    app.after_request(after)
@@ -0,0 +1,151 @@
+import hashlib
+from app.database import (
+    get_db_connection,
+    create_base_tables,
+    init_stats_rollup,
+    init_trend_rollup,
+    init_search_index
+)
+
+def _search_index(cursor):
+    if init_search_index(cursor):
+        # Backfill comments that existed before the index
+        cursor.execute("INSERT INTO feedback_fts(feedback_fts) VALUES ('rebuild')")
+
+def _hot_query_indexes(cursor):
+    # Feedback listing: newest first, with keyset cursor on (created_at, id)
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_feedback_created_at ON feedback(created_at)')
+    # Listing filtered by sentiment and/or rating, still newest first
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_feedback_sentiment_created_at ON feedback(sentiment, created_at)')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_feedback_rating_created_at ON feedback(rating, created_at)')
+    # Both filters together; also covers the stats recount (sentiment counts, rating sum)
+    cursor.execute(
+        'CREATE INDEX IF NOT EXISTS idx_feedback_sentiment_rating ON feedback(sentiment, rating, created_at)'
+    )
+    # Join/foreign key lookups and expired session cleanup
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_feedback_user_id ON feedback(user_id)')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_sessions_expires_at ON sessions(expires_at)')
+
+def _compact_session_tokens(cursor):
+    # Store SHA-256 digests of session tokens (32-byte BLOB) instead of the
+    # 43-character token text. Existing sessions keep working: their tokens
+    # are hashed in place while the table is rebuilt.
+    cursor.execute('''
+        CREATE TABLE sessions_compact (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_id INTEGER,
+            token_hash BLOB UNIQUE NOT NULL,
+            is_admin BOOLEAN DEFAULT 0,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            expires_at TIMESTAMP NOT NULL,
+            FOREIGN KEY (user_id) REFERENCES users(id)
+        )
+    ''')
+    cursor.execute('SELECT id, user_id, session_token, is_admin, created_at, expires_at FROM sessions')
+    cursor.executemany(
+        'INSERT INTO sessions_compact (id, user_id, token_hash, is_admin, created_at, expires_at) '
+        'VALUES (?, ?, ?, ?, ?, ?)',
+        [
+            (row[0], row[1], hashlib.sha256(row[2].encode('utf-8')).digest(), row[3], row[4], row[5])
+            for row in cursor.fetchall()
+        ]
+    )
+    cursor.execute('DROP TABLE sessions')
+    cursor.execute('ALTER TABLE sessions_compact RENAME TO sessions')
+    # Expiry sweep and per-user session cap
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_sessions_expires_at ON sessions(expires_at)')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_sessions_user_id ON sessions(user_id)')
+
+def _sentiment_cache(cursor):
+    # Memoized sentiment labels keyed by classifier version and the SHA-256
+    # of the normalized comment text (see app/services/sentiment_cache.py)
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS sentiment_cache (
+            version TEXT NOT NULL,
+            text_hash BLOB NOT NULL,
+            sentiment TEXT NOT NULL CHECK(sentiment IN ('positive', 'negative', 'neutral')),
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            PRIMARY KEY (version, text_hash)
+        ) WITHOUT ROWID
+    ''')
+
+def _legacy_feedback_ids(cursor):
+    # Old id -> partitioned id of feedback moved out of the unpartitioned
+    # table (see partitions.adopt_legacy_feedback and resolve_ids)
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS legacy_feedback_ids (
+            old_id INTEGER PRIMARY KEY,
+            new_id INTEGER NOT NULL
+        )
+    ''')
+
+# Ordered schema migrations: (version, description, function(cursor)).
+# PRAGMA user_version records the last applied version. Never edit or
+# reorder an applied migration; append a new one instead.
+MIGRATIONS = [
+    (1, 'Create users, feedback and sessions tables', create_base_tables),
+    (2, 'Add dashboard_stats rollup and triggers', init_stats_rollup),
+    (3, 'Add feedback_fts full-text index', _search_index),
+    (4, 'Add indexes for feedback listing, filters, stats and session expiry', _hot_query_indexes),
+    (5, 'Store session tokens as SHA-256 digests', _compact_session_tokens),
+    (6, 'Add sentiment_cache table for memoized sentiment labels', _sentiment_cache),
+    (7, 'Add hourly and daily feedback_trends rollup and triggers', init_trend_rollup),
+    (8, 'Add legacy_feedback_ids map for feedback moved into partitions', _legacy_feedback_ids)
+]
+
+def get_schema_version() -> int:
+    """Return the schema version recorded in PRAGMA user_version."""
+    conn = get_db_connection()
+    try:
+        return conn.execute('PRAGMA user_version').fetchone()[0]
+    finally:
+        conn.close()
+
+def pending_migrations() -> list:
+    """Return the migrations newer than the current schema version."""
+    version = get_schema_version()
+    return [migration for migration in MIGRATIONS if migration[0] > version]
+
+def migrate(target: int = None, verbose: bool = True) -> list:
+    """
+    Apply pending migrations in order, each in its own transaction.
+    
+    Args:
+        target: Optional version to stop at (defaults to the latest)
+        verbose: Print each migration as it is applied
+    
+    Returns:
+        List of applied migration versions
+    """
+    applied = []
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    
+    try:
+        for version, description, apply in MIGRATIONS:
+            if target is not None and version > target:
+                break
+            
+            # Take the write lock first so concurrent workers apply each step once
+            cursor.execute('BEGIN IMMEDIATE')
+            cursor.execute('PRAGMA user_version')
+            if cursor.fetchone()[0] >= version:
+                conn.rollback()
+                continue
+            
+            try:
+                apply(cursor)
+                cursor.execute(f'PRAGMA user_version = {int(version)}')
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+            
+            applied.append(version)
+            if verbose:
+                print(f"Applied migration {version}: {description}")
+        
+        return applied
+        
+    finally:
+        conn.close()
@@ -0,0 +1,488 @@
+import os
+import re
+import sqlite3
+import threading
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from urllib.parse import quote
+import app.database as database
+from app.database import init_stats_rollup, init_trend_rollup, init_search_index
+from config import Config
+
+# Feedback lives in one SQLite file per month, named <YYYY-MM>.db, in a
+# directory next to the database. A partition holds the rows whose
+# created_at falls in its month, with its own indexes, full-text index and
+# dashboard_stats/feedback_trends rollups, so dropping or archiving a month
+# is a file operation and every rollup stays correct without a recount.
+_KEY = re.compile(r'^(\d{4})-(\d{2})$')
+
+# Feedback ids are <YYYYMM> * ID_STRIDE + sequence, so the partition of an
+# id is known without a lookup and ids stay unique across partitions. Ids
+# below ID_STRIDE were handed out before partitioning (see resolve_ids).
+ID_STRIDE = 10 ** 9
+
+# PRAGMA user_version of a partition whose schema is complete
+SCHEMA_VERSION = 1
+
+# Partitions known to exist, per directory (creation is checked once)
+_created = set()
+_created_lock = threading.Lock()
+
+def directory() -> str:
+    """Return the partition directory of the current DATABASE_PATH (or of the replica being read)."""
+    return database.database_path() + '-partitions'
+
+def archive_directory() -> str:
+    """Return the directory archived partitions are moved to."""
+    return os.path.join(directory(), 'archived')
+
+def path_for(key: str) -> str:
+    """Return the file of a partition."""
+    return os.path.join(directory(), key + '.db')
+
+def key_for(created_at: str) -> str:
+    """
+    Return the partition key ('YYYY-MM') of a created_at timestamp.
+    
+    Raises:
+        ValueError: If created_at does not start with a YYYY-MM date
+    """
+    key = str(created_at)[:7]
+    if not _KEY.match(key):
+        raise ValueError(f'Invalid created_at: {created_at!r}')
+    return key
+
+def key_for_id(feedback_id: int) -> str:
+    """
+    Return the partition key of a feedback id.
+    
+    Raises:
+        ValueError: If the id predates partitioning (map it with resolve_ids)
+    """
+    if feedback_id < ID_STRIDE:
+        raise ValueError(f'Feedback id {feedback_id} predates partitioning')
+    month = feedback_id // ID_STRIDE
+    return f'{month // 100:04d}-{month % 100:02d}'
+
+def resolve_ids(feedback_ids: list) -> dict:
+    """
+    Map feedback ids, including ones handed out before partitioning, to current ids.
+    
+    Adopted rows got partitioned ids (see adopt_legacy_feedback); their
+    old ids are looked up in the legacy_feedback_ids table, so jobs, exports
+    and links holding an old id still find the row. Partitioned ids map to
+    themselves without a query.
+    
+    Args:
+        feedback_ids: Feedback ids
+    
+    Returns:
+        Dictionary of given id -> current id; unknown old ids are left out
+    """
+    resolved = {feedback_id: feedback_id for feedback_id in feedback_ids if feedback_id >= ID_STRIDE}
+    legacy = sorted({feedback_id for feedback_id in feedback_ids if feedback_id < ID_STRIDE})
+    if not legacy:
+        return resolved
+    
+    conn = database.get_db_connection()
+    try:
+        # Chunked to stay under SQLite's bound parameter limit
+        for start in range(0, len(legacy), 500):
+            chunk = legacy[start:start + 500]
+            rows = conn.execute(
+                f"SELECT old_id, new_id FROM main.legacy_feedback_ids WHERE old_id IN ({', '.join('?' * len(chunk))})",
+                chunk
+            ).fetchall()
+            resolved.update((row['old_id'], row['new_id']) for row in rows)
+    finally:
+        conn.close()
+    return resolved
+
+def first_id(key: str) -> int:
+    """Return the id sequence start of a partition (its first row gets first_id + 1)."""
+    year, month = _KEY.match(key).groups()
+    return int(year + month) * ID_STRIDE
+
+def utc_now() -> str:
+    """Return the current UTC time as a created_at value (like CURRENT_TIMESTAMP)."""
+    return datetime.now(timezone.utc).strftime('%Y-%m-%d %H:%M:%S')
+
+def keys(newest_first: bool = True, first: str = None, last: str = None) -> list:
+    """
+    List the existing partitions.
+    
+    Args:
+        newest_first: Order of the keys
+        first: Optional oldest key to include
+        last: Optional newest key to include
+    
+    Returns:
+        List of partition keys
+    """
+    try:
+        names = os.listdir(directory())
+    except FileNotFoundError:
+        return []
+    found = sorted(
+        (name[:-3] for name in names if name.endswith('.db') and _KEY.match(name[:-3])),
+        reverse=newest_first
+    )
+    return [key for key in found if (first is None or key >= first) and (last is None or key <= last)]
+
+def create_schema(cursor, key: str):
+    """
+    Create a partition's feedback table, indexes and rollups (caller commits).
+    
+    The id sequence starts after any rows of the month already moved to the
+    cold archive, so a month that gets new rows again never reuses an id.
+    """
+    from app import cold_archive
+    
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS feedback (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_id INTEGER NOT NULL,
+            rating INTEGER NOT NULL CHECK(rating >= 1 AND rating <= 5),
+            comment TEXT NOT NULL,
+            sentiment TEXT CHECK(sentiment IN ('positive', 'negative', 'neutral')),
+            created_at TIMESTAMP NOT NULL
+        )
+    ''')
+    # Same listing, filter and join indexes as the unpartitioned table
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_feedback_created_at ON feedback(created_at)')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_feedback_sentiment_created_at ON feedback(sentiment, created_at)')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_feedback_rating_created_at ON feedback(rating, created_at)')
+    cursor.execute(
+        'CREATE INDEX IF NOT EXISTS idx_feedback_sentiment_rating ON feedback(sentiment, rating, created_at)'
+    )
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_feedback_user_id ON feedback(user_id)')
+    
+    init_stats_rollup(cursor, include_users=False)
+    init_trend_rollup(cursor)
+    init_search_index(cursor)
+    
+    cursor.execute(
+        "INSERT INTO sqlite_sequence (name, seq) SELECT 'feedback', ? "
+        "WHERE NOT EXISTS (SELECT 1 FROM sqlite_sequence WHERE name = 'feedback')",
+        (max(first_id(key), cold_archive.max_id(key)),)
+    )
+
+def _uri(path: str, mode: str = 'rw') -> str:
+    """Return the URI of an existing database file; SQLite will not create it."""
+    return 'file:' + quote(os.path.abspath(path)) + '?mode=' + mode
+
+def connect(key: str) -> sqlite3.Connection:
+    """
+    Open a direct connection to an existing partition (maintenance and scripts).
+    
+    Raises:
+        FileNotFoundError: If the partition does not exist
+    """
+    path = path_for(key)
+    if not os.path.exists(path):
+        raise FileNotFoundError(f'No feedback partition {key}')
+    # mode=rw: a partition dropped since the check is not recreated empty
+    conn = sqlite3.connect(_uri(path), uri=True, timeout=Config.DB_BUSY_TIMEOUT_MS / 1000)
+    conn.row_factory = sqlite3.Row
+    conn.execute('PRAGMA synchronous = NORMAL')
+    return conn
+
+@contextmanager
+def writing(key: str, create_missing: bool = False):
+    """
+    Open a write transaction on one partition, on a connection of its own.
+    
+    The partition is not attached to the main database, so its write lock
+    is the only one taken: writes to different months, and to users and
+    sessions, do not wait for each other. The transaction starts with BEGIN
+    IMMEDIATE, as the FTS5 triggers read the partition before writing it
+    and SQLite fails a read lock's upgrade with SQLITE_BUSY at once, without
+    waiting out the busy timeout, while another connection writes.
+    
+    Args:
+        key: Partition key
+        create_missing: Create the partition if needed; otherwise a missing
+            partition raises FileNotFoundError
+    
+    Yields:
+        The connection; commit() before the block ends, or the work is rolled back
+    """
+    if create_missing:
+        create(key)
+    conn = connect(key)
+    try:
+        conn.execute('BEGIN IMMEDIATE')
+        yield conn
+    finally:
+        if conn.in_transaction:
+            conn.rollback()
+        conn.close()
+
+def create(key: str) -> str:
+    """
+    Create a partition if it does not exist yet.
+    
+    Safe to race with other processes: the schema is created under the
+    partition's write lock and marked complete with PRAGMA user_version.
+    
+    Returns:
+        Path of the partition file
+    """
+    path = path_for(key)
+    # Checked on disk too: a deleted directory must not pass for a partition
+    if path in _created and os.path.exists(path):
+        return path
+    
+    with _created_lock:
+        if path in _created and os.path.exists(path):
+            return path
+        os.makedirs(directory(), exist_ok=True)
+        conn = sqlite3.connect(path, timeout=Config.DB_BUSY_TIMEOUT_MS / 1000, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        try:
+            conn.execute('PRAGMA journal_mode = WAL')
+            conn.execute('BEGIN IMMEDIATE')
+            try:
+                if conn.execute('PRAGMA user_version').fetchone()[0] < SCHEMA_VERSION:
+                    create_schema(conn.cursor(), key)
+                    conn.execute(f'PRAGMA user_version = {SCHEMA_VERSION}')
+                conn.execute('COMMIT')
+            except Exception:
+                conn.execute('ROLLBACK')
+                raise
+        finally:
+            conn.close()
+        _created.add(path)
+    return path
+
+def _forget(path: str):
+    with _created_lock:
+        _created.discard(path)
+
+@contextmanager
+def attached(conn, key: str, create_missing: bool = False, write: bool = False):
+    """
+    Attach a partition to a pooled connection for the duration of a block.
+    
+    The schema name is yielded, so queries can join the partition's feedback
+    with the users table of the main database. A partition that is already
+    attached (by an enclosing block) is reused and left attached. Open
+    cursors on the partition must be closed before the block ends.
+    
+    Writes go through writing() instead: BEGIN IMMEDIATE on a connection
+    with attachments locks main and every attached file. write=True is only
+    for adopt_legacy_feedback, which must commit in both files at once.
+    
+    Args:
+        conn: Connection from get_db_connection() (not inside a transaction)
+        key: Partition key
+        create_missing: Create the partition if needed (writes); otherwise
+            a missing partition raises FileNotFoundError
+        write: Take the write locks before the first statement
+    """
+    path = create(key) if create_missing else path_for(key)
+    if not create_missing and not os.path.exists(path):
+        raise FileNotFoundError(f'No feedback partition {key}')
+    
+    schema = 'p' + key.replace('-', '_')
+    already = any(row[1] == schema for row in conn.execute('PRAGMA database_list').fetchall())
+    if not already:
+        # A plain path would be created empty if the partition was dropped
+        # since the check; snapshot replicas are opened read-only
+        mode = 'ro' if database.database_path() != database.DATABASE_PATH else 'rw'
+        try:
+            conn.execute('ATTACH DATABASE ? AS ' + schema, (_uri(path, mode),))
+        except sqlite3.OperationalError:
+            if not os.path.exists(path):
+                raise FileNotFoundError(f'No feedback partition {key}')
+            raise
+    try:
+        if write and not conn.in_transaction:
+            conn.execute('BEGIN IMMEDIATE')
+        yield schema
+    finally:
+        if not already:
+            if conn.in_transaction:
+                conn.rollback()
+            conn.execute('DETACH DATABASE ' + schema)
+
+def stats(key: str) -> dict:
+    """
+    Return the size and rollup counters of one partition.
+    
+    Returns:
+        Dictionary with key, bytes, feedback count, rating sum and sentiment counts
+    """
+    path = path_for(key)
+    size = sum(
+        os.path.getsize(path + suffix) for suffix in ('', '-wal') if os.path.exists(path + suffix)
+    )
+    conn = connect(key)
+    try:
+        row = conn.execute('''
+            SELECT total_feedback, rating_sum, positive_count, negative_count, neutral_count
+            FROM dashboard_stats WHERE id = 1
+        ''').fetchone()
+    finally:
+        conn.close()
+    return {'key': key, 'bytes': size, **dict(row)}
+
+def list_partitions() -> list:
+    """Return stats() of every partition, newest first."""
+    return [stats(key) for key in keys()]
+
+def _remove_files(path: str):
+    for suffix in ('-wal', '-shm', ''):
+        if os.path.exists(path + suffix):
+            os.remove(path + suffix)
+
+def drop(key: str) -> bool:
+    """
+    Delete a partition and everything in it.
+    
+    Its rows and its share of every rollup go with the file, so this takes
+    the same time for any number of rows. Call data_version.bump() after.
+    
+    Returns:
+        True if the partition existed
+    """
+    path = path_for(key)
+    if not os.path.exists(path):
+        return False
+    _forget(path)
+    _remove_files(path)
+    return True
+
+def archive(key: str) -> str:
+    """
+    Move a partition out of the live set, keeping the file (see restore).
+    
+    The WAL is checkpointed into the file first, so only one file moves.
+    Call data_version.bump() after.
+    
+    Returns:
+        Path of the archived file, or None if the partition does not exist
+    """
+    path = path_for(key)
+    if not os.path.exists(path):
+        return None
+    conn = connect(key)
+    try:
+        conn.execute('PRAGMA wal_checkpoint(TRUNCATE)')
+        conn.execute('PRAGMA journal_mode = DELETE')
+    finally:
+        conn.close()
+    
+    os.makedirs(archive_directory(), exist_ok=True)
+    target = os.path.join(archive_directory(), key + '.db')
+    _forget(path)
+    os.replace(path, target)
+    _remove_files(path)
+    return target
+
+def restore(key: str) -> bool:
+    """
+    Move an archived partition back into the live set. Call data_version.bump() after.
+    
+    Returns:
+        True if the partition was restored
+    
+    Raises:
+        ValueError: If a live partition of the same month exists
+    """
+    source = os.path.join(archive_directory(), key + '.db')
+    if not os.path.exists(source):
+        return False
+    if os.path.exists(path_for(key)):
+        raise ValueError(f'Partition {key} already exists')
+    os.replace(source, path_for(key))
+    return True
+
+def archived_keys() -> list:
+    """List the archived partitions, newest first."""
+    try:
+        names = os.listdir(archive_directory())
+    except FileNotFoundError:
+        return []
+    return sorted((name[:-3] for name in names if name.endswith('.db') and _KEY.match(name[:-3])), reverse=True)
+
+def adopt_legacy_feedback(batch_size: int = None, verbose: bool = True) -> int:
+    """
+    Move feedback rows from the unpartitioned feedback table into partitions.
+    
+    Rows are copied oldest first in batches and get new, partitioned ids;
+    the old ids are recorded in legacy_feedback_ids, so ids handed out
+    before the move still resolve (see resolve_ids). Keeping the old ids
+    instead would break the per-month id order the cold archive relies on.
+    Each batch commits in both files, and the rows are deleted from the main
+    table in the same transaction, so the main rollups shrink as the
+    partition rollups grow. A no-op once empty.
+    
+    Args:
+        batch_size: Rows moved per transaction
+        verbose: Print progress
+    
+    Returns:
+        Number of rows moved
+    """
+    from app.data_version import data_version
+    
+    batch_size = batch_size or Config.FEEDBACK_PARTITION_ADOPT_BATCH_SIZE
+    moved = 0
+    conn = database.get_db_connection()
+    
+    try:
+        while True:
+            rows = conn.execute(
+                '''SELECT id, user_id, rating, comment, sentiment, COALESCE(created_at, ?) AS created_at
+                   FROM feedback ORDER BY created_at, id LIMIT ?''',
+                (utc_now(), batch_size)
+            ).fetchall()
+            if not rows:
+                break
+            
+            by_key = {}
+            for row in rows:
+                by_key.setdefault(key_for(row['created_at']), []).append(row)
+            
+            for key, batch in by_key.items():
+                # Attached: the insert, the id map and the delete from main commit together
+                with attached(conn, key, create_missing=True, write=True) as schema:
+                    cursor = conn.cursor()
+                    mapping = []
+                    for row in batch:
+                        cursor.execute(
+                            f'INSERT INTO {schema}.feedback (user_id, rating, comment, sentiment, created_at) '
+                            'VALUES (?, ?, ?, ?, ?)',
+                            (row['user_id'], row['rating'], row['comment'], row['sentiment'], row['created_at'])
+                        )
+                        mapping.append((row['id'], cursor.lastrowid))
+                    cursor.executemany('INSERT INTO main.legacy_feedback_ids (old_id, new_id) VALUES (?, ?)', mapping)
+                    cursor.executemany('DELETE FROM main.feedback WHERE id = ?', [(old_id,) for old_id, _ in mapping])
+                    cursor.close()
+                    conn.commit()
+            data_version.bump()
+            moved += len(rows)
+            if verbose:
+                print(f"Moved {moved} feedback rows into monthly partitions")
+        return moved
+        
+    finally:
+        conn.close()
+
+def status() -> dict:
+    """
+    Return the live, archived and cold partitions (GET /api/admin/partitions).
+    
+    Returns:
+        Dictionary with the partition directory, per-partition stats, archived
+        keys and cold archive segments
+    """
+    from app import cold_archive
+    
+    return {
+        'directory': os.path.abspath(directory()),
+        'partitions': list_partitions(),
+        'archived': archived_keys(),
+        'cold': cold_archive.segments()
+    }
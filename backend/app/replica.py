@@ -0,0 +1,454 @@
+import json
+import os
+import shutil
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+import app.database as database
+from app import cold_archive, partitions
+from app.data_version import data_version
+from app.metrics import registry
+from config import Config
+
+try:
+    import fcntl
+except ImportError:
+    # No flock (Windows): refreshes are only serialized within this process
+    fcntl = None
+
+# <database>-replica/ holds read-only snapshot generations of the database,
+# each a directory gen-<ns>/ with a copy of the main file (SQLite backup API),
+# of every live partition and hard links to the cold archive files. MANIFEST
+# names the current generation and the data version it was copied at; it is
+# replaced atomically, so readers see either the old or the new generation.
+# Files unchanged since the last build are hard-linked, not copied: the main
+# file is only copied when what admin reads use from it has changed.
+MANIFEST_NAME = 'MANIFEST'
+
+def directory() -> str:
+    """Return the replica directory of the current DATABASE_PATH."""
+    return database.DATABASE_PATH + '-replica'
+
+def _signature(path: str) -> list:
+    """Return the (mtime, size) of a database file and its WAL, which change with every commit."""
+    signature = []
+    for suffix in ('', '-wal'):
+        try:
+            stat = os.stat(path + suffix)
+            signature += [stat.st_mtime_ns, stat.st_size]
+        except FileNotFoundError:
+            signature += [0, 0]
+    return signature
+
+def _main_signature(path: str) -> list:
+    """
+    Return the state of the main file that admin reads depend on: its users
+    and unpartitioned feedback, summed up by the dashboard_stats row.
+    
+    Sessions, password rehashes and the sentiment cache change the file
+    without changing this, so they do not cause a copy.
+    
+    Returns:
+        List of counters, or None if the rollup is missing (always copy)
+    """
+    conn = sqlite3.connect(partitions._uri(path, 'ro'), uri=True, timeout=Config.DB_BUSY_TIMEOUT_MS / 1000)
+    try:
+        row = conn.execute('''
+            SELECT total_users, total_feedback, rating_sum, positive_count, negative_count, neutral_count,
+                   (SELECT MAX(id) FROM users), (SELECT MAX(id) FROM feedback)
+            FROM dashboard_stats WHERE id = 1
+        ''').fetchone()
+    except sqlite3.OperationalError:
+        return None
+    finally:
+        conn.close()
+    return list(row) if row else None
+
+def _backup(source_path: str, target_path: str):
+    """Copy a live database file with the backup API into a standalone rollback-journal file."""
+    source = sqlite3.connect(source_path, timeout=Config.DB_BUSY_TIMEOUT_MS / 1000)
+    try:
+        target = sqlite3.connect(target_path)
+        try:
+            source.backup(target)
+            # A WAL-mode copy could not be opened read-only without its -shm
+            target.execute('PRAGMA journal_mode = DELETE')
+        finally:
+            target.close()
+    finally:
+        source.close()
+
+def _link(source_path: str, target_path: str):
+    """Hard-link a file into a generation, copying where links are not supported."""
+    try:
+        os.link(source_path, target_path)
+    except OSError:
+        shutil.copy2(source_path, target_path)
+
+class SnapshotReplica:
+    """
+    Background thread that keeps a read-only snapshot of the database for admin reads.
+    
+    Admin list, search and stats queries run against the snapshot, so they
+    never hold read locks or WAL pages that writers and checkpoints wait on.
+    The snapshot is rebuilt every refresh interval once the data version has
+    moved, copying only the files that changed; while nothing changes it is
+    only confirmed as current. Reads fall back to the primary when the
+    snapshot is older than the staleness bound.
+    """
+    
+    def __init__(self, interval: float = None, max_staleness: float = None, retain: float = None):
+        """
+        Initialize the replica; the thread starts on first read.
+        
+        Args:
+            interval: Seconds between refreshes
+            max_staleness: Seconds the snapshot may lag the primary before
+                reads go to the primary instead
+            retain: Seconds a superseded generation is kept for reads still using it
+        """
+        self.interval = interval or Config.REPLICA_REFRESH_INTERVAL_SECONDS
+        self.max_staleness = max_staleness if max_staleness is not None else Config.REPLICA_MAX_STALENESS_SECONDS
+        self.retain = retain if retain is not None else Config.REPLICA_RETAIN_SECONDS
+        self._forget()
+        if hasattr(os, 'register_at_fork'):
+            # A thread started in a preloading parent does not survive the fork
+            os.register_at_fork(after_in_child=self._forget)
+    
+    def _forget(self):
+        self._thread = None
+        self._lock = threading.Lock()
+        self._stopping = threading.Event()
+        self._manifest = (None, None)
+        self._pins = {}
+        self._stats = {
+            'refreshes': 0,
+            'builds': 0,
+            'failed_refreshes': 0,
+            'replica_reads': 0,
+            'primary_reads': 0,
+            'last_build_seconds': 0.0,
+            'last_build_copied': 0,
+            'last_build_linked': 0
+        }
+    
+    def start(self):
+        """Start the refresh thread if it is not already running."""
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._stopping.clear()
+            self._thread = threading.Thread(target=self._run, name='snapshot-replica', daemon=True)
+            self._thread.start()
+    
+    def stop(self, timeout: float = 5.0):
+        """
+        Stop the refresh thread and close the pools of every generation.
+        
+        Args:
+            timeout: Seconds to wait for the thread to finish
+        """
+        self._stopping.set()
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread is not None:
+            thread.join(timeout)
+        with self._lock:
+            paths = set(self._pins)
+            self._pins.clear()
+            self._manifest = (None, None)
+        for path in paths:
+            self._close(path)
+    
+    def manifest(self) -> dict:
+        """
+        Return the current generation's manifest, or None before the first build.
+        
+        The parsed manifest is cached and reloaded only when the file changes,
+        so every admin read can check it.
+        """
+        path = os.path.join(directory(), MANIFEST_NAME)
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            return None
+        signature = (path, stat.st_mtime_ns, stat.st_size)
+        cached_signature, manifest = self._manifest
+        if cached_signature == signature:
+            return manifest
+        try:
+            with open(path, 'r', encoding='utf-8') as handle:
+                manifest = json.load(handle)
+        except (OSError, ValueError):
+            return None
+        self._manifest = (signature, manifest)
+        return manifest
+    
+    def _write_manifest(self, manifest: dict):
+        path = os.path.join(directory(), MANIFEST_NAME)
+        with open(path + '.tmp', 'w', encoding='utf-8') as handle:
+            json.dump(manifest, handle)
+            handle.flush()
+            os.fsync(handle.fileno())
+        os.replace(path + '.tmp', path)
+    
+    @contextmanager
+    def _locked(self):
+        """Hold the replica directory lock (one refresh at a time across processes)."""
+        os.makedirs(directory(), exist_ok=True)
+        with open(os.path.join(directory(), 'lock'), 'a') as handle:
+            if fcntl is not None:
+                fcntl.flock(handle.fileno(), fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(handle.fileno(), fcntl.LOCK_UN)
+    
+    def lag(self, manifest: dict = None) -> float:
+        """
+        Return how many seconds the snapshot may be behind the primary.
+        
+        Zero while the data version is unchanged since the copy; otherwise the
+        time since the snapshot was last known to match (an upper bound).
+        
+        Args:
+            manifest: Manifest to measure (default: the current one)
+        
+        Returns:
+            Seconds, or None if there is no snapshot yet
+        """
+        manifest = manifest or self.manifest()
+        if manifest is None:
+            return None
+        if manifest['version'] == data_version.current():
+            return 0.0
+        return max(0.0, time.time() - manifest['as_of'])
+    
+    def refresh(self) -> bool:
+        """
+        Bring the snapshot up to the current data version.
+        
+        Returns:
+            True if a new generation was built, False if it was already current
+        """
+        # Always copies the primary, even when called inside reading()
+        with self._locked(), database.use_replica(None):
+            manifest = self.manifest()
+            as_of = time.time()
+            # Read the version before copying, so the snapshot can only be
+            # newer than the version it is tagged with, never older
+            version = data_version.current()
+            if manifest is not None and manifest['version'] == version:
+                manifest = dict(manifest, as_of=as_of)
+                self._write_manifest(manifest)
+                built = False
+            else:
+                manifest = self._build(manifest, version, as_of)
+                built = True
+            self._cleanup(manifest)
+        
+        with self._lock:
+            self._stats['refreshes'] += 1
+            if built:
+                self._stats['builds'] += 1
+        return built
+    
+    def _build(self, previous: dict, version: int, as_of: float) -> dict:
+        """Copy the changed files into a new generation and make it current."""
+        started = time.monotonic()
+        name = f'gen-{time.time_ns()}'
+        staging = os.path.join(directory(), name + '.tmp')
+        target = os.path.join(staging, os.path.basename(database.DATABASE_PATH))
+        os.makedirs(target + '-partitions', exist_ok=True)
+        copied = linked = 0
+        
+        # Main file: the signature is read first, so a copy is never older than it
+        main_signature = _main_signature(database.DATABASE_PATH)
+        previous_main = self._main_path(previous) if previous else None
+        unchanged = main_signature is not None and previous and previous.get('main') == main_signature
+        if unchanged and os.path.exists(previous_main):
+            _link(previous_main, target)
+            linked += 1
+        else:
+            _backup(database.DATABASE_PATH, target)
+            copied += 1
+        
+        # Partitions: likewise, copy the changed ones and link the rest
+        previous_signatures = previous['partitions'] if previous else {}
+        previous_partitions = self._main_path(previous) + '-partitions' if previous else None
+        signatures = {}
+        for key in partitions.keys(newest_first=False):
+            source = partitions.path_for(key)
+            destination = os.path.join(target + '-partitions', key + '.db')
+            signature = _signature(source)
+            if previous_signatures.get(key) == signature and os.path.exists(os.path.join(previous_partitions, key + '.db')):
+                _link(os.path.join(previous_partitions, key + '.db'), destination)
+                linked += 1
+            else:
+                _backup(source, destination)
+                copied += 1
+            signatures[key] = signature
+        
+        # Cold segments are append-only and their index is replaced, never edited
+        cold_keys = cold_archive.keys(newest_first=False)
+        if cold_keys:
+            cold_target = os.path.join(target + '-partitions', 'cold')
+            os.makedirs(cold_target, exist_ok=True)
+            for key in cold_keys:
+                _link(cold_archive.index_path(key), os.path.join(cold_target, key + '.idx'))
+                _link(cold_archive.segment_path(key), os.path.join(cold_target, key + '.seg'))
+        
+        os.rename(staging, os.path.join(directory(), name))
+        if previous:
+            # Its retention period starts now
+            try:
+                os.utime(os.path.join(directory(), previous['generation']))
+            except FileNotFoundError:
+                pass
+        
+        manifest = {
+            'generation': name,
+            'version': version,
+            'as_of': as_of,
+            'built_at': time.time(),
+            'main': main_signature,
+            'partitions': signatures
+        }
+        self._write_manifest(manifest)
+        
+        with self._lock:
+            self._stats['last_build_seconds'] = round(time.monotonic() - started, 4)
+            self._stats['last_build_copied'] = copied
+            self._stats['last_build_linked'] = linked
+        return manifest
+    
+    @staticmethod
+    def _main_path(manifest: dict) -> str:
+        """Return the main database file of a generation."""
+        return os.path.join(directory(), manifest['generation'], os.path.basename(database.DATABASE_PATH))
+    
+    def _cleanup(self, manifest: dict):
+        """
+        Close this process's connections to superseded generations no read
+        uses, and delete generations superseded longer ago than the retention
+        period.
+        """
+        current = self._main_path(manifest)
+        with self._lock:
+            idle = [main for main, count in self._pins.items() if count == 0 and main != current]
+            for main in idle:
+                del self._pins[main]
+        for main in idle:
+            self._close(main)
+        
+        now = time.time()
+        for name in os.listdir(directory()):
+            if not name.startswith('gen-') or name == manifest['generation']:
+                continue
+            path = os.path.join(directory(), name)
+            main = os.path.join(path, os.path.basename(database.DATABASE_PATH))
+            with self._lock:
+                pinned = main in self._pins
+            try:
+                expired = now - os.stat(path).st_mtime > self.retain or name.endswith('.tmp')
+            except FileNotFoundError:
+                continue
+            if pinned or not expired:
+                continue
+            self._close(main)
+            shutil.rmtree(path, ignore_errors=True)
+    
+    def _close(self, main: str):
+        """Release this process's connections and cached indexes of a generation."""
+        database.close_pools(main)
+        cold_archive.forget_indexes(main + '-partitions')
+    
+    @contextmanager
+    def reading(self):
+        """
+        Run the reads of a block against the snapshot, when it is fresh enough.
+        
+        Connections from get_db_connection() and partition paths resolve to
+        the current generation inside the block, which stays on disk until
+        the block ends. Without a snapshot, with replicas disabled or past
+        the staleness bound, the block reads the primary.
+        
+        Yields:
+            The generation's manifest (its 'version' tags the data), or None
+            when reading the primary
+        """
+        if not Config.REPLICA_ENABLED:
+            yield None
+            return
+        
+        self.start()
+        manifest = self.manifest()
+        lag = self.lag(manifest)
+        if lag is None or lag > self.max_staleness:
+            with self._lock:
+                self._stats['primary_reads'] += 1
+            yield None
+            return
+        
+        main = self._main_path(manifest)
+        with self._lock:
+            self._pins[main] = self._pins.get(main, 0) + 1
+            self._stats['replica_reads'] += 1
+        try:
+            with database.use_replica(main):
+                yield manifest
+        finally:
+            # Pools of a superseded generation are closed by the next refresh
+            with self._lock:
+                self._pins[main] -= 1
+    
+    def call(self, function, *args, **kwargs):
+        """Call a read function inside reading() and return its result."""
+        with self.reading():
+            return function(*args, **kwargs)
+    
+    def _run(self):
+        """Refresh immediately, then every interval until stopped."""
+        while not self._stopping.is_set():
+            try:
+                self.refresh()
+            except Exception as e:
+                print(f"Snapshot replica refresh failed: {str(e)}")
+                with self._lock:
+                    self._stats['failed_refreshes'] += 1
+            self._stopping.wait(self.interval)
+    
+    def status(self) -> dict:
+        """
+        Return the snapshot's lag and the refresh and read counters.
+        
+        Returns:
+            Dictionary with enabled/running/serving flags, lag, versions,
+            generation and counters
+        """
+        manifest = self.manifest() if Config.REPLICA_ENABLED else None
+        lag = self.lag(manifest) if manifest else None
+        with self._lock:
+            status = dict(self._stats)
+            status['running'] = self._thread is not None
+        status.update({
+            'enabled': Config.REPLICA_ENABLED,
+            'lag_seconds': None if lag is None else round(lag, 3),
+            'max_staleness_seconds': self.max_staleness,
+            'serving': lag is not None and lag <= self.max_staleness,
+            'version': manifest['version'] if manifest else None,
+            'primary_version': data_version.current(),
+            'generation': manifest['generation'] if manifest else None,
+            'built_at': manifest['built_at'] if manifest else None
+        })
+        return status
+
+# Shared replica, started by the first admin read
+read_replica = SnapshotReplica()
+
+registry.gauge(
+    'replica_lag_seconds', 'Seconds the admin read snapshot may be behind the primary (-1 before the first build)',
+    lambda: read_replica.lag() if read_replica.manifest() else -1
+)
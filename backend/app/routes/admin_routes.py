@@ -1,6 +1,16 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, Response, request, jsonify
 from app.services.auth_service import AuthenticationService
 from app.services.admin_service import AdminService
+from app.services.sentiment_queue import sentiment_queue
+from app.services.sentiment_service import SentimentAnalysisService
+from app.services.password_hasher import password_hasher
+from app.services.rate_limiter import rate_limiter
+from app.services.session_reaper import session_reaper
+from app.database import get_pool_stats
+from app.partitions import status as partition_status
+from app.http_cache import cached_json
+from app.metrics import registry
+from app.replica import read_replica
 
 admin_bp = Blueprint('admin', __name__, url_prefix='/api/admin')
 
@@ -14,9 +24,179 @@ def get_stats():
     if not session['valid'] or not session['is_admin']:
         return jsonify({'success': False, 'message': 'Unauthorized: Admin access required'}), 403
     
-    stats = AdminService.get_dashboard_stats()
+    return cached_json('admin.stats', lambda: {
+        'success': True,
+        'stats': AdminService.get_dashboard_stats()
+    }, replica=True)
+
+@admin_bp.route('/trends', methods=['GET'])
+def get_trends():
+    """Get hourly or daily feedback trends from the rollup buckets endpoint (admin only)."""
+    session_token = request.args.get('session_token')
+    
+    # Validate admin session
+    session = AuthenticationService.validate_session(session_token)
+    if not session['valid'] or not session['is_admin']:
+        return jsonify({'success': False, 'message': 'Unauthorized: Admin access required'}), 403
+    
+    try:
+        trends = read_replica.call(
+            AdminService.get_feedback_trends,
+            request.args.get('granularity', 'day'),
+            request.args.get('start'),
+            request.args.get('end')
+        )
+    except ValueError as e:
+        return jsonify({'success': False, 'message': str(e)}), 400
+    
+    return jsonify({
+        'success': True,
+        'trends': trends
+    }), 200
+
+@admin_bp.route('/db-pool', methods=['GET'])
+def get_db_pool():
+    """Get database connection pool statistics endpoint (admin only)."""
+    session_token = request.args.get('session_token')
+    
+    # Validate admin session
+    session = AuthenticationService.validate_session(session_token)
+    if not session['valid'] or not session['is_admin']:
+        return jsonify({'success': False, 'message': 'Unauthorized: Admin access required'}), 403
+    
+    return jsonify({
+        'success': True,
+        'pool': get_pool_stats()
+    }), 200
+
+@admin_bp.route('/session-cache', methods=['GET'])
+def get_session_cache():
+    """Get session cache hit/miss statistics endpoint (admin only)."""
+    session_token = request.args.get('session_token')
+    
+    # Validate admin session
+    session = AuthenticationService.validate_session(session_token)
+    if not session['valid'] or not session['is_admin']:
+        return jsonify({'success': False, 'message': 'Unauthorized: Admin access required'}), 403
+    
+    return jsonify({
+        'success': True,
+        'session_cache': AuthenticationService.get_session_cache_stats()
+    }), 200
+
+@admin_bp.route('/sentiment-queue', methods=['GET'])
+def get_sentiment_queue():
+    """Get background sentiment queue depth and lag endpoint (admin only)."""
+    session_token = request.args.get('session_token')
+    
+    # Validate admin session
+    session = AuthenticationService.validate_session(session_token)
+    if not session['valid'] or not session['is_admin']:
+        return jsonify({'success': False, 'message': 'Unauthorized: Admin access required'}), 403
+    
+    return jsonify({
+        'success': True,
+        'sentiment_queue': sentiment_queue.status()
+    }), 200
+
+@admin_bp.route('/sentiment-cache', methods=['GET'])
+def get_sentiment_cache():
+    """Get sentiment memoization cache hit ratio and size endpoint (admin only)."""
+    session_token = request.args.get('session_token')
+    
+    # Validate admin session
+    session = AuthenticationService.validate_session(session_token)
+    if not session['valid'] or not session['is_admin']:
+        return jsonify({'success': False, 'message': 'Unauthorized: Admin access required'}), 403
+    
+    return jsonify({
+        'success': True,
+        'sentiment_cache': SentimentAnalysisService.get_cache_stats()
+    }), 200
+
+@admin_bp.route('/password-hashing', methods=['GET'])
+def get_password_hashing():
+    """Get bcrypt pool usage and latency endpoint (admin only)."""
+    session_token = request.args.get('session_token')
+    
+    # Validate admin session
+    session = AuthenticationService.validate_session(session_token)
+    if not session['valid'] or not session['is_admin']:
+        return jsonify({'success': False, 'message': 'Unauthorized: Admin access required'}), 403
+    
+    return jsonify({
+        'success': True,
+        'password_hashing': password_hasher.stats()
+    }), 200
+
+@admin_bp.route('/rate-limits', methods=['GET'])
+def get_rate_limits():
+    """Get auth rate limiter settings and rejection counts endpoint (admin only)."""
+    session_token = request.args.get('session_token')
+    
+    # Validate admin session
+    session = AuthenticationService.validate_session(session_token)
+    if not session['valid'] or not session['is_admin']:
+        return jsonify({'success': False, 'message': 'Unauthorized: Admin access required'}), 403
+    
+    return jsonify({
+        'success': True,
+        'rate_limits': rate_limiter.stats()
+    }), 200
+
+@admin_bp.route('/partitions', methods=['GET'])
+def get_partitions():
+    """Get monthly feedback partitions with their size and row counts endpoint (admin only)."""
+    session_token = request.args.get('session_token')
+    
+    # Validate admin session
+    session = AuthenticationService.validate_session(session_token)
+    if not session['valid'] or not session['is_admin']:
+        return jsonify({'success': False, 'message': 'Unauthorized: Admin access required'}), 403
+    
+    return jsonify({
+        'success': True,
+        'partitions': partition_status()
+    }), 200
+
+@admin_bp.route('/sessions', methods=['GET'])
+def get_sessions():
+    """Get session count and expired-session reaper status endpoint (admin only)."""
+    session_token = request.args.get('session_token')
+    
+    # Validate admin session
+    session = AuthenticationService.validate_session(session_token)
+    if not session['valid'] or not session['is_admin']:
+        return jsonify({'success': False, 'message': 'Unauthorized: Admin access required'}), 403
     
     return jsonify({
         'success': True,
-        'stats': stats
+        'sessions': session_reaper.status()
     }), 200
+
+@admin_bp.route('/replica', methods=['GET'])
+def get_replica():
+    """Get snapshot replica lag and refresh status endpoint (admin only)."""
+    session_token = request.args.get('session_token')
+    
+    # Validate admin session
+    session = AuthenticationService.validate_session(session_token)
+    if not session['valid'] or not session['is_admin']:
+        return jsonify({'success': False, 'message': 'Unauthorized: Admin access required'}), 403
+    
+    return jsonify({
+        'success': True,
+        'replica': read_replica.status()
+    }), 200
+
+@admin_bp.route('/metrics', methods=['GET'])
+def get_metrics():
+    """Get request, SQL, sentiment and bcrypt metrics in Prometheus text format (admin only)."""
+    session_token = request.args.get('session_token')
+    
+    # Validate admin session
+    session = AuthenticationService.validate_session(session_token)
+    if not session['valid'] or not session['is_admin']:
+        return jsonify({'success': False, 'message': 'Unauthorized: Admin access required'}), 403
+    
+    return Response(registry.render(), mimetype='text/plain; version=0.0.4')
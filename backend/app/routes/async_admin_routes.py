@@ -0,0 +1,168 @@
+from quart import Blueprint, Response, request, jsonify
+from app.aio import run_db
+from app.services.auth_service import AuthenticationService
+from app.services.admin_service import AdminService
+from app.services.sentiment_queue import sentiment_queue
+from app.services.sentiment_service import SentimentAnalysisService
+from app.services.password_hasher import password_hasher
+from app.services.rate_limiter import rate_limiter
+from app.services.session_reaper import session_reaper
+from app.database import get_pool_stats
+from app.partitions import status as partition_status
+from app.http_cache import cached_json_async
+from app.metrics import registry
+from app.replica import read_replica
+
+admin_bp = Blueprint('admin', __name__, url_prefix='/api/admin')
+
+async def is_admin() -> bool:
+    """Check that the session_token query parameter belongs to an admin session."""
+    session = await AuthenticationService.validate_session_async(request.args.get('session_token'))
+    return session['valid'] and session['is_admin']
+
+def unauthorized():
+    return jsonify({'success': False, 'message': 'Unauthorized: Admin access required'}), 403
+
+@admin_bp.route('/stats', methods=['GET'])
+async def get_stats():
+    """Get dashboard statistics endpoint (admin only)."""
+    if not await is_admin():
+        return unauthorized()
+    
+    async def build():
+        return {
+            'success': True,
+            'stats': await run_db(AdminService.get_dashboard_stats)
+        }
+    
+    return await cached_json_async('admin.stats', build, replica=True)
+
+@admin_bp.route('/trends', methods=['GET'])
+async def get_trends():
+    """Get hourly or daily feedback trends from the rollup buckets endpoint (admin only)."""
+    if not await is_admin():
+        return unauthorized()
+    
+    try:
+        trends = await run_db(
+            read_replica.call,
+            AdminService.get_feedback_trends,
+            request.args.get('granularity', 'day'),
+            request.args.get('start'),
+            request.args.get('end')
+        )
+    except ValueError as e:
+        return jsonify({'success': False, 'message': str(e)}), 400
+    
+    return jsonify({
+        'success': True,
+        'trends': trends
+    }), 200
+
+@admin_bp.route('/db-pool', methods=['GET'])
+async def get_db_pool():
+    """Get database connection pool statistics endpoint (admin only)."""
+    if not await is_admin():
+        return unauthorized()
+    
+    return jsonify({
+        'success': True,
+        'pool': get_pool_stats()
+    }), 200
+
+@admin_bp.route('/session-cache', methods=['GET'])
+async def get_session_cache():
+    """Get session cache hit/miss statistics endpoint (admin only)."""
+    if not await is_admin():
+        return unauthorized()
+    
+    return jsonify({
+        'success': True,
+        'session_cache': AuthenticationService.get_session_cache_stats()
+    }), 200
+
+@admin_bp.route('/sentiment-queue', methods=['GET'])
+async def get_sentiment_queue():
+    """Get background sentiment queue depth and lag endpoint (admin only)."""
+    if not await is_admin():
+        return unauthorized()
+    
+    return jsonify({
+        'success': True,
+        'sentiment_queue': sentiment_queue.status()
+    }), 200
+
+@admin_bp.route('/sentiment-cache', methods=['GET'])
+async def get_sentiment_cache():
+    """Get sentiment memoization cache hit ratio and size endpoint (admin only)."""
+    if not await is_admin():
+        return unauthorized()
+    
+    return jsonify({
+        'success': True,
+        'sentiment_cache': await run_db(SentimentAnalysisService.get_cache_stats)
+    }), 200
+
+@admin_bp.route('/password-hashing', methods=['GET'])
+async def get_password_hashing():
+    """Get bcrypt pool usage and latency endpoint (admin only)."""
+    if not await is_admin():
+        return unauthorized()
+    
+    return jsonify({
+        'success': True,
+        'password_hashing': password_hasher.stats()
+    }), 200
+
+@admin_bp.route('/rate-limits', methods=['GET'])
+async def get_rate_limits():
+    """Get auth rate limiter settings and rejection counts endpoint (admin only)."""
+    if not await is_admin():
+        return unauthorized()
+    
+    stats = await run_db(rate_limiter.stats) if rate_limiter.backend == 'sqlite' else rate_limiter.stats()
+    return jsonify({
+        'success': True,
+        'rate_limits': stats
+    }), 200
+
+@admin_bp.route('/partitions', methods=['GET'])
+async def get_partitions():
+    """Get monthly feedback partitions with their size and row counts endpoint (admin only)."""
+    if not await is_admin():
+        return unauthorized()
+    
+    return jsonify({
+        'success': True,
+        'partitions': await run_db(partition_status)
+    }), 200
+
+@admin_bp.route('/sessions', methods=['GET'])
+async def get_sessions():
+    """Get session count and expired-session reaper status endpoint (admin only)."""
+    if not await is_admin():
+        return unauthorized()
+    
+    return jsonify({
+        'success': True,
+        'sessions': await run_db(session_reaper.status)
+    }), 200
+
+@admin_bp.route('/replica', methods=['GET'])
+async def get_replica():
+    """Get snapshot replica lag and refresh status endpoint (admin only)."""
+    if not await is_admin():
+        return unauthorized()
+    
+    return jsonify({
+        'success': True,
+        'replica': await run_db(read_replica.status)
+    }), 200
+
+@admin_bp.route('/metrics', methods=['GET'])
+async def get_metrics():
+    """Get request, SQL, sentiment and bcrypt metrics in Prometheus text format (admin only)."""
+    if not await is_admin():
+        return unauthorized()
+    
+    return Response(registry.render(), mimetype='text/plain; version=0.0.4')
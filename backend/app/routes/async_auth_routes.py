@@ -0,0 +1,106 @@
+from quart import Blueprint, request, jsonify
+from app.aio import run_db
+from app.services.auth_service import AuthenticationService
+from app.services.rate_limiter import rate_limiter
+from config import Config
+
+auth_bp = Blueprint('auth', __name__, url_prefix='/api/auth')
+
+def overloaded(result: dict):
+    """Build a 503 response asking the client to retry after a short delay."""
+    return jsonify({'success': False, 'message': result['message']}), 503, {
+        'Retry-After': str(Config.BCRYPT_RETRY_AFTER_SECONDS)
+    }
+
+def too_many_attempts(wait: float):
+    """Build a 429 response for an attempt the rate limiter rejected."""
+    return jsonify({'success': False, 'message': 'Too many attempts, please try again later'}), 429, {
+        'Retry-After': rate_limiter.retry_after(wait)
+    }
+
+@auth_bp.route('/register', methods=['POST'])
+async def register():
+    """User registration endpoint."""
+    data = await request.get_json(silent=True)
+    
+    if not data:
+        return jsonify({'success': False, 'message': 'No data provided'}), 400
+    
+    username = data.get('username')
+    email = data.get('email')
+    password = data.get('password')
+    
+    # Throttle before any password hashing
+    wait = await rate_limiter.check_async(rate_limiter.client_ip(request), username)
+    if wait:
+        return too_many_attempts(wait)
+    
+    result = await AuthenticationService.register_user_async(username, email, password)
+    
+    if result.get('overloaded'):
+        return overloaded(result)
+    
+    status_code = 200 if result['success'] else 400
+    if not result['success'] and 'already exists' in result['message']:
+        status_code = 409
+    
+    return jsonify(result), status_code
+
+@auth_bp.route('/login', methods=['POST'])
+async def login():
+    """User login endpoint."""
+    data = await request.get_json(silent=True)
+    
+    if not data:
+        return jsonify({'success': False, 'message': 'No data provided'}), 400
+    
+    username = data.get('username')
+    password = data.get('password')
+    
+    # Throttle before any password hashing
+    wait = await rate_limiter.check_async(rate_limiter.client_ip(request), username)
+    if wait:
+        return too_many_attempts(wait)
+    
+    result = await AuthenticationService.login_user_async(username, password)
+    
+    if result.get('overloaded'):
+        return overloaded(result)
+    
+    status_code = 200 if result['success'] else 401
+    return jsonify(result), status_code
+
+@auth_bp.route('/logout', methods=['POST'])
+async def logout():
+    """User logout endpoint."""
+    data = await request.get_json(silent=True)
+    
+    if not data:
+        return jsonify({'success': False, 'message': 'No data provided'}), 400
+    
+    session_token = data.get('session_token')
+    result = await run_db(AuthenticationService.logout, session_token)
+    
+    status_code = 200 if result['success'] else 400
+    return jsonify(result), status_code
+
+@auth_bp.route('/admin/login', methods=['POST'])
+async def admin_login():
+    """Admin login endpoint."""
+    data = await request.get_json(silent=True)
+    
+    if not data:
+        return jsonify({'success': False, 'message': 'No data provided'}), 400
+    
+    username = data.get('username')
+    password = data.get('password')
+    
+    # Throttle before any password hashing
+    wait = await rate_limiter.check_async(rate_limiter.client_ip(request), username)
+    if wait:
+        return too_many_attempts(wait)
+    
+    result = await run_db(AuthenticationService.login_admin, username, password)
+    
+    status_code = 200 if result['success'] else 401
+    return jsonify(result), status_code
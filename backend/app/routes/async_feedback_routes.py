@@ -0,0 +1,255 @@
+import asyncio
+import io
+import json
+import queue
+from datetime import datetime
+from itertools import islice
+from quart import Blueprint, Response, request, jsonify
+from app import wire_format
+from app.aio import run_db, run_cpu, iterate_in_executor
+from app.http_cache import cached_json_async
+from app.routes.feedback_routes import filters_from_args
+from app.services.auth_service import AuthenticationService
+from app.services.feedback_service import FeedbackService
+from app.services.import_service import FeedbackImportService
+from app.services.export_service import FeedbackExportService
+from app.services.sentiment_service import SentimentAnalysisService
+from app.services.sentiment_queue import sentiment_queue
+from config import Config
+
+feedback_bp = Blueprint('feedback', __name__, url_prefix='/api/feedback')
+
+def unauthorized():
+    return jsonify({'success': False, 'message': 'Unauthorized: Admin access required'}), 403
+
+def ndjson_chunks(rows, chunk_size: int = 500):
+    """Group rows into NDJSON text chunks so each executor hop encodes many rows."""
+    while True:
+        chunk = list(islice(rows, chunk_size))
+        if not chunk:
+            break
+        yield ''.join(json.dumps(row) + '\n' for row in chunk)
+
+class BodyReader(io.RawIOBase):
+    """
+    Blocking reader over request body chunks handed across from the event loop.
+    
+    None ends the body; an exception put in the queue (the client went away)
+    is raised to the reader, as is a wait longer than IMPORT_BODY_TIMEOUT_SECONDS,
+    so the importer never holds its executor thread and connection forever.
+    """
+    
+    def __init__(self, chunks: queue.Queue):
+        self._chunks = chunks
+        self._pending = b''
+        self._finished = False
+    
+    def readable(self) -> bool:
+        return True
+    
+    def readinto(self, buffer) -> int:
+        while not self._pending and not self._finished:
+            try:
+                chunk = self._chunks.get(timeout=Config.IMPORT_BODY_TIMEOUT_SECONDS)
+            except queue.Empty:
+                raise TimeoutError('Timed out waiting for the request body')
+            if chunk is None:
+                self._finished = True
+            elif isinstance(chunk, Exception):
+                raise chunk
+            else:
+                self._pending = chunk
+        
+        size = min(len(buffer), len(self._pending))
+        buffer[:size] = self._pending[:size]
+        self._pending = self._pending[size:]
+        return size
+
+@feedback_bp.route('', methods=['POST'])
+async def submit_feedback():
+    """Submit feedback endpoint (authenticated users only)."""
+    data = await request.get_json(silent=True)
+    
+    if not data:
+        return jsonify({'success': False, 'message': 'No data provided'}), 400
+    
+    session_token = data.get('session_token')
+    rating = data.get('rating')
+    comment = data.get('comment')
+    
+    # Validate session
+    session = await AuthenticationService.validate_session_async(session_token)
+    if not session['valid']:
+        return jsonify({'success': False, 'message': 'Unauthorized: Please login'}), 401
+    
+    if session['is_admin']:
+        return jsonify({'success': False, 'message': 'Admins cannot submit feedback'}), 403
+    
+    # Create feedback
+    result = await run_db(FeedbackService.create_feedback, session['user_id'], rating, comment)
+    
+    if result['success']:
+        # Classify in the background; fall back to inline analysis if the queue is full
+        if Config.SENTIMENT_ASYNC and sentiment_queue.enqueue(result['feedback_id'], comment):
+            result['sentiment'] = 'pending'
+        else:
+            sentiment = await run_cpu(SentimentAnalysisService.analyze_and_store, result['feedback_id'], comment)
+            result['sentiment'] = sentiment
+    
+    status_code = 200 if result['success'] else 400
+    return jsonify(result), status_code
+
+@feedback_bp.route('', methods=['GET'])
+async def get_feedback():
+    """
+    Get feedback endpoint (admin only).
+    
+    Returns the full list by default. With limit and/or cursor it returns one
+    keyset page plus next_cursor; with format=ndjson it streams rows instead.
+    layout=columns sends the rows as parallel arrays, format=msgpack (or
+    Accept) as MessagePack, and Accept-Encoding picks gzip or br.
+    """
+    session = await AuthenticationService.validate_session_async(request.args.get('session_token'))
+    if not session['valid'] or not session['is_admin']:
+        return unauthorized()
+    
+    # Get filters from query params
+    filters = filters_from_args(request.args)
+    
+    limit = request.args.get('limit', type=int)
+    cursor = request.args.get('cursor')
+    stream = (request.args.get('format') == 'ndjson'
+              or request.accept_mimetypes.best == 'application/x-ndjson')
+    
+    if limit is not None and not 1 <= limit <= Config.FEEDBACK_PAGE_MAX_LIMIT:
+        return jsonify({
+            'success': False,
+            'message': f'limit must be between 1 and {Config.FEEDBACK_PAGE_MAX_LIMIT}'
+        }), 400
+    
+    try:
+        layout = wire_format.parse_layout(request.args)
+    except ValueError as e:
+        return jsonify({'success': False, 'message': str(e)}), 400
+    
+    if cursor:
+        try:
+            FeedbackService.decode_cursor(cursor)
+            if filters.get('sort') == 'relevance':
+                raise ValueError('Cursor pagination is not supported with relevance ordering')
+        except ValueError as e:
+            return jsonify({'success': False, 'message': str(e)}), 400
+    
+    if stream:
+        # One JSON object per line, read from the cursor in chunks off the event loop
+        rows = FeedbackService.iter_feedback(filters if filters else None, cursor, limit)
+        return Response(iterate_in_executor(ndjson_chunks(rows)), mimetype='application/x-ndjson')
+    
+    if limit is not None or cursor:
+        async def build_page():
+            page = await run_db(
+                FeedbackService.get_feedback_page,
+                filters if filters else None,
+                limit or Config.FEEDBACK_PAGE_DEFAULT_LIMIT,
+                cursor
+            )
+            feedback_list = page['feedback']
+            if layout == 'columns':
+                feedback_list = FeedbackService.to_columns(feedback_list)
+            return {
+                'success': True,
+                'feedback': feedback_list,
+                'next_cursor': page['next_cursor']
+            }
+        
+        return await cached_json_async('feedback.page', build_page, replica=True)
+    
+    async def build_list():
+        if layout == 'columns':
+            get_list = FeedbackService.get_all_feedback_columns
+        else:
+            get_list = FeedbackService.get_all_feedback
+        return {
+            'success': True,
+            'feedback': await run_db(get_list, filters if filters else None)
+        }
+    
+    return await cached_json_async('feedback.list', build_list, replica=True)
+
+@feedback_bp.route('/import', methods=['POST'])
+async def import_feedback():
+    """
+    Bulk import feedback endpoint (admin only).
+    
+    The body is handed chunk by chunk to the importer running on the DB
+    executor, through a small bounded queue, so it is never held in full.
+    """
+    session = await AuthenticationService.validate_session_async(request.args.get('session_token'))
+    if not session['valid'] or not session['is_admin']:
+        return unauthorized()
+    
+    file_format = request.args.get('format')
+    if not file_format:
+        file_format = 'csv' if request.mimetype == 'text/csv' else 'ndjson'
+    
+    batch_size = request.args.get('batch_size', type=int)
+    if batch_size is not None and not 1 <= batch_size <= Config.IMPORT_MAX_BATCH_SIZE:
+        return jsonify({
+            'success': False,
+            'message': f'batch_size must be between 1 and {Config.IMPORT_MAX_BATCH_SIZE}'
+        }), 400
+    
+    chunks = queue.Queue(maxsize=8)
+    lines = io.TextIOWrapper(io.BufferedReader(BodyReader(chunks)), encoding='utf-8', newline='')
+    task = asyncio.ensure_future(run_db(FeedbackImportService.import_feedback, lines, file_format, batch_size))
+    
+    async def feed(chunk):
+        # Wait for room without blocking the loop; give up if the importer stopped reading
+        while not task.done():
+            try:
+                chunks.put_nowait(chunk)
+                return
+            except queue.Full:
+                await asyncio.sleep(0.001)
+    
+    complete = False
+    try:
+        async for chunk in request.body:
+            await feed(chunk)
+        complete = True
+    finally:
+        # Always end the body; one cut short fails the import rather than
+        # committing a truncated last batch
+        await feed(None if complete else ConnectionAbortedError('Request body ended early'))
+    result = await task
+    
+    status_code = 200 if result['success'] else 400
+    return jsonify(result), status_code
+
+@feedback_bp.route('/export', methods=['GET'])
+async def export_feedback():
+    """
+    Export feedback endpoint (admin only).
+    
+    Streams every row matching the get_all_feedback filters as CSV, NDJSON
+    or Parquet; each chunk is read and encoded on the DB executor.
+    """
+    session = await AuthenticationService.validate_session_async(request.args.get('session_token'))
+    if not session['valid'] or not session['is_admin']:
+        return unauthorized()
+    
+    file_format = request.args.get('format', 'csv')
+    filters = filters_from_args(request.args)
+    
+    try:
+        body = FeedbackExportService.export(filters if filters else None, file_format)
+    except ValueError as e:
+        return jsonify({'success': False, 'message': str(e)}), 400
+    
+    mimetype, extension = FeedbackExportService.FORMATS[file_format]
+    filename = f"feedback-{datetime.now().strftime('%Y%m%d-%H%M%S')}.{extension}"
+    return Response(
+        iterate_in_executor(body),
+        mimetype=mimetype,
+        headers={'Content-Disposition': f'attachment; filename="{filename}"'}
+    )
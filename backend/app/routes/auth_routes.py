@@ -1,8 +1,22 @@
 from flask import Blueprint, request, jsonify
 from app.services.auth_service import AuthenticationService
+from app.services.rate_limiter import rate_limiter
+from config import Config
 
 auth_bp = Blueprint('auth', __name__, url_prefix='/api/auth')
 
+def overloaded(result: dict):
+    """Build a 503 response asking the client to retry after a short delay."""
+    response = jsonify({'success': False, 'message': result['message']})
+    response.headers['Retry-After'] = str(Config.BCRYPT_RETRY_AFTER_SECONDS)
+    return response, 503
+
+def too_many_attempts(wait: float):
+    """Build a 429 response for an attempt the rate limiter rejected."""
+    response = jsonify({'success': False, 'message': 'Too many attempts, please try again later'})
+    response.headers['Retry-After'] = rate_limiter.retry_after(wait)
+    return response, 429
+
 @auth_bp.route('/register', methods=['POST'])
 def register():
     """User registration endpoint."""
@@ -15,8 +29,16 @@ def register():
     email = data.get('email')
     password = data.get('password')
     
+    # Throttle before any password hashing
+    wait = rate_limiter.check(rate_limiter.client_ip(request), username)
+    if wait:
+        return too_many_attempts(wait)
+    
     result = AuthenticationService.register_user(username, email, password)
     
+    if result.get('overloaded'):
+        return overloaded(result)
+    
     status_code = 200 if result['success'] else 400
     if not result['success'] and 'already exists' in result['message']:
         status_code = 409
@@ -34,8 +56,16 @@ def login():
     username = data.get('username')
     password = data.get('password')
     
+    # Throttle before any password hashing
+    wait = rate_limiter.check(rate_limiter.client_ip(request), username)
+    if wait:
+        return too_many_attempts(wait)
+    
     result = AuthenticationService.login_user(username, password)
     
+    if result.get('overloaded'):
+        return overloaded(result)
+    
     status_code = 200 if result['success'] else 401
     return jsonify(result), status_code
 
@@ -64,6 +94,11 @@ def admin_login():
     username = data.get('username')
     password = data.get('password')
     
+    # Throttle before any password hashing
+    wait = rate_limiter.check(rate_limiter.client_ip(request), username)
+    if wait:
+        return too_many_attempts(wait)
+    
     result = AuthenticationService.login_admin(username, password)
     
     status_code = 200 if result['success'] else 401
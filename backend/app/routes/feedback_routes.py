@@ -1,10 +1,39 @@
-from flask import Blueprint, request, jsonify
+import io
+import json
+from datetime import datetime
+from flask import Blueprint, Response, request, jsonify, stream_with_context
+from app import wire_format
+from app.http_cache import cached_json
 from app.services.auth_service import AuthenticationService
 from app.services.feedback_service import FeedbackService
+from app.services.import_service import FeedbackImportService
+from app.services.export_service import FeedbackExportService
 from app.services.sentiment_service import SentimentAnalysisService
+from app.services.sentiment_queue import sentiment_queue
+from config import Config
 
 feedback_bp = Blueprint('feedback', __name__, url_prefix='/api/feedback')
 
+def filters_from_args(args=None) -> dict:
+    """Read the sentiment, rating, search, sort and archived filters from the query string."""
+    args = request.args if args is None else args
+    sentiment = args.get('sentiment')
+    rating = args.get('rating', type=int)
+    search = args.get('search')
+    
+    filters = {}
+    if sentiment:
+        filters['sentiment'] = sentiment
+    if rating:
+        filters['rating'] = rating
+    if search:
+        filters['search'] = search
+        if args.get('sort') == 'relevance':
+            filters['sort'] = 'relevance'
+    if args.get('archived') in ('1', 'true'):
+        filters['archived'] = True
+    return filters
+
 @feedback_bp.route('', methods=['POST'])
 def submit_feedback():
     """Submit feedback endpoint (authenticated users only)."""
@@ -29,16 +58,26 @@ def submit_feedback():
     result = FeedbackService.create_feedback(session['user_id'], rating, comment)
     
     if result['success']:
-        # Analyze sentiment
-        sentiment = SentimentAnalysisService.analyze_and_store(result['feedback_id'], comment)
-        result['sentiment'] = sentiment
+        # Classify in the background; fall back to inline analysis if the queue is full
+        if Config.SENTIMENT_ASYNC and sentiment_queue.enqueue(result['feedback_id'], comment):
+            result['sentiment'] = 'pending'
+        else:
+            sentiment = SentimentAnalysisService.analyze_and_store(result['feedback_id'], comment)
+            result['sentiment'] = sentiment
     
     status_code = 200 if result['success'] else 400
     return jsonify(result), status_code
 
 @feedback_bp.route('', methods=['GET'])
 def get_feedback():
-    """Get all feedback endpoint (admin only)."""
+    """
+    Get feedback endpoint (admin only).
+    
+    Returns the full list by default. With limit and/or cursor it returns one
+    keyset page plus next_cursor; with format=ndjson it streams rows instead.
+    layout=columns sends the rows as parallel arrays, format=msgpack (or
+    Accept) as MessagePack, and Accept-Encoding picks gzip or br.
+    """
     session_token = request.args.get('session_token')
     
     # Validate admin session
@@ -47,21 +86,127 @@ def get_feedback():
         return jsonify({'success': False, 'message': 'Unauthorized: Admin access required'}), 403
     
     # Get filters from query params
-    sentiment = request.args.get('sentiment')
-    rating = request.args.get('rating', type=int)
-    search = request.args.get('search')
+    filters = filters_from_args()
     
-    filters = {}
-    if sentiment:
-        filters['sentiment'] = sentiment
-    if rating:
-        filters['rating'] = rating
-    if search:
-        filters['search'] = search
+    limit = request.args.get('limit', type=int)
+    cursor = request.args.get('cursor')
+    stream = (request.args.get('format') == 'ndjson'
+              or request.accept_mimetypes.best == 'application/x-ndjson')
+    
+    if limit is not None and not 1 <= limit <= Config.FEEDBACK_PAGE_MAX_LIMIT:
+        return jsonify({
+            'success': False,
+            'message': f'limit must be between 1 and {Config.FEEDBACK_PAGE_MAX_LIMIT}'
+        }), 400
+    
+    try:
+        layout = wire_format.parse_layout(request.args)
+    except ValueError as e:
+        return jsonify({'success': False, 'message': str(e)}), 400
+    
+    if cursor:
+        try:
+            FeedbackService.decode_cursor(cursor)
+            if filters.get('sort') == 'relevance':
+                raise ValueError('Cursor pagination is not supported with relevance ordering')
+        except ValueError as e:
+            return jsonify({'success': False, 'message': str(e)}), 400
+    
+    if stream:
+        # One JSON object per line, read from the cursor in chunks
+        rows = FeedbackService.iter_feedback(filters if filters else None, cursor, limit)
+        body = (json.dumps(row) + '\n' for row in rows)
+        return Response(stream_with_context(body), mimetype='application/x-ndjson')
+    
+    if limit is not None or cursor:
+        def build_page():
+            page = FeedbackService.get_feedback_page(
+                filters if filters else None,
+                limit or Config.FEEDBACK_PAGE_DEFAULT_LIMIT,
+                cursor
+            )
+            feedback_list = page['feedback']
+            if layout == 'columns':
+                feedback_list = FeedbackService.to_columns(feedback_list)
+            return {
+                'success': True,
+                'feedback': feedback_list,
+                'next_cursor': page['next_cursor']
+            }
+        
+        return cached_json('feedback.page', build_page, replica=True)
+    
+    def build_list():
+        if layout == 'columns':
+            feedback_list = FeedbackService.get_all_feedback_columns(filters if filters else None)
+        else:
+            feedback_list = FeedbackService.get_all_feedback(filters if filters else None)
+        return {
+            'success': True,
+            'feedback': feedback_list
+        }
+    
+    return cached_json('feedback.list', build_list, replica=True)
+
+@feedback_bp.route('/import', methods=['POST'])
+def import_feedback():
+    """
+    Bulk import feedback endpoint (admin only).
+    
+    The request body is NDJSON or CSV (with a header row), chosen by the
+    format query parameter or the Content-Type, and is parsed as it streams in.
+    """
+    session_token = request.args.get('session_token')
+    
+    # Validate admin session
+    session = AuthenticationService.validate_session(session_token)
+    if not session['valid'] or not session['is_admin']:
+        return jsonify({'success': False, 'message': 'Unauthorized: Admin access required'}), 403
+    
+    file_format = request.args.get('format')
+    if not file_format:
+        file_format = 'csv' if request.mimetype == 'text/csv' else 'ndjson'
+    
+    batch_size = request.args.get('batch_size', type=int)
+    if batch_size is not None and not 1 <= batch_size <= Config.IMPORT_MAX_BATCH_SIZE:
+        return jsonify({
+            'success': False,
+            'message': f'batch_size must be between 1 and {Config.IMPORT_MAX_BATCH_SIZE}'
+        }), 400
+    
+    lines = io.TextIOWrapper(request.stream, encoding='utf-8', newline='')
+    result = FeedbackImportService.import_feedback(lines, file_format, batch_size)
+    
+    status_code = 200 if result['success'] else 400
+    return jsonify(result), status_code
+
+@feedback_bp.route('/export', methods=['GET'])
+def export_feedback():
+    """
+    Export feedback endpoint (admin only).
+    
+    Streams every row matching the get_all_feedback filters as CSV, NDJSON
+    or Parquet, read and encoded in fixed-size chunks.
+    """
+    session_token = request.args.get('session_token')
+    
+    # Validate admin session
+    session = AuthenticationService.validate_session(session_token)
+    if not session['valid'] or not session['is_admin']:
+        return jsonify({'success': False, 'message': 'Unauthorized: Admin access required'}), 403
+    
+    file_format = request.args.get('format', 'csv')
+    filters = filters_from_args()
     
-    feedback_list = FeedbackService.get_all_feedback(filters if filters else None)
+    try:
+        body = FeedbackExportService.export(filters if filters else None, file_format)
+    except ValueError as e:
+        return jsonify({'success': False, 'message': str(e)}), 400
     
-    return jsonify({
-        'success': True,
-        'feedback': feedback_list
-    }), 200
+    mimetype, extension = FeedbackExportService.FORMATS[file_format]
+    filename = f"feedback-{datetime.now().strftime('%Y%m%d-%H%M%S')}.{extension}"
+    return Response(
+        stream_with_context(body),
+        mimetype=mimetype,
+        headers={'Content-Disposition': f'attachment; filename="{filename}"'}
+    )
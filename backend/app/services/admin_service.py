@@ -1,12 +1,31 @@
-from app.database import get_db_connection
+from datetime import datetime, timedelta, timezone
+from app import cold_archive, partitions
+from app.data_version import data_version
+from app.database import (
+    get_db_connection,
+    compute_stats_from_scratch,
+    rebuild_stats_rollup,
+    compute_trends_from_scratch,
+    rebuild_trend_rollup,
+    TREND_COUNTERS
+)
+from config import Config
 
 class AdminService:
     """Service for admin dashboard operations."""
     
+    STATS_COUNTERS = (
+        'total_users', 'total_feedback', 'rating_sum', 'positive_count', 'negative_count', 'neutral_count'
+    )
+    
     @staticmethod
     def get_dashboard_stats() -> dict:
         """
-        Calculate and return dashboard statistics.
+        Return dashboard statistics from the incrementally maintained rollups.
+        
+        The main database counts users; every feedback partition keeps the
+        counters of its own rows, and they are summed here (one row each)
+        with the counters recorded in the cold archive indexes.
         
         Returns:
             Dictionary with total_users, total_feedback, sentiment_distribution, and average_rating
@@ -15,47 +34,319 @@ class AdminService:
         cursor = conn.cursor()
         
         try:
-            # Get total users
-            cursor.execute('SELECT COUNT(*) as count FROM users')
-            total_users = cursor.fetchone()['count']
+            # Counters are maintained incrementally by triggers (see init_stats_rollup)
+            query = f"SELECT {', '.join(AdminService.STATS_COUNTERS)} FROM {{schema}}.dashboard_stats WHERE id = 1"
+            cursor.execute(query.format(schema='main'))
+            totals = dict(cursor.fetchone())
+            for key in partitions.keys():
+                with partitions.attached(conn, key) as schema:
+                    row = conn.execute(query.format(schema=schema)).fetchone()
+                for name in AdminService.STATS_COUNTERS:
+                    totals[name] += row[name]
+            for name, value in cold_archive.totals().items():
+                totals[name] += value
+            
+            total_feedback = totals['total_feedback']
+            average_rating = round(totals['rating_sum'] / total_feedback, 2) if total_feedback else 0.0
             
-            # Get total feedback
-            cursor.execute('SELECT COUNT(*) as count FROM feedback')
-            total_feedback = cursor.fetchone()['count']
+            return {
+                'total_users': totals['total_users'],
+                'total_feedback': total_feedback,
+                'sentiment_distribution': {
+                    'positive': totals['positive_count'],
+                    'negative': totals['negative_count'],
+                    'neutral': totals['neutral_count']
+                },
+                'average_rating': average_rating
+            }
             
-            # Get sentiment distribution
+        finally:
+            conn.close()
+    
+    @staticmethod
+    def _verify_stats_file(conn, include_users: bool, repair: bool) -> tuple:
+        """
+        Compare the dashboard_stats row of one database file with a recount.
+        
+        Args:
+            conn: Connection to the main database or a partition
+            include_users: False for a partition (see init_stats_rollup)
+            repair: Rebuild the row if it drifted
+            
+        Returns:
+            Tuple of (per-counter drift, repaired flag)
+        """
+        cursor = conn.cursor()
+        
+        try:
+            # Read both sides in one transaction so concurrent writes cannot fake drift
+            cursor.execute('BEGIN IMMEDIATE')
+            expected = compute_stats_from_scratch(cursor, include_users)
             cursor.execute('''
-                SELECT 
-                    sentiment,
-                    COUNT(*) as count
-                FROM feedback
-                WHERE sentiment IS NOT NULL
-                GROUP BY sentiment
+                SELECT total_users, total_feedback, rating_sum,
+                       positive_count, negative_count, neutral_count
+                FROM dashboard_stats
+                WHERE id = 1
             ''')
-            sentiment_rows = cursor.fetchall()
+            row = cursor.fetchone()
+            actual = dict(row) if row else {}
             
-            sentiment_distribution = {
-                'positive': 0,
-                'negative': 0,
-                'neutral': 0
-            }
-            for row in sentiment_rows:
-                sentiment_distribution[row['sentiment']] = row['count']
+            drift = {}
+            for name, value in expected.items():
+                if actual.get(name) != value:
+                    drift[name] = {'rollup': actual.get(name), 'actual': value}
             
-            # Get average rating
-            cursor.execute('SELECT AVG(rating) as avg_rating FROM feedback')
-            avg_result = cursor.fetchone()
-            average_rating = round(avg_result['avg_rating'], 2) if avg_result['avg_rating'] else 0.0
+            repaired = False
+            if drift and repair:
+                rebuild_stats_rollup(cursor, include_users)
+                repaired = True
+            conn.commit()
+            return drift, repaired
             
-            return {
-                'total_users': total_users,
-                'total_feedback': total_feedback,
-                'sentiment_distribution': sentiment_distribution,
-                'average_rating': average_rating
-            }
+        except Exception:
+            conn.rollback()
+            raise
+    
+    @staticmethod
+    def verify_stats_rollup(repair: bool = False) -> dict:
+        """
+        Recompute the dashboard counters from scratch and compare with the rollups.
+        
+        The main database and every feedback partition are checked on their
+        own; drift in a partition is reported as '<YYYY-MM> <counter>'.
+        
+        Args:
+            repair: Overwrite a rollup with the recomputed values if it drifted
+            
+        Returns:
+            Dictionary with consistent flag, per-counter drift, and repaired flag
+        """
+        conn = get_db_connection()
+        try:
+            drift, repaired = AdminService._verify_stats_file(conn, True, repair)
+        finally:
+            conn.close()
+        
+        for key in partitions.keys():
+            conn = partitions.connect(key)
+            try:
+                partition_drift, partition_repaired = AdminService._verify_stats_file(conn, False, repair)
+            finally:
+                conn.close()
+            drift.update({f'{key} {name}': values for name, values in partition_drift.items()})
+            repaired = repaired or partition_repaired
+        
+        if repaired:
+            data_version.bump()
+        
+        return {
+            'consistent': not drift,
+            'drift': drift,
+            'repaired': repaired
+        }
+    
+    # Bucket width and the strftime format of a bucket's start, per granularity
+    TREND_GRANULARITIES = {
+        'hour': (timedelta(hours=1), '%Y-%m-%d %H:00:00'),
+        'day': (timedelta(days=1), '%Y-%m-%d 00:00:00')
+    }
+    
+    @staticmethod
+    def _parse_trend_time(value: str, name: str) -> datetime:
+        """Parse an ISO 8601 start/end parameter as naive UTC (like created_at)."""
+        try:
+            parsed = datetime.fromisoformat(value.strip().replace('Z', '+00:00'))
+        except ValueError:
+            raise ValueError(f'{name} must be an ISO 8601 timestamp')
+        if parsed.tzinfo is not None:
+            parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+        return parsed
+    
+    @staticmethod
+    def get_feedback_trends(granularity: str = 'day', start: str = None, end: str = None) -> dict:
+        """
+        Return feedback counts, sentiment and rating distributions per time bucket.
+        
+        Reads only the feedback_trends rollup rows of the range (one primary
+        key range scan in each monthly partition the range touches, and the
+        buckets stored in the cold archive indexes), so the cost depends on
+        the number of buckets, never on the size of the feedback table.
+        Buckets without feedback are returned with zero counts, so the
+        series is contiguous.
+        
+        Args:
+            granularity: 'hour' or 'day'
+            start: First bucket to include, ISO 8601 (defaults to
+                TRENDS_DEFAULT_BUCKETS before end)
+            end: Last bucket to include, ISO 8601 (defaults to now, UTC)
+            
+        Returns:
+            Dictionary with granularity, start, end, buckets and range totals
+            
+        Raises:
+            ValueError: If the granularity or range is invalid or too long
+        """
+        if granularity not in AdminService.TREND_GRANULARITIES:
+            raise ValueError(f"granularity must be one of: {', '.join(AdminService.TREND_GRANULARITIES)}")
+        width, bucket_format = AdminService.TREND_GRANULARITIES[granularity]
+        
+        # Floor both ends to the start of their bucket
+        now = datetime.now(timezone.utc).replace(tzinfo=None)
+        last = AdminService._parse_trend_time(end, 'end') if end else now
+        last = datetime.strptime(last.strftime(bucket_format), '%Y-%m-%d %H:%M:%S')
+        if start:
+            first = AdminService._parse_trend_time(start, 'start')
+            first = datetime.strptime(first.strftime(bucket_format), '%Y-%m-%d %H:%M:%S')
+        else:
+            first = last - width * (Config.TRENDS_DEFAULT_BUCKETS[granularity] - 1)
+        if last < first:
+            raise ValueError('start must not be after end')
+        count = int((last - first) / width) + 1
+        if count > Config.TRENDS_MAX_BUCKETS:
+            raise ValueError(f'Range spans {count} buckets; at most {Config.TRENDS_MAX_BUCKETS} are allowed')
+        
+        conn = get_db_connection()
+        first_bucket, last_bucket = first.strftime(bucket_format), last.strftime(bucket_format)
+        # A month with rows in the cold archive can have live rows again, so buckets are summed
+        rows = cold_archive.trend_rows(granularity, first_bucket, last_bucket)
+        
+        try:
+            for key in partitions.keys(first=first.strftime('%Y-%m'), last=last.strftime('%Y-%m')):
+                with partitions.attached(conn, key) as schema:
+                    cursor = conn.execute(
+                        f"""SELECT bucket, {', '.join(TREND_COUNTERS)}
+                           FROM {schema}.feedback_trends
+                           WHERE granularity = ? AND bucket >= ? AND bucket <= ?""",
+                        (granularity, first_bucket, last_bucket)
+                    )
+                    for row in cursor.fetchall():
+                        counters = rows.setdefault(row['bucket'], dict.fromkeys(TREND_COUNTERS, 0))
+                        for column in TREND_COUNTERS:
+                            counters[column] += row[column]
+        finally:
+            conn.close()
+        
+        buckets = []
+        totals = dict.fromkeys(TREND_COUNTERS, 0)
+        for i in range(count):
+            bucket = (first + width * i).strftime(bucket_format)
+            row = rows.get(bucket)
+            counters = {column: row[column] for column in TREND_COUNTERS} if row else dict.fromkeys(TREND_COUNTERS, 0)
+            for column in TREND_COUNTERS:
+                totals[column] += counters[column]
+            buckets.append({'bucket': bucket, **AdminService._trend_summary(counters)})
+        
+        return {
+            'granularity': granularity,
+            'start': first.strftime(bucket_format),
+            'end': last.strftime(bucket_format),
+            'buckets': buckets,
+            'totals': AdminService._trend_summary(totals)
+        }
+    
+    @staticmethod
+    def _trend_summary(counters: dict) -> dict:
+        """Shape one bucket's counters like the dashboard stats."""
+        total = counters['feedback_count']
+        scored = counters['positive_count'] + counters['negative_count'] + counters['neutral_count']
+        return {
+            'total_feedback': total,
+            'average_rating': round(counters['rating_sum'] / total, 2) if total else 0.0,
+            'sentiment_distribution': {
+                'positive': counters['positive_count'],
+                'negative': counters['negative_count'],
+                'neutral': counters['neutral_count'],
+                'pending': total - scored
+            },
+            'rating_distribution': {str(rating): counters[f'rating_{rating}'] for rating in range(1, 6)}
+        }
+    
+    @staticmethod
+    def _verify_trends_file(conn, repair: bool) -> tuple:
+        """
+        Compare the feedback_trends buckets of one database file with a recount.
+        
+        Args:
+            conn: Connection to the main database or a partition
+            repair: Rebuild the buckets from scratch if any drifted
+            
+        Returns:
+            Tuple of (list of drifted buckets, repaired flag)
+        """
+        cursor = conn.cursor()
+        
+        try:
+            # Read both sides in one transaction so concurrent writes cannot fake drift
+            cursor.execute('BEGIN IMMEDIATE')
+            drift = []
+            for granularity in AdminService.TREND_GRANULARITIES:
+                expected = compute_trends_from_scratch(cursor, granularity)
+                cursor.execute(
+                    f"SELECT bucket, {', '.join(TREND_COUNTERS)} FROM feedback_trends WHERE granularity = ?",
+                    (granularity,)
+                )
+                actual = {
+                    row['bucket']: {column: row[column] for column in TREND_COUNTERS}
+                    for row in cursor.fetchall()
+                }
+                empty = dict.fromkeys(TREND_COUNTERS, 0)
+                for bucket in sorted(set(expected) | set(actual)):
+                    if expected.get(bucket, empty) != actual.get(bucket, empty):
+                        drift.append({
+                            'granularity': granularity,
+                            'bucket': bucket,
+                            'rollup': actual.get(bucket),
+                            'actual': expected.get(bucket)
+                        })
+            
+            repaired = False
+            if drift and repair:
+                rebuild_trend_rollup(cursor)
+                repaired = True
+            conn.commit()
+            return drift, repaired
             
+        except Exception:
+            conn.rollback()
+            raise
+    
+    @staticmethod
+    def verify_trend_rollup(repair: bool = False) -> dict:
+        """
+        Recompute the hourly and daily trend buckets and compare with the rollups.
+        
+        Checks the main database and every feedback partition on its own.
+        
+        Args:
+            repair: Rebuild a rollup from scratch if any of its buckets drifted
+            
+        Returns:
+            Dictionary with consistent flag, drifted bucket count and samples, and repaired flag
+        """
+        conn = get_db_connection()
+        try:
+            drift, repaired = AdminService._verify_trends_file(conn, repair)
         finally:
             conn.close()
+        
+        for key in partitions.keys():
+            conn = partitions.connect(key)
+            try:
+                partition_drift, partition_repaired = AdminService._verify_trends_file(conn, repair)
+            finally:
+                conn.close()
+            drift.extend({'partition': key, **bucket} for bucket in partition_drift)
+            repaired = repaired or partition_repaired
+        
+        if repaired:
+            data_version.bump()
+        
+        return {
+            'consistent': not drift,
+            'drifted_buckets': len(drift),
+            'drift': drift[:20],
+            'repaired': repaired
+        }
     
     @staticmethod
     def get_filtered_feedback(sentiment: str = None, rating: int = None, search: str = None) -> list:
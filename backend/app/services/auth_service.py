@@ -1,32 +1,45 @@
-import bcrypt
+import hashlib
 import secrets
+import sqlite3
 from datetime import datetime, timedelta
 from app.database import get_db_connection
+from app.aio import run_db
+from app.data_version import data_version
+from app.cache import TTLCache
+from app.metrics import registry
+from app.services.password_hasher import password_hasher, PasswordHashingOverloaded
+from app.services.session_reaper import session_reaper
 from config import Config
 import re
 
 class AuthenticationService:
     """Service for handling user authentication and session management."""
     
+    # Validated sessions keyed by token hash. Entries never outlive the session's
+    # expires_at, and the short TTL bounds how long a logout performed by
+    # another worker process can go unnoticed here.
+    _session_cache = TTLCache(Config.SESSION_CACHE_SIZE, Config.SESSION_CACHE_TTL_SECONDS)
+    
     @staticmethod
     def hash_password(password: str) -> str:
         """
-        Hash a password using bcrypt.
+        Hash a password using bcrypt on the bounded hashing pool.
         
         Args:
             password: Plain text password
             
         Returns:
             Hashed password string
+            
+        Raises:
+            PasswordHashingOverloaded: If the hashing queue is full
         """
-        salt = bcrypt.gensalt()
-        hashed = bcrypt.hashpw(password.encode('utf-8'), salt)
-        return hashed.decode('utf-8')
+        return password_hasher.hash(password)
     
     @staticmethod
     def verify_password(password: str, password_hash: str) -> bool:
         """
-        Verify a password against its hash.
+        Verify a password against its hash on the bounded hashing pool.
         
         Args:
             password: Plain text password to verify
@@ -34,8 +47,42 @@ class AuthenticationService:
             
         Returns:
             True if password matches, False otherwise
+            
+        Raises:
+            PasswordHashingOverloaded: If the hashing queue is full
+        """
+        return password_hasher.verify(password, password_hash)
+    
+    @staticmethod
+    def update_password_hash(user_id: int, old_hash: str, new_hash: str) -> bool:
+        """
+        Replace a stored hash, unless it changed since it was read.
+        
+        Args:
+            user_id: ID of the user
+            old_hash: Hash the new one was derived from
+            new_hash: Replacement hash
+            
+        Returns:
+            True if the hash was replaced, False otherwise
         """
-        return bcrypt.checkpw(password.encode('utf-8'), password_hash.encode('utf-8'))
+        conn = get_db_connection()
+        cursor = conn.cursor()
+        
+        try:
+            cursor.execute(
+                'UPDATE users SET password_hash = ? WHERE id = ? AND password_hash = ?',
+                (new_hash, user_id, old_hash)
+            )
+            conn.commit()
+            return cursor.rowcount > 0
+            
+        except Exception as e:
+            conn.rollback()
+            print(f"Failed to upgrade password hash: {str(e)}")
+            return False
+        finally:
+            conn.close()
     
     @staticmethod
     def generate_session_token() -> str:
@@ -47,6 +94,68 @@ class AuthenticationService:
         """
         return secrets.token_urlsafe(32)
     
+    @staticmethod
+    def hash_session_token(session_token: str) -> bytes:
+        """
+        Return the fixed-width digest stored in place of a session token.
+        
+        Args:
+            session_token: Session token issued to the client
+            
+        Returns:
+            32-byte SHA-256 digest of the token
+        """
+        return hashlib.sha256(session_token.encode('utf-8')).digest()
+    
+    @staticmethod
+    def create_session(cursor, user_id, is_admin: bool) -> str:
+        """
+        Insert a new session and evict the account's oldest sessions over the cap.
+        
+        Args:
+            cursor: Cursor on an open connection (caller commits)
+            user_id: ID of the user, or None for the admin account
+            is_admin: Whether the session has admin rights
+            
+        Returns:
+            The new session token
+        """
+        session_token = AuthenticationService.generate_session_token()
+        expires_at = datetime.now() + timedelta(hours=Config.SESSION_EXPIRY_HOURS)
+        
+        cursor.execute(
+            'INSERT INTO sessions (user_id, token_hash, is_admin, expires_at) VALUES (?, ?, ?, ?)',
+            (user_id, AuthenticationService.hash_session_token(session_token), int(is_admin), expires_at)
+        )
+        
+        # Keep only the newest SESSION_MAX_PER_USER sessions for this account
+        cursor.execute(
+            'SELECT id, token_hash FROM sessions WHERE user_id IS ? ORDER BY id DESC LIMIT -1 OFFSET ?',
+            (user_id, Config.SESSION_MAX_PER_USER)
+        )
+        evicted = cursor.fetchall()
+        if evicted:
+            cursor.executemany('DELETE FROM sessions WHERE id = ?', [(row['id'],) for row in evicted])
+            for row in evicted:
+                AuthenticationService._session_cache.invalidate(row['token_hash'])
+        
+        session_reaper.start()
+        return session_token
+    
+    @staticmethod
+    def overloaded_response() -> dict:
+        """
+        Build the result returned when password hashing is saturated.
+        
+        Returns:
+            Dictionary with success False and the overloaded flag set
+        """
+        return {
+            'success': False,
+            'message': 'Server is busy, please try again shortly',
+            'overloaded': True
+        }
+    
     @staticmethod
     def validate_email(email: str) -> bool:
         """
@@ -62,9 +171,9 @@ class AuthenticationService:
         return re.match(pattern, email) is not None
     
     @staticmethod
-    def register_user(username: str, email: str, password: str) -> dict:
+    def check_registration(username: str, email: str, password: str) -> dict:
         """
-        Register a new user with validation.
+        Validate registration input and check the username and email are free.
         
         Args:
             username: Desired username
@@ -72,7 +181,7 @@ class AuthenticationService:
             password: User password
             
         Returns:
-            Dictionary with success status, message, and user_id if successful
+            Failure dictionary if registration cannot proceed, otherwise None
         """
         # Validate inputs
         if not username or not email or not password:
@@ -113,13 +222,39 @@ class AuthenticationService:
                     'message': 'Email already exists'
                 }
             
-            # Hash password and create user
-            password_hash = AuthenticationService.hash_password(password)
+            return None
+            
+        except Exception as e:
+            return {
+                'success': False,
+                'message': f'Registration failed: {str(e)}'
+            }
+        finally:
+            conn.close()
+    
+    @staticmethod
+    def create_user(username: str, email: str, password_hash: str) -> dict:
+        """
+        Insert a user whose password has already been hashed.
+        
+        Args:
+            username: Username
+            email: User email address
+            password_hash: bcrypt hash of the password
+            
+        Returns:
+            Dictionary with success status, message, and user_id if successful
+        """
+        conn = get_db_connection()
+        cursor = conn.cursor()
+        
+        try:
             cursor.execute(
                 'INSERT INTO users (username, email, password_hash) VALUES (?, ?, ?)',
                 (username, email, password_hash)
             )
             conn.commit()
+            data_version.bump()
             user_id = cursor.lastrowid
             
             return {
@@ -128,6 +263,13 @@ class AuthenticationService:
                 'user_id': user_id
             }
             
+        except sqlite3.IntegrityError:
+            # Taken by a concurrent registration while the password was hashed
+            conn.rollback()
+            return {
+                'success': False,
+                'message': 'Username or email already exists'
+            }
         except Exception as e:
             conn.rollback()
             return {
@@ -138,55 +280,104 @@ class AuthenticationService:
             conn.close()
     
     @staticmethod
-    def login_user(username: str, password: str) -> dict:
+    def register_user(username: str, email: str, password: str) -> dict:
         """
-        Authenticate user and create session.
+        Register a new user with validation.
         
         Args:
-            username: Username
-            password: Password
+            username: Desired username
+            email: User email address
+            password: User password
             
         Returns:
-            Dictionary with success status, message, and session_token if successful
+            Dictionary with success status, message, and user_id if successful
         """
-        if not username or not password:
-            return {
-                'success': False,
-                'message': 'Invalid credentials'
-            }
+        failure = AuthenticationService.check_registration(username, email, password)
+        if failure:
+            return failure
         
+        try:
+            password_hash = AuthenticationService.hash_password(password)
+        except PasswordHashingOverloaded:
+            return AuthenticationService.overloaded_response()
+        
+        return AuthenticationService.create_user(username, email, password_hash)
+    
+    @staticmethod
+    async def register_user_async(username: str, email: str, password: str) -> dict:
+        """
+        Async register_user: database steps on the DB executor, bcrypt awaited.
+        
+        Args:
+            username: Desired username
+            email: User email address
+            password: User password
+            
+        Returns:
+            Dictionary with success status, message, and user_id if successful
+        """
+        failure = await run_db(AuthenticationService.check_registration, username, email, password)
+        if failure:
+            return failure
+        
+        try:
+            password_hash = await password_hasher.hash_async(password)
+        except PasswordHashingOverloaded:
+            return AuthenticationService.overloaded_response()
+        
+        return await run_db(AuthenticationService.create_user, username, email, password_hash)
+    
+    @staticmethod
+    def find_login_user(username: str):
+        """
+        Look up the id and password hash of a user by username.
+        
+        Args:
+            username: Username
+            
+        Returns:
+            Dictionary with id and password_hash, or None if no such user
+        """
         conn = get_db_connection()
         cursor = conn.cursor()
         
         try:
-            # Get user by username
             cursor.execute(
                 'SELECT id, password_hash FROM users WHERE username = ?',
                 (username,)
             )
             user = cursor.fetchone()
+            return dict(user) if user else None
             
-            if not user:
-                return {
-                    'success': False,
-                    'message': 'Invalid credentials'
-                }
-            
-            # Verify password
-            if not AuthenticationService.verify_password(password, user['password_hash']):
-                return {
-                    'success': False,
-                    'message': 'Invalid credentials'
-                }
-            
-            # Create session
-            session_token = AuthenticationService.generate_session_token()
-            expires_at = datetime.now() + timedelta(hours=Config.SESSION_EXPIRY_HOURS)
+        finally:
+            conn.close()
+    
+    @staticmethod
+    def complete_login(user: dict, password: str) -> dict:
+        """
+        Start a session for a user whose password was verified.
+        
+        Args:
+            user: Dictionary with id and password_hash (from find_login_user)
+            password: The verified plain text password
             
-            cursor.execute(
-                'INSERT INTO sessions (user_id, session_token, is_admin, expires_at) VALUES (?, ?, ?, ?)',
-                (user['id'], session_token, 0, expires_at)
+        Returns:
+            Dictionary with success status, message, and session_token if successful
+        """
+        # Upgrade hashes made at an old cost factor without delaying the login
+        if password_hasher.needs_rehash(user['password_hash']):
+            user_id, old_hash = user['id'], user['password_hash']
+            password_hasher.rehash_in_background(
+                password,
+                lambda new_hash: AuthenticationService.update_password_hash(user_id, old_hash, new_hash)
             )
+        
+        conn = get_db_connection()
+        cursor = conn.cursor()
+        
+        try:
+            # Create session
+            session_token = AuthenticationService.create_session(cursor, user['id'], False)
             conn.commit()
             
             return {
@@ -204,6 +395,82 @@ class AuthenticationService:
         finally:
             conn.close()
     
+    @staticmethod
+    def login_user(username: str, password: str) -> dict:
+        """
+        Authenticate user and create session.
+        
+        Args:
+            username: Username
+            password: Password
+            
+        Returns:
+            Dictionary with success status, message, and session_token if successful
+        """
+        if not username or not password:
+            return {
+                'success': False,
+                'message': 'Invalid credentials'
+            }
+        
+        try:
+            user = AuthenticationService.find_login_user(username)
+            
+            # Verify password
+            if not user or not AuthenticationService.verify_password(password, user['password_hash']):
+                return {
+                    'success': False,
+                    'message': 'Invalid credentials'
+                }
+            
+        except PasswordHashingOverloaded:
+            return AuthenticationService.overloaded_response()
+        except Exception as e:
+            return {
+                'success': False,
+                'message': f'Login failed: {str(e)}'
+            }
+        
+        return AuthenticationService.complete_login(user, password)
+    
+    @staticmethod
+    async def login_user_async(username: str, password: str) -> dict:
+        """
+        Async login_user: no thread or connection is held while bcrypt runs.
+        
+        Args:
+            username: Username
+            password: Password
+            
+        Returns:
+            Dictionary with success status, message, and session_token if successful
+        """
+        if not username or not password:
+            return {
+                'success': False,
+                'message': 'Invalid credentials'
+            }
+        
+        try:
+            user = await run_db(AuthenticationService.find_login_user, username)
+            
+            # Verify password
+            if not user or not await password_hasher.verify_async(password, user['password_hash']):
+                return {
+                    'success': False,
+                    'message': 'Invalid credentials'
+                }
+            
+        except PasswordHashingOverloaded:
+            return AuthenticationService.overloaded_response()
+        except Exception as e:
+            return {
+                'success': False,
+                'message': f'Login failed: {str(e)}'
+            }
+        
+        return await run_db(AuthenticationService.complete_login, user, password)
+    
     @staticmethod
     def login_admin(username: str, password: str) -> dict:
         """
@@ -227,13 +494,7 @@ class AuthenticationService:
         
         try:
             # Create admin session (user_id is NULL for admin)
-            session_token = AuthenticationService.generate_session_token()
-            expires_at = datetime.now() + timedelta(hours=Config.SESSION_EXPIRY_HOURS)
-            
-            cursor.execute(
-                'INSERT INTO sessions (user_id, session_token, is_admin, expires_at) VALUES (?, ?, ?, ?)',
-                (None, session_token, 1, expires_at)
-            )
+            session_token = AuthenticationService.create_session(cursor, None, True)
             conn.commit()
             
             return {
@@ -251,6 +512,49 @@ class AuthenticationService:
         finally:
             conn.close()
     
+    @staticmethod
+    def cached_session(session_token: str):
+        """
+        Validate a session token from the cache only, without touching SQLite.
+        
+        Args:
+            session_token: Session token to validate
+            
+        Returns:
+            validate_session's result if the token is cached, otherwise None
+        """
+        token_hash = AuthenticationService.hash_session_token(session_token)
+        cached = AuthenticationService._session_cache.get(token_hash)
+        if cached is None:
+            return None
+        if datetime.now() > cached['expires_at']:
+            AuthenticationService._session_cache.invalidate(token_hash)
+            return {'valid': False, 'is_admin': False}
+        return {
+            'valid': True,
+            'user_id': cached['user_id'],
+            'is_admin': cached['is_admin']
+        }
+    
+    @staticmethod
+    async def validate_session_async(session_token: str) -> dict:
+        """
+        Async validate_session: cache hits return inline, misses go to the DB executor.
+        
+        Args:
+            session_token: Session token to validate
+            
+        Returns:
+            Dictionary with valid status, user_id, and is_admin flag
+        """
+        if not session_token:
+            return {'valid': False, 'is_admin': False}
+        
+        cached = AuthenticationService.cached_session(session_token)
+        if cached is not None:
+            return cached
+        return await run_db(AuthenticationService.validate_session, session_token)
+    
     @staticmethod
     def validate_session(session_token: str) -> dict:
         """
@@ -265,13 +569,18 @@ class AuthenticationService:
         if not session_token:
             return {'valid': False, 'is_admin': False}
         
+        cached = AuthenticationService.cached_session(session_token)
+        if cached is not None:
+            return cached
+        
+        token_hash = AuthenticationService.hash_session_token(session_token)
         conn = get_db_connection()
         cursor = conn.cursor()
         
         try:
             cursor.execute(
-                'SELECT user_id, is_admin, expires_at FROM sessions WHERE session_token = ?',
-                (session_token,)
+                'SELECT user_id, is_admin, expires_at FROM sessions WHERE token_hash = ?',
+                (token_hash,)
             )
             session = cursor.fetchone()
             
@@ -280,9 +589,20 @@ class AuthenticationService:
             
             # Check if session expired
             expires_at = datetime.fromisoformat(session['expires_at'])
-            if datetime.now() > expires_at:
+            now = datetime.now()
+            if now > expires_at:
                 return {'valid': False, 'is_admin': False}
             
+            AuthenticationService._session_cache.set(
+                token_hash,
+                {
+                    'user_id': session['user_id'],
+                    'is_admin': bool(session['is_admin']),
+                    'expires_at': expires_at
+                },
+                ttl=(expires_at - now).total_seconds()
+            )
+            
             return {
                 'valid': True,
                 'user_id': session['user_id'],
@@ -292,6 +612,16 @@ class AuthenticationService:
         finally:
             conn.close()
     
+    @staticmethod
+    def get_session_cache_stats() -> dict:
+        """
+        Return session cache size and hit/miss counters.
+        
+        Returns:
+            Dictionary of cache statistics
+        """
+        return AuthenticationService._session_cache.stats()
+    
     @staticmethod
     def logout(session_token: str) -> dict:
         """
@@ -309,11 +639,14 @@ class AuthenticationService:
                 'message': 'No session token provided'
             }
         
+        token_hash = AuthenticationService.hash_session_token(session_token)
+        AuthenticationService._session_cache.invalidate(token_hash)
+        
         conn = get_db_connection()
         cursor = conn.cursor()
         
         try:
-            cursor.execute('DELETE FROM sessions WHERE session_token = ?', (session_token,))
+            cursor.execute('DELETE FROM sessions WHERE token_hash = ?', (token_hash,))
             conn.commit()
             
             if cursor.rowcount > 0:
@@ -335,3 +668,8 @@ class AuthenticationService:
             }
         finally:
             conn.close()
+
+registry.gauge(
+    'session_cache_entries', 'Validated sessions held in the session cache',
+    lambda: AuthenticationService.get_session_cache_stats()['size']
+)
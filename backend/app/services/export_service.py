@@ -0,0 +1,145 @@
+import csv
+import io
+import json
+from itertools import islice
+from app.services.feedback_service import FeedbackService
+from config import Config
+
+class _ChunkSink:
+    """Write-only file object that hands back whatever was written since the last drain."""
+    
+    def __init__(self):
+        self._parts = []
+        self._position = 0
+        self.closed = False
+    
+    def write(self, data) -> int:
+        self._parts.append(bytes(data))
+        self._position += len(data)
+        return len(data)
+    
+    def tell(self) -> int:
+        return self._position
+    
+    def flush(self):
+        pass
+    
+    def close(self):
+        self.closed = True
+    
+    def drain(self) -> bytes:
+        data, self._parts = b''.join(self._parts), []
+        return data
+
+class FeedbackExportService:
+    """Service for streaming feedback exports in chunks."""
+    
+    COLUMNS = ('id', 'user_id', 'username', 'rating', 'comment', 'sentiment', 'created_at')
+    
+    # Format name -> (mimetype, file extension)
+    FORMATS = {
+        'csv': ('text/csv', 'csv'),
+        'ndjson': ('application/x-ndjson', 'ndjson'),
+        'parquet': ('application/vnd.apache.parquet', 'parquet')
+    }
+    
+    @staticmethod
+    def iter_chunks(filters: dict = None, chunk_size: int = None, stats: dict = None):
+        """
+        Yield feedback rows in lists of at most chunk_size, newest first.
+        
+        Args:
+            filters: Optional filter dictionary (see FeedbackService.get_all_feedback)
+            chunk_size: Rows per chunk (defaults to Config.EXPORT_CHUNK_SIZE)
+            stats: Optional dictionary whose 'rows' count is updated as chunks are read
+        
+        Yields:
+            Lists of feedback dictionaries
+        """
+        chunk_size = chunk_size or Config.EXPORT_CHUNK_SIZE
+        rows = FeedbackService.iter_feedback(filters, chunk_size=chunk_size)
+        while True:
+            chunk = list(islice(rows, chunk_size))
+            if not chunk:
+                break
+            if stats is not None:
+                stats['rows'] = stats.get('rows', 0) + len(chunk)
+            yield chunk
+    
+    @staticmethod
+    def _csv(chunks):
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(FeedbackExportService.COLUMNS)
+        for chunk in chunks:
+            writer.writerows([[row[column] for column in FeedbackExportService.COLUMNS] for row in chunk])
+            yield buffer.getvalue().encode('utf-8')
+            buffer.seek(0)
+            buffer.truncate()
+        # Header only when nothing matched
+        if buffer.tell():
+            yield buffer.getvalue().encode('utf-8')
+    
+    @staticmethod
+    def _ndjson(chunks):
+        for chunk in chunks:
+            yield ''.join(json.dumps(row) + '\n' for row in chunk).encode('utf-8')
+    
+    @staticmethod
+    def _parquet(chunks):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+        
+        schema = pa.schema([
+            ('id', pa.int64()),
+            ('user_id', pa.int64()),
+            ('username', pa.string()),
+            ('rating', pa.int8()),
+            ('comment', pa.string()),
+            ('sentiment', pa.string()),
+            ('created_at', pa.string())
+        ])
+        sink = _ChunkSink()
+        writer = pq.ParquetWriter(sink, schema, compression='zstd')
+        
+        try:
+            # One row group per chunk, sent as soon as it is encoded
+            for chunk in chunks:
+                columns = {column: [row[column] for row in chunk] for column in FeedbackExportService.COLUMNS}
+                writer.write_table(pa.Table.from_pydict(columns, schema=schema))
+                data = sink.drain()
+                if data:
+                    yield data
+        finally:
+            writer.close()
+        yield sink.drain()
+    
+    @staticmethod
+    def export(filters: dict = None, file_format: str = 'csv', chunk_size: int = None, stats: dict = None):
+        """
+        Stream feedback in the given format without loading it all into memory.
+        
+        Args:
+            filters: Optional filter dictionary (see FeedbackService.get_all_feedback)
+            file_format: 'csv', 'ndjson' or 'parquet'
+            chunk_size: Rows read and encoded per chunk
+            stats: Optional dictionary updated with the number of rows exported
+        
+        Returns:
+            Generator of encoded byte chunks
+        
+        Raises:
+            ValueError: If the format is unknown or its library is not installed
+        """
+        if file_format not in FeedbackExportService.FORMATS:
+            raise ValueError(f"Format must be one of: {', '.join(FeedbackExportService.FORMATS)}")
+        
+        if file_format == 'parquet':
+            try:
+                import pyarrow.parquet
+            except ImportError:
+                raise ValueError('Parquet export requires pyarrow (pip install pyarrow)')
+        
+        chunks = FeedbackExportService.iter_chunks(filters, chunk_size, stats)
+        encoder = getattr(FeedbackExportService, '_' + file_format)
+        return encoder(chunks)
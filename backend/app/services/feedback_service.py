@@ -1,9 +1,16 @@
+import base64
+import json
+import re
 from datetime import datetime
-from app.database import get_db_connection
+from app import cold_archive, partitions
+from app.data_version import data_version
+from app.database import get_db_connection, has_search_index
 
 class FeedbackService:
     """Service for handling feedback operations."""
     
+    COLUMNS = ('id', 'user_id', 'username', 'rating', 'comment', 'sentiment', 'created_at')
+    
     @staticmethod
     def validate_feedback_input(rating: int, comment: str) -> dict:
         """
@@ -50,16 +57,19 @@ class FeedbackService:
                 'message': '; '.join(validation['errors'])
             }
         
-        conn = get_db_connection()
-        cursor = conn.cursor()
+        # created_at is set here rather than by SQLite, as it picks the partition
+        created_at = partitions.utc_now()
         
         try:
-            # Insert feedback
-            cursor.execute(
-                'INSERT INTO feedback (user_id, rating, comment) VALUES (?, ?, ?)',
-                (user_id, rating, comment.strip())
-            )
-            conn.commit()
+            # Insert feedback into this month's partition
+            with partitions.writing(partitions.key_for(created_at), create_missing=True) as conn:
+                cursor = conn.cursor()
+                cursor.execute(
+                    'INSERT INTO feedback (user_id, rating, comment, created_at) VALUES (?, ?, ?, ?)',
+                    (user_id, rating, comment.strip(), created_at)
+                )
+                conn.commit()
+            data_version.bump()
             feedback_id = cursor.lastrowid
             
             return {
@@ -69,13 +79,248 @@ class FeedbackService:
             }
             
         except Exception as e:
-            conn.rollback()
             return {
                 'success': False,
                 'message': f'Failed to submit feedback: {str(e)}'
             }
-        finally:
-            conn.close()
+    
+    @staticmethod
+    def encode_cursor(created_at: str, feedback_id: int) -> str:
+        """
+        Encode a (created_at, id) keyset position as an opaque token.
+        
+        Args:
+            created_at: created_at of the last row returned
+            feedback_id: id of the last row returned
+            
+        Returns:
+            URL-safe cursor token
+        """
+        raw = json.dumps([created_at, feedback_id]).encode('utf-8')
+        return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+    
+    @staticmethod
+    def decode_cursor(cursor: str) -> tuple:
+        """
+        Decode a cursor token produced by encode_cursor.
+        
+        Args:
+            cursor: Cursor token
+            
+        Returns:
+            Tuple of (created_at, id)
+            
+        Raises:
+            ValueError: If the token is malformed
+        """
+        try:
+            raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+            created_at, feedback_id = json.loads(raw)
+        except Exception:
+            raise ValueError('Invalid cursor')
+        if not isinstance(created_at, str) or not isinstance(feedback_id, int):
+            raise ValueError('Invalid cursor')
+        # The month picks the partition the next page starts in
+        try:
+            partitions.key_for(created_at)
+        except ValueError:
+            raise ValueError('Invalid cursor')
+        return created_at, feedback_id
+    
+    @staticmethod
+    def to_search_query(search: str) -> str:
+        """
+        Translate a user search string into an FTS5 MATCH expression.
+        
+        Bare words become prefix queries ("serv" matches "service") and
+        double-quoted text becomes a phrase query; all parts must match.
+        
+        Args:
+            search: Raw search text
+            
+        Returns:
+            FTS5 query string, or '' if the text has no searchable words
+        """
+        parts = []
+        for phrase, word in re.findall(r'"([^"]*)"|(\S+)', search):
+            if phrase:
+                tokens = re.findall(r'\w+', phrase)
+                if tokens:
+                    parts.append('"' + ' '.join(tokens) + '"')
+            else:
+                parts.extend(f'"{token}"*' for token in re.findall(r'\w+', word))
+        return ' '.join(parts)
+    
+    @staticmethod
+    def _build_feedback_query(filters: dict = None, cursor: str = None, limit: int = None,
+                              schema: str = 'main') -> tuple:
+        """
+        Build the feedback listing query for one partition, newest first.
+        
+        Args:
+            filters: Optional filter dictionary (see get_all_feedback)
+            cursor: Optional cursor; only rows after it are selected
+            limit: Optional maximum number of rows
+            schema: Schema name of the attached partition (see partitions.attached)
+            
+        Returns:
+            Tuple of (query string, parameter list)
+            
+        Raises:
+            ValueError: If the cursor is malformed or combined with relevance ordering
+        """
+        filters = filters or {}
+        joins = ''
+        join_params = []
+        conditions = []
+        params = []
+        order = 'f.created_at DESC, f.id DESC'
+        
+        # Apply filters
+        if filters.get('sentiment'):
+            conditions.append('f.sentiment = ?')
+            params.append(filters['sentiment'])
+        
+        if filters.get('rating'):
+            conditions.append('f.rating = ?')
+            params.append(filters['rating'])
+        
+        if filters.get('search'):
+            search_term = f"%{filters['search']}%"
+            match = FeedbackService.to_search_query(filters['search']) if has_search_index() else ''
+            
+            if match:
+                # Full-text match on comments, substring match on (short)
+                # usernames; two IN lookups, so the planner reads only the
+                # matching ids instead of scanning feedback
+                conditions.append(f'''(
+                    f.id IN (SELECT rowid FROM {schema}.feedback_fts WHERE feedback_fts MATCH ?)
+                    OR f.user_id IN (SELECT id FROM main.users WHERE username LIKE ?)
+                )''')
+                params.extend([match, search_term])
+                
+                if filters.get('sort') == 'relevance':
+                    if cursor:
+                        raise ValueError('Cursor pagination is not supported with relevance ordering')
+                    # The rank is only joined when it orders the rows
+                    joins = f'''
+                LEFT JOIN (
+                    SELECT rowid, rank FROM {schema}.feedback_fts WHERE feedback_fts MATCH ?
+                ) s ON s.rowid = f.id'''
+                    join_params.append(match)
+                    order = 's.rank IS NULL, s.rank, ' + order
+            else:
+                conditions.append('(f.comment LIKE ? OR u.username LIKE ?)')
+                params.extend([search_term, search_term])
+        
+        # Keyset position: strictly after the last row of the previous page
+        if cursor:
+            conditions.append('(f.created_at, f.id) < (?, ?)')
+            params.extend(FeedbackService.decode_cursor(cursor))
+        
+        # Base query
+        query = f'''
+            SELECT 
+                f.id,
+                f.user_id,
+                u.username,
+                f.rating,
+                f.comment,
+                f.sentiment,
+                f.created_at
+            FROM {schema}.feedback f
+            JOIN main.users u ON f.user_id = u.id{joins}
+            WHERE 1=1
+        '''
+        for condition in conditions:
+            query += ' AND ' + condition
+        
+        # Newest first (id breaks ties within the same second)
+        query += ' ORDER BY ' + order
+        params = join_params + params
+        
+        if limit:
+            query += ' LIMIT ?'
+            params.append(limit)
+        
+        return query, params
+    
+    @staticmethod
+    def _row_to_dict(row) -> dict:
+        """Convert a feedback listing row to a dictionary."""
+        return {
+            'id': row['id'],
+            'user_id': row['user_id'],
+            'username': row['username'],
+            'rating': row['rating'],
+            'comment': row['comment'],
+            'sentiment': row['sentiment'],
+            'created_at': row['created_at']
+        }
+    
+    @staticmethod
+    def _iter_rows(conn, filters: dict = None, cursor: str = None, limit: int = None, chunk_size: int = 500):
+        """
+        Yield listing rows partition by partition, newest partition first.
+        
+        Partitions hold disjoint months, so reading them newest first, each
+        in (created_at, id) order, yields the rows in that order overall. The
+        cursor skips the months after it and the scan stops once limit rows
+        are found. With relevance ordering the rows of each month come in
+        FTS5 rank order, but the months stay newest first: bm25 scores
+        depend on the statistics of each partition's own index, so ranks
+        from different months are not comparable. The 'archived'
+        filter adds the months in the cold archive, each read through a
+        temporary partition that also holds the month's live rows.
+        
+        Args:
+            conn: Connection from get_db_connection()
+            filters: Optional filter dictionary (see get_all_feedback)
+            cursor: Optional cursor to start after
+            limit: Optional maximum number of rows
+            chunk_size: Rows fetched from SQLite per round trip
+        
+        Yields:
+            Listing rows (sqlite3.Row)
+        
+        Raises:
+            ValueError: If the cursor is malformed
+        """
+        before = FeedbackService.decode_cursor(cursor)[0] if cursor else None
+        last_key = partitions.key_for(before) if cursor else None
+        remaining = limit
+        
+        months = partitions.keys(last=last_key)
+        cold = set(cold_archive.keys(last=last_key)) if (filters or {}).get('archived') else set()
+        if cold:
+            months = sorted(cold.union(months), reverse=True)
+        
+        for key in months:
+            if key in cold:
+                source = cold_archive.attached(conn, key, before)
+            else:
+                source = partitions.attached(conn, key)
+            with source as schema:
+                query, params = FeedbackService._build_feedback_query(filters, cursor, remaining, schema)
+                db_cursor = conn.cursor()
+                try:
+                    db_cursor.execute(query, params)
+                    while True:
+                        rows = db_cursor.fetchmany(chunk_size)
+                        if not rows:
+                            break
+                        if remaining is not None:
+                            remaining -= len(rows)
+                        yield from rows
+                finally:
+                    db_cursor.close()
+            if remaining is not None and remaining <= 0:
+                break
+    
+    @staticmethod
+    def _fetch_rows(conn, filters: dict = None, cursor: str = None, limit: int = None) -> list:
+        """Fetch listing rows from every partition in listing order (see _iter_rows)."""
+        return list(FeedbackService._iter_rows(conn, filters, cursor, limit))
     
     @staticmethod
     def get_all_feedback(filters: dict = None) -> list:
@@ -87,65 +332,134 @@ class FeedbackService:
                     - sentiment: Filter by sentiment ('positive', 'negative', 'neutral')
                     - rating: Filter by rating (1-5)
                     - search: Search term for comments or username
+                    - sort: 'relevance' to rank search matches within each
+                      month (months stay newest first, see _iter_rows)
+                    - archived: True to include the cold archive
                     
         Returns:
             List of feedback records with user information
         """
         conn = get_db_connection()
-        cursor = conn.cursor()
         
         try:
-            # Base query
-            query = '''
-                SELECT 
-                    f.id,
-                    f.user_id,
-                    u.username,
-                    f.rating,
-                    f.comment,
-                    f.sentiment,
-                    f.created_at
-                FROM feedback f
-                JOIN users u ON f.user_id = u.id
-                WHERE 1=1
-            '''
-            params = []
-            
-            # Apply filters
-            if filters:
-                if filters.get('sentiment'):
-                    query += ' AND f.sentiment = ?'
-                    params.append(filters['sentiment'])
-                
-                if filters.get('rating'):
-                    query += ' AND f.rating = ?'
-                    params.append(filters['rating'])
-                
-                if filters.get('search'):
-                    query += ' AND (f.comment LIKE ? OR u.username LIKE ?)'
-                    search_term = f"%{filters['search']}%"
-                    params.extend([search_term, search_term])
+            rows = FeedbackService._fetch_rows(conn, filters)
             
-            # Order by newest first
-            query += ' ORDER BY f.created_at DESC'
+            # Convert to list of dictionaries
+            return [FeedbackService._row_to_dict(row) for row in rows]
             
-            cursor.execute(query, params)
-            rows = cursor.fetchall()
+        finally:
+            conn.close()
+    
+    @staticmethod
+    def to_columns(rows) -> dict:
+        """
+        Transpose feedback rows into the columns layout.
+        
+        Key names are sent once instead of per row, and each username once:
+        the username column holds indexes into the usernames array.
+        
+        Args:
+            rows: Feedback dictionaries or listing rows
             
-            # Convert to list of dictionaries
-            feedback_list = []
-            for row in rows:
-                feedback_list.append({
-                    'id': row['id'],
-                    'user_id': row['user_id'],
-                    'username': row['username'],
-                    'rating': row['rating'],
-                    'comment': row['comment'],
-                    'sentiment': row['sentiment'],
-                    'created_at': row['created_at']
-                })
-            
-            return feedback_list
+        Returns:
+            Dictionary with count, one array per column and usernames
+        """
+        columns = {'count': len(rows)}
+        for column in FeedbackService.COLUMNS:
+            columns[column] = [row[column] for row in rows]
+        
+        index = {}
+        columns['username'] = [index.setdefault(name, len(index)) for name in columns['username']]
+        columns['usernames'] = list(index)
+        return columns
+    
+    @staticmethod
+    def get_all_feedback_columns(filters: dict = None) -> dict:
+        """
+        Retrieve all feedback in the columns layout (see to_columns).
+        
+        Transposes the fetched rows directly, without a dictionary per row.
+        
+        Args:
+            filters: Optional filter dictionary (see get_all_feedback)
             
+        Returns:
+            Columns dictionary
+        """
+        conn = get_db_connection()
+        
+        try:
+            return FeedbackService.to_columns(FeedbackService._fetch_rows(conn, filters))
+            
+        finally:
+            conn.close()
+    
+    @staticmethod
+    def get_feedback_page(filters: dict = None, limit: int = 50, cursor: str = None) -> dict:
+        """
+        Retrieve one page of feedback using (created_at, id) keyset pagination.
+        
+        Only the partitions up to the page's last row are read, so a page
+        costs the same however many months of history there are.
+        
+        Args:
+            filters: Optional filter dictionary (see get_all_feedback)
+            limit: Maximum number of rows in the page
+            cursor: Cursor from the previous page's next_cursor, or None for the first page
+            
+        Returns:
+            Dictionary with feedback list and next_cursor (None on the last page)
+            
+        Raises:
+            ValueError: If the cursor is malformed
+        """
+        conn = get_db_connection()
+        
+        try:
+            # Fetch one extra row to know whether another page exists
+            rows = FeedbackService._fetch_rows(conn, filters, cursor, limit + 1)
+            
+            feedback_list = [FeedbackService._row_to_dict(row) for row in rows[:limit]]
+            next_cursor = None
+            # Relevance-ranked results are a single page: keyset cursors follow created_at
+            if len(rows) > limit and (filters or {}).get('sort') != 'relevance':
+                last = feedback_list[-1]
+                next_cursor = FeedbackService.encode_cursor(last['created_at'], last['id'])
+            
+            return {
+                'feedback': feedback_list,
+                'next_cursor': next_cursor
+            }
+            
+        finally:
+            conn.close()
+    
+    @staticmethod
+    def iter_feedback(filters: dict = None, cursor: str = None, limit: int = None, chunk_size: int = 500):
+        """
+        Yield feedback rows from a cursor without materializing the result.
+        
+        Args:
+            filters: Optional filter dictionary (see get_all_feedback)
+            cursor: Optional cursor to start after
+            limit: Optional maximum number of rows
+            chunk_size: Rows fetched from SQLite per round trip
+            
+        Yields:
+            Feedback dictionaries, newest first
+            
+        Raises:
+            ValueError: If the cursor is malformed
+        """
+        conn = get_db_connection()
+        rows = None
+        
+        try:
+            rows = FeedbackService._iter_rows(conn, filters, cursor, limit, chunk_size)
+            for row in rows:
+                yield FeedbackService._row_to_dict(row)
         finally:
+            # A partition scan left early detaches before the connection goes back
+            if hasattr(rows, 'close'):
+                rows.close()
             conn.close()
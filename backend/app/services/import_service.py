@@ -0,0 +1,265 @@
+import csv
+import json
+import time
+from datetime import datetime, timezone
+from app import partitions
+from app.data_version import data_version
+from app.database import get_db_connection
+from app.services.feedback_service import FeedbackService
+from app.services.sentiment_service import SentimentAnalysisService
+from config import Config
+
+class FeedbackImportService:
+    """Service for bulk-loading feedback from NDJSON or CSV."""
+    
+    FORMATS = ('ndjson', 'csv')
+    
+    @staticmethod
+    def iter_records(lines, file_format: str):
+        """
+        Stream-parse feedback records without loading the whole input.
+        
+        Args:
+            lines: Iterable of text lines (an open file or a text-decoded request stream)
+            file_format: 'ndjson' or 'csv' (CSV needs a header row)
+        
+        Yields:
+            (line_number, record) tuples; record is a dict, or an error string
+            when the line could not be parsed
+        """
+        if file_format == 'csv':
+            reader = csv.DictReader(lines)
+            for record in reader:
+                yield reader.line_num, record
+            return
+        
+        for line_number, line in enumerate(lines, start=1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                record = json.loads(line)
+            except ValueError as e:
+                yield line_number, f'Invalid JSON: {str(e)}'
+                continue
+            if not isinstance(record, dict):
+                yield line_number, 'Each line must be a JSON object'
+                continue
+            yield line_number, record
+    
+    @staticmethod
+    def normalize_record(record: dict) -> tuple:
+        """
+        Validate one record with the same rules as single submissions.
+        
+        Accepts user_id or username, rating, comment and an optional ISO
+        created_at (kept so backfilled feedback sorts by its original time).
+        
+        Args:
+            record: Parsed record (CSV values arrive as strings)
+        
+        Returns:
+            (row, errors): row is (user_id, username, rating, comment, created_at)
+            when valid, otherwise None with a list of error messages
+        """
+        rating = record.get('rating')
+        if isinstance(rating, str) and rating.strip().isdigit():
+            rating = int(rating.strip())
+        comment = record.get('comment')
+        if comment is not None and not isinstance(comment, str):
+            comment = str(comment)
+        
+        validation = FeedbackService.validate_feedback_input(rating, comment)
+        errors = list(validation['errors'])
+        
+        user_id = record.get('user_id')
+        username = record.get('username')
+        identity_errors = []
+        if isinstance(user_id, str):
+            user_id = int(user_id) if user_id.strip().isdigit() else None
+        elif user_id is not None and (isinstance(user_id, bool) or not isinstance(user_id, int)):
+            identity_errors.append('user_id must be an integer')
+            user_id = None
+        if username is not None and not isinstance(username, str):
+            identity_errors.append('username must be a string')
+            username = None
+        username = (username or '').strip() or None
+        if identity_errors:
+            errors.extend(identity_errors)
+        elif user_id is None and username is None:
+            errors.append('user_id or username is required')
+        
+        created_at = record.get('created_at')
+        if created_at:
+            try:
+                parsed = datetime.fromisoformat(str(created_at).strip())
+            except ValueError:
+                errors.append('created_at must be an ISO 8601 timestamp')
+            else:
+                # Stored in UTC like CURRENT_TIMESTAMP; the UTC month picks the partition
+                if parsed.tzinfo is not None:
+                    parsed = parsed.astimezone(timezone.utc)
+                created_at = parsed.strftime('%Y-%m-%d %H:%M:%S')
+        else:
+            created_at = None
+        
+        if errors:
+            return None, errors
+        return (user_id, username, rating, comment.strip(), created_at), []
+    
+    @staticmethod
+    def _resolve_users(cursor, rows: list, known: dict) -> dict:
+        """Map every username and user_id in rows to an existing user id (cached in known)."""
+        usernames = {row[1] for row in rows if row[0] is None} - set(known)
+        user_ids = {row[0] for row in rows if row[0] is not None} - set(known)
+        
+        # Look up in chunks to stay under SQLite's bound-parameter limit
+        names = list(usernames)
+        for start in range(0, len(names), 500):
+            chunk = names[start:start + 500]
+            cursor.execute(f'SELECT id, username FROM users WHERE username IN ({",".join("?" * len(chunk))})', chunk)
+            for row in cursor.fetchall():
+                known[row['username']] = row['id']
+        
+        ids = list(user_ids)
+        for start in range(0, len(ids), 500):
+            chunk = ids[start:start + 500]
+            cursor.execute(f'SELECT id FROM users WHERE id IN ({",".join("?" * len(chunk))})', chunk)
+            for row in cursor.fetchall():
+                known[row['id']] = row['id']
+        return known
+    
+    @staticmethod
+    def _write_batch(pending: list, known_users: dict, report: dict):
+        """Resolve users, score sentiment and insert one batch, in one transaction per partition."""
+        started = time.perf_counter()
+        conn = get_db_connection()
+        cursor = conn.cursor()
+        written = 0
+        
+        try:
+            FeedbackImportService._resolve_users(cursor, [row for _, row in pending], known_users)
+            
+            rows = []
+            now = partitions.utc_now()
+            for line_number, (user_id, username, rating, comment, created_at) in pending:
+                resolved = known_users.get(user_id if user_id is not None else username)
+                if resolved is None:
+                    FeedbackImportService._reject(report, line_number, ['Unknown user'])
+                    continue
+                rows.append((resolved, rating, comment, created_at or now))
+            
+            scoring_started = time.perf_counter()
+            sentiments = SentimentAnalysisService.analyze_batch([row[2] for row in rows])
+            scoring_seconds = time.perf_counter() - scoring_started
+            
+            # Backfilled rows go to the partition of their own month
+            by_key = {}
+            for (user_id, rating, comment, created_at), sentiment in zip(rows, sentiments):
+                by_key.setdefault(partitions.key_for(created_at), []).append(
+                    (user_id, rating, comment, sentiment, created_at)
+                )
+            for key, values in by_key.items():
+                with partitions.writing(key, create_missing=True) as partition:
+                    partition.executemany(
+                        'INSERT INTO feedback (user_id, rating, comment, sentiment, created_at) VALUES (?, ?, ?, ?, ?)',
+                        values
+                    )
+                    partition.commit()
+                written += len(values)
+            
+        except Exception:
+            conn.rollback()
+            # Partitions committed before the failure stay imported
+            if written:
+                report['imported'] += written
+                data_version.bump()
+            raise
+        finally:
+            conn.close()
+        data_version.bump()
+        
+        seconds = time.perf_counter() - started
+        report['imported'] += len(rows)
+        report['batches'].append({
+            'batch': len(report['batches']) + 1,
+            'rows': len(rows),
+            'score_seconds': round(scoring_seconds, 4),
+            'insert_seconds': round(seconds - scoring_seconds, 4),
+            'rows_per_second': round(len(rows) / seconds, 1) if seconds > 0 else 0.0
+        })
+    
+    @staticmethod
+    def _reject(report: dict, line_number: int, errors: list):
+        report['rejected'] += 1
+        if len(report['errors']) < Config.IMPORT_MAX_REPORTED_ERRORS:
+            report['errors'].append({'line': line_number, 'errors': errors})
+    
+    @staticmethod
+    def import_feedback(lines, file_format: str, batch_size: int = None) -> dict:
+        """
+        Import feedback in batches: validate, score with analyze_batch, executemany.
+        
+        Invalid rows are skipped and reported; each batch commits on its own so
+        a failure part-way keeps the batches already written.
+        
+        Args:
+            lines: Iterable of text lines
+            file_format: 'ndjson' or 'csv'
+            batch_size: Rows per transaction (defaults to Config.IMPORT_BATCH_SIZE)
+        
+        Returns:
+            Dictionary with success status, message, imported/rejected counts,
+            the first errors and per-batch throughput
+        """
+        if file_format not in FeedbackImportService.FORMATS:
+            return {
+                'success': False,
+                'message': 'Format must be ndjson or csv'
+            }
+        
+        batch_size = batch_size or Config.IMPORT_BATCH_SIZE
+        report = {
+            'imported': 0,
+            'rejected': 0,
+            'errors': [],
+            'batches': []
+        }
+        known_users = {}
+        pending = []
+        started = time.perf_counter()
+        
+        try:
+            for line_number, record in FeedbackImportService.iter_records(lines, file_format):
+                if isinstance(record, str):
+                    FeedbackImportService._reject(report, line_number, [record])
+                    continue
+                
+                row, errors = FeedbackImportService.normalize_record(record)
+                if errors:
+                    FeedbackImportService._reject(report, line_number, errors)
+                    continue
+                
+                pending.append((line_number, row))
+                if len(pending) >= batch_size:
+                    FeedbackImportService._write_batch(pending, known_users, report)
+                    pending = []
+            
+            if pending:
+                FeedbackImportService._write_batch(pending, known_users, report)
+                
+        except Exception as e:
+            report.update({
+                'success': False,
+                'message': f'Import failed after {report["imported"]} rows: {str(e)}'
+            })
+            return report
+        
+        seconds = time.perf_counter() - started
+        report.update({
+            'success': True,
+            'message': f'Imported {report["imported"]} feedback rows, rejected {report["rejected"]}',
+            'total_seconds': round(seconds, 4),
+            'rows_per_second': round(report['imported'] / seconds, 1) if seconds > 0 else 0.0
+        })
+        return report
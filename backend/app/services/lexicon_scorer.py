@@ -0,0 +1,361 @@
+import importlib.util
+import os
+import re
+import threading
+import xml.etree.ElementTree as ElementTree
+import numpy as np
+
+# Bump whenever tokenizing or scoring changes, so cached labels are recomputed
+# (2: NUL characters in a comment no longer split it into two documents)
+VERSION = 2
+
+# Same constants TextBlob's PatternAnalyzer uses for plain strings
+NEGATIONS = ('no', 'not', 'never')
+BOUNDARY = '\x00'
+EMOTICONS = {
+    1.0: ('<3', '♥', ':d', '8-d', 'x-d', ':-d', '=d', '>:d', 'xd', '=-d'),
+    0.75: (':-b', ':p', ':^)', ':-p', ':o)', '>:p', ':b', ':c)'),
+    0.5: ('>:)', '=]', ':)', ':>', '8)', '=)', ':-)', ':3', '8-)', ':}', ':]'),
+    0.25: (';-]', '*)', ';^)', ';]', '*-)', '>;]', ';-)', ';d', ';)'),
+    0.05: (':o', ':-o', '>:o', 'o.o', '°o°', 'o_o'),
+    -0.25: (':-s', ':-/', ':s', ':\\', '>:/', ':/', '>:\\', '>.>', ':-.'),
+    -0.75: (':(', '=(', ':-(', ':[', ':-<', '=/', ':-c', '>:[', ':-[', ':c', ':{'),
+    -1.0: (":'''(", ":'(", ";'(")
+}
+
+# Reference comments used to check label agreement with TextBlob
+REFERENCE_CORPUS = (
+    'Great service!',
+    'ok',
+    'The staff was very friendly and helpful.',
+    'Terrible experience, I will never come back.',
+    'The food was not good at all.',
+    'Not bad, but not great either.',
+    'Absolutely amazing support team!!!',
+    'It was fine.',
+    'The app keeps crashing and it is really frustrating.',
+    'I love the new design :)',
+    'Delivery was late and the package was damaged :(',
+    'Average experience, nothing special.',
+    'The checkout process is slow and confusing.',
+    'Excellent quality for the price.',
+    'I am not happy with the customer service.',
+    'Really not worth the money.',
+    'Best purchase I have made this year!',
+    'The website is easy to use.',
+    'Worst support ever.',
+    'Everything worked as expected.',
+    'The instructions were unclear and incomplete.',
+    'Pretty good overall, would recommend.',
+    'Extremely disappointed with the quality.',
+    'The room was clean and comfortable.',
+    'Nothing to complain about.',
+    'Horrible!',
+    'Quick response, very professional.',
+    'The price is too high for what you get.',
+    'I would not recommend this to anyone.',
+    'Super helpful, thanks a lot!',
+    'The product broke after two days.',
+    'Good',
+    'bad',
+    'meh',
+    'The team was incredibly patient and kind.',
+    'Shipping took forever.',
+    'Nice interface but the search is useless.',
+    'I am satisfied with the result.',
+    'The update made everything worse.',
+    'Wonderful experience from start to finish.',
+    'It is not the best, but it works.',
+    'Customer service never answered my emails.',
+    'Very very good',
+    'This is a happy day ;)',
+    'The tutorial was boring and too long.',
+    'Fantastic!!',
+    'Poor quality, cheap materials.',
+    'The refund was processed quickly.',
+    'I have mixed feelings about this.',
+    'Seriously awful packaging.'
+)
+
+_token_regex = None
+_lexicon = None
+_lexicon_lock = threading.Lock()
+
+def _sentiment_xml_path() -> str:
+    """Locate the en-sentiment.xml lexicon shipped with TextBlob without importing it."""
+    spec = importlib.util.find_spec('textblob')
+    if spec is None or not spec.submodule_search_locations:
+        raise ImportError('textblob is required to compile the sentiment lexicon')
+    return os.path.join(list(spec.submodule_search_locations)[0], 'en', 'en-sentiment.xml')
+
+def _average(values) -> list:
+    return [sum(column) / len(column) for column in zip(*values)]
+
+def compile_lexicon(path: str = None) -> dict:
+    """
+    Compile TextBlob's sentiment lexicon into sorted, compact NumPy arrays.
+    
+    Word senses are averaged per part-of-speech and then across tags, and
+    adverbs are derived from adjectives, exactly as TextBlob's loader does.
+    
+    Args:
+        path: Optional path of an en-sentiment.xml file
+    
+    Returns:
+        Dictionary of parallel arrays indexed by position in the sorted vocab
+    """
+    words = {}
+    root = ElementTree.parse(path or _sentiment_xml_path()).getroot()
+    for node in root.findall('word'):
+        form = node.attrib.get('form')
+        if not form:
+            continue
+        psi = (
+            float(node.attrib.get('polarity', 0.0)),
+            float(node.attrib.get('subjectivity', 0.0)),
+            float(node.attrib.get('intensity', 1.0))
+        )
+        words.setdefault(form, {}).setdefault(node.attrib.get('pos'), []).append(psi)
+    
+    # Average scores of all senses per tag, then of all tags
+    for form, by_pos in words.items():
+        words[form] = dict((pos, _average(psi)) for pos, psi in by_pos.items())
+        words[form][None] = _average(words[form].values())
+    
+    # Map adjectives to their adverbs ("terrible" -> "terribly"), as TextBlob does
+    for form, by_pos in list(words.items()):
+        if 'JJ' in by_pos:
+            if form.endswith('y'):
+                form = form[:-1] + 'i'
+            if form.endswith('le'):
+                form = form[:-2]
+            entry = words.setdefault(form + 'ly', {})
+            entry['RB'] = entry[None] = by_pos['JJ']
+    
+    # Negations, emoticons, "!" and the batch boundary share the vocabulary so
+    # a single searchsorted classifies every token
+    faces = dict(
+        (face, score)
+        for score, group in EMOTICONS.items()
+        for face in group
+        if not face.isalpha()
+    )
+    vocab = sorted(set(words) | set(NEGATIONS) | set(faces) | {'!', BOUNDARY})
+    size = len(vocab)
+    lexicon = {
+        'vocab': np.array(vocab),
+        'polarity': np.zeros(size, dtype=np.float64),
+        'intensity': np.ones(size, dtype=np.float64),
+        'known': np.zeros(size, dtype=bool),
+        'modifier': np.zeros(size, dtype=bool),
+        'ends_ly': np.zeros(size, dtype=bool),
+        'negation': np.zeros(size, dtype=bool),
+        'emoticon': np.zeros(size, dtype=bool)
+    }
+    for i, form in enumerate(vocab):
+        entry = words.get(form)
+        if entry is not None:
+            lexicon['polarity'][i], _, lexicon['intensity'][i] = entry[None]
+            lexicon['known'][i] = True
+            lexicon['modifier'][i] = 'RB' in entry
+            lexicon['ends_ly'][i] = form.endswith('ly')
+        elif form in faces:
+            lexicon['polarity'][i] = faces[form]
+            lexicon['emoticon'][i] = True
+        elif form in NEGATIONS:
+            lexicon['negation'][i] = True
+    return lexicon
+
+def get_lexicon() -> dict:
+    """Return the compiled lexicon, compiling it on first use."""
+    global _lexicon
+    if _lexicon is None:
+        with _lexicon_lock:
+            if _lexicon is None:
+                _lexicon = compile_lexicon()
+    return _lexicon
+
+def _token_pattern():
+    """Return the compiled batch tokenizer regex, mirroring TextBlob's token splits."""
+    global _token_regex
+    if _token_regex is None:
+        emoticons = sorted(
+            (e for group in EMOTICONS.values() for e in group),
+            key=len,
+            reverse=True
+        )
+        # Only try emoticons where one can start, keeping the scan cheap on words
+        symbolic = '|'.join(re.escape(e) for e in emoticons if not re.match(r'\w', e))
+        wordlike = '|'.join(re.escape(e) for e in emoticons if re.match(r'\w', e))
+        _token_regex = re.compile(
+            r'(?=[^\w\s])(?:' + symbolic + ')|(?:' + wordlike + r')(?!\w)'
+            + r"|\x00|\.\.\.|[^\W_]+(?=n't)|n(?='t)|[^\W_]+(?:[-*][^\W_]+)*|\S"
+        )
+    return _token_regex
+
+def tokenize_batch(texts: list) -> tuple:
+    """
+    Tokenize a whole batch with a single regex pass.
+    
+    Args:
+        texts: List of comment strings
+    
+    Returns:
+        Tuple of (tokens array, document index array per token)
+    """
+    # A NUL inside a comment would read as a document boundary
+    joined = (' ' + BOUNDARY + ' ').join(text.lower().replace(BOUNDARY, ' ') for text in texts)
+    tokens = np.array(_token_pattern().findall(joined) or [''], dtype=str)
+    docs = np.cumsum(tokens == BOUNDARY)
+    return tokens, docs
+
+def _last_before(mask: np.ndarray) -> np.ndarray:
+    """For every position, the index of the last earlier True in mask (or -1)."""
+    marks = np.where(mask, np.arange(mask.size), -1)
+    marks = np.maximum.accumulate(marks)
+    return np.concatenate(([-1], marks[:-1]))
+
+def polarity_batch(texts: list) -> np.ndarray:
+    """
+    Score the polarity of many texts at once.
+    
+    Reproduces pattern's assessment rules (intensifying adverbs, negation
+    carried over short words, "!" boosts and emoticons) with array scans
+    instead of a per-token Python loop, and averages assessments per text.
+    
+    Args:
+        texts: List of comment strings
+    
+    Returns:
+        Float array of polarity scores in [-1, 1], one per text
+    """
+    if not texts:
+        return np.zeros(0)
+    
+    lexicon = get_lexicon()
+    vocab = lexicon['vocab']
+    tokens, docs = tokenize_batch(texts)
+    
+    # Vectorized lexicon lookup
+    ids = np.minimum(np.searchsorted(vocab, tokens), vocab.size - 1)
+    found = vocab[ids] == tokens
+    known = found & lexicon['known'][ids]
+    polarity = np.where(found, lexicon['polarity'][ids], 0.0)
+    intensity = np.where(found, lexicon['intensity'][ids], 1.0)
+    is_modifier = known & lexicon['modifier'][ids]
+    ends_ly = known & lexicon['ends_ly'][ids]
+    negation = found & lexicon['negation'][ids]
+    emoticon = found & lexicon['emoticon'][ids]
+    boundary = tokens == BOUNDARY
+    
+    # Apostrophes are the only tokens the tokenizer leaves with quotes to strip
+    length = np.char.str_len(tokens)
+    stripped = np.where(tokens == "'", 0, length)
+    
+    # Unknown words longer than two characters drop a pending modifier,
+    # unknown words longer than one character drop a pending negation.
+    resets_modifier = (~known & (length > 2)) | boundary
+    resets_negation = (~known & ~negation & (stripped > 1)) | boundary
+    
+    # "really not good": a negation right after an -ly modifier negates the
+    # current assessment and leaves the modifier pending.
+    ly_negation = np.zeros(tokens.size, dtype=bool)
+    while True:
+        prev = _last_before(known | resets_modifier)
+        modifier_pending = (prev >= 0) & is_modifier[prev]
+        found = negation & modifier_pending & ends_ly[prev] & ~ly_negation
+        if not found.any():
+            break
+        ly_negation |= found
+        resets_modifier &= ~found
+    negation &= ~ly_negation
+    resets_negation |= ly_negation
+    
+    last_neg = _last_before(known | resets_negation | negation)
+    negation_pending = (last_neg >= 0) & negation[last_neg]
+    
+    # Known words and emoticons open an assessment; a known word right after
+    # a modifier instead rewrites the latest assessment.
+    opens = known | emoticon
+    starts = emoticon | (known & ~modifier_pending)
+    group = np.cumsum(starts) - 1
+    latest = _last_before(opens)
+    effective_intensity = np.where(known & negation_pending, 1.0 / intensity, intensity)
+    merged = np.clip(polarity * effective_intensity[latest], -1.0, 1.0)
+    member_polarity = np.where(starts, polarity, merged)
+    
+    members = np.flatnonzero(opens)
+    group_count = int(starts.sum())
+    group_polarity = np.zeros(group_count)
+    group_polarity[group[members]] = member_polarity[members]
+    last_member = np.full(group_count, -1)
+    last_member[group[members]] = members
+    
+    group_negated = np.zeros(group_count, dtype=bool)
+    group_negated[group[members[known[members] & negation_pending[members]]]] = True
+    group_negated[group[latest[ly_negation]]] = True
+    
+    # Each "!" right after the latest assessment boosts it by 25%
+    exclaims = np.flatnonzero(tokens == '!')
+    if exclaims.size:
+        target = _last_before(opens | boundary)[exclaims]
+        target = target[(target >= 0) & opens[np.maximum(target, 0)]]
+        target = target[last_member[group[target]] == target]
+        boosts = np.bincount(group[target], minlength=group_count)
+        group_polarity = np.clip(group_polarity * 1.25 ** boosts, -1.0, 1.0)
+    
+    group_polarity = np.where(group_negated, group_polarity * -0.5, group_polarity)
+    group_docs = docs[np.flatnonzero(starts)]
+    
+    totals = np.bincount(group_docs, weights=group_polarity, minlength=len(texts))
+    counts = np.bincount(group_docs, minlength=len(texts))
+    if totals.size != len(texts):
+        raise ValueError(f'Scored {totals.size} documents for {len(texts)} texts')
+    return totals / np.maximum(counts, 1)
+
+def classify(polarity: np.ndarray, positive: float = 0.1, negative: float = -0.1) -> list:
+    """
+    Map polarity scores to labels using the service thresholds.
+    
+    Args:
+        polarity: Array of polarity scores
+        positive: Scores above this are 'positive'
+        negative: Scores below this are 'negative'
+    
+    Returns:
+        List of 'positive', 'negative' or 'neutral' labels
+    """
+    labels = np.where(polarity > positive, 'positive', np.where(polarity < negative, 'negative', 'neutral'))
+    return labels.tolist()
+
+def verify_against_textblob(texts=REFERENCE_CORPUS) -> dict:
+    """
+    Compare vectorized labels with TextBlob's on a corpus.
+    
+    Args:
+        texts: Comments to compare
+    
+    Returns:
+        Dictionary with total, matches, agreement and the mismatched texts
+    """
+    from textblob import TextBlob
+    
+    expected = classify(np.array([TextBlob(text).sentiment.polarity for text in texts]))
+    actual = classify(polarity_batch(list(texts)))
+    mismatches = [
+        {'text': text, 'textblob': e, 'vectorized': a}
+        for text, e, a in zip(texts, expected, actual)
+        if e != a
+    ]
+    return {
+        'total': len(texts),
+        'matches': len(texts) - len(mismatches),
+        'agreement': round(1 - len(mismatches) / len(texts), 4) if texts else 1.0,
+        'mismatches': mismatches
+    }
+
+if __name__ == '__main__':
+    report = verify_against_textblob()
+    print(f"Label agreement with TextBlob: {report['matches']}/{report['total']} ({report['agreement']:.2%})")
+    for mismatch in report['mismatches']:
+        print(f"  {mismatch['text']!r}: textblob={mismatch['textblob']} vectorized={mismatch['vectorized']}")
@@ -0,0 +1,269 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+import bcrypt
+from app.metrics import registry
+from config import Config
+
+class PasswordHashingOverloaded(Exception):
+    """Raised when the bcrypt executor's queue is full."""
+
+class PasswordHasher:
+    """
+    Runs bcrypt on a dedicated, size-limited thread pool.
+    
+    bcrypt releases the GIL, so a small pool keeps hashing parallel while
+    capping how many cores a login burst can take from other endpoints.
+    Work beyond the pool size waits in a bounded queue; once that is full
+    new calls fail fast with PasswordHashingOverloaded.
+    """
+    
+    def __init__(self, workers: int = None, queue_size: int = None, rounds: int = None):
+        """
+        Initialize the hasher; the pool starts on first use.
+        
+        Args:
+            workers: Number of bcrypt threads
+            queue_size: Calls allowed to wait for a free thread
+            rounds: bcrypt cost factor for new hashes
+        """
+        self.workers = workers or Config.BCRYPT_WORKERS
+        self.queue_size = queue_size if queue_size is not None else Config.BCRYPT_QUEUE_SIZE
+        self.rounds = rounds or Config.BCRYPT_ROUNDS
+        self._executor = None
+        self._executor_lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(self.workers + self.queue_size)
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._rejected = 0
+        self._upgraded = 0
+        self._latency = {
+            operation: registry.histogram('bcrypt_seconds', 'Time spent in bcrypt', operation=operation)
+            for operation in ('hash', 'verify')
+        }
+        self._queue_wait = registry.histogram(
+            'bcrypt_queue_wait_seconds', 'Time bcrypt calls waited for a free hashing thread'
+        )
+        self._rejected_total = registry.counter(
+            'bcrypt_rejected_total', 'bcrypt calls rejected because the hashing queue was full'
+        )
+    
+    def _get_executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            with self._executor_lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(
+                        max_workers=self.workers,
+                        thread_name_prefix='bcrypt'
+                    )
+        return self._executor
+    
+    def _timed(self, operation: str, function, *args):
+        """Wrap function to record its queue wait and bcrypt time."""
+        enqueued = time.perf_counter()
+        
+        def timed():
+            started = time.perf_counter()
+            self._queue_wait.observe(started - enqueued)
+            try:
+                return function(*args)
+            finally:
+                self._latency[operation].observe(time.perf_counter() - started)
+        
+        return timed
+    
+    def _run(self, operation: str, function, *args):
+        """Run function on the pool and block until it finishes."""
+        future = self._submit(self._timed(operation, function, *args))
+        return future.result(timeout=Config.BCRYPT_TIMEOUT_SECONDS)
+    
+    async def _run_async(self, operation: str, function, *args):
+        """Run function on the pool and await it without blocking the event loop."""
+        import asyncio
+        future = self._submit(self._timed(operation, function, *args))
+        return await asyncio.wait_for(asyncio.wrap_future(future), Config.BCRYPT_TIMEOUT_SECONDS)
+    
+    def _submit(self, function):
+        """Submit to the pool if a slot is free, otherwise reject immediately."""
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self._rejected += 1
+            self._rejected_total.inc()
+            raise PasswordHashingOverloaded('Password hashing queue is full')
+        
+        with self._lock:
+            self._pending += 1
+        
+        def release():
+            with self._lock:
+                self._pending -= 1
+            self._slots.release()
+        
+        def run():
+            # Free the slot before the result wakes the caller, so it can submit again at once
+            try:
+                return function()
+            finally:
+                release()
+        
+        try:
+            return self._get_executor().submit(run)
+        except Exception:
+            release()
+            raise
+    
+    def hash(self, password: str) -> str:
+        """
+        Hash a password at the configured cost.
+        
+        Args:
+            password: Plain text password
+        
+        Returns:
+            Hashed password string
+        
+        Raises:
+            PasswordHashingOverloaded: If the queue is full
+        """
+        salt = bcrypt.gensalt(rounds=self.rounds)
+        hashed = self._run('hash', bcrypt.hashpw, password.encode('utf-8'), salt)
+        return hashed.decode('utf-8')
+    
+    def verify(self, password: str, password_hash: str) -> bool:
+        """
+        Verify a password against its hash.
+        
+        Args:
+            password: Plain text password to verify
+            password_hash: Stored password hash
+        
+        Returns:
+            True if password matches, False otherwise
+        
+        Raises:
+            PasswordHashingOverloaded: If the queue is full
+        """
+        return self._run('verify', bcrypt.checkpw, password.encode('utf-8'), password_hash.encode('utf-8'))
+    
+    async def hash_async(self, password: str) -> str:
+        """
+        Async hash(): awaits the pool instead of blocking a thread.
+        
+        Args:
+            password: Plain text password
+        
+        Returns:
+            Hashed password string
+        
+        Raises:
+            PasswordHashingOverloaded: If the queue is full
+        """
+        salt = bcrypt.gensalt(rounds=self.rounds)
+        hashed = await self._run_async('hash', bcrypt.hashpw, password.encode('utf-8'), salt)
+        return hashed.decode('utf-8')
+    
+    async def verify_async(self, password: str, password_hash: str) -> bool:
+        """
+        Async verify(): awaits the pool instead of blocking a thread.
+        
+        Args:
+            password: Plain text password to verify
+            password_hash: Stored password hash
+        
+        Returns:
+            True if password matches, False otherwise
+        
+        Raises:
+            PasswordHashingOverloaded: If the queue is full
+        """
+        return await self._run_async('verify', bcrypt.checkpw, password.encode('utf-8'), password_hash.encode('utf-8'))
+    
+    def warm_up(self) -> float:
+        """
+        Load bcrypt and time one hash at the configured cost, on the calling thread.
+        
+        Returns:
+            Seconds the hash took
+        """
+        started = time.perf_counter()
+        password_hash = self.hash_direct('warm up')
+        seconds = time.perf_counter() - started
+        bcrypt.checkpw(b'warm up', password_hash.encode('utf-8'))
+        return seconds
+    
+    def needs_rehash(self, password_hash: str) -> bool:
+        """
+        Check whether a hash was made at a different cost than configured.
+        
+        Args:
+            password_hash: Stored password hash ('$2b$<cost>$...')
+        
+        Returns:
+            True if the hash should be regenerated
+        """
+        try:
+            return int(password_hash.split('$')[2]) != self.rounds
+        except (IndexError, ValueError):
+            return False
+    
+    def rehash_in_background(self, password: str, on_done) -> bool:
+        """
+        Regenerate a hash at the current cost without blocking the caller.
+        
+        Skipped (not rejected) when the queue is full; the next login retries.
+        
+        Args:
+            password: Plain text password that was just verified
+            on_done: Callback receiving the new hash string
+        
+        Returns:
+            True if the rehash was scheduled
+        """
+        def rehash():
+            new_hash = self.hash_direct(password)
+            on_done(new_hash)
+            with self._lock:
+                self._upgraded += 1
+        
+        try:
+            self._submit(rehash)
+        except PasswordHashingOverloaded:
+            return False
+        return True
+    
+    def hash_direct(self, password: str) -> str:
+        """Hash on the calling thread (for use from within the pool)."""
+        started = time.perf_counter()
+        try:
+            salt = bcrypt.gensalt(rounds=self.rounds)
+            return bcrypt.hashpw(password.encode('utf-8'), salt).decode('utf-8')
+        finally:
+            self._latency['hash'].observe(time.perf_counter() - started)
+    
+    def stats(self) -> dict:
+        """
+        Return pool sizing counters and per-call latency histograms.
+        
+        Returns:
+            Dictionary with configuration, pending/rejected/upgraded counts and latencies
+        """
+        with self._lock:
+            pending = self._pending
+            rejected = self._rejected
+            upgraded = self._upgraded
+        
+        return {
+            'rounds': self.rounds,
+            'workers': self.workers,
+            'queue_size': self.queue_size,
+            'pending': pending,
+            'rejected': rejected,
+            'upgraded_hashes': upgraded,
+            'hash_seconds': self._latency['hash'].snapshot(),
+            'verify_seconds': self._latency['verify'].snapshot(),
+            'queue_wait_seconds': self._queue_wait.snapshot()
+        }
+
+# Shared hasher used by AuthenticationService
+password_hasher = PasswordHasher()
+registry.gauge('bcrypt_pending', 'bcrypt calls running or waiting', lambda: password_hasher.stats()['pending'])
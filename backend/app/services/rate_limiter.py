@@ -0,0 +1,282 @@
+import math
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+import app.database as database
+from app.metrics import registry
+from config import Config
+
+class MemoryBuckets:
+    """Token buckets in a dictionary, private to this process."""
+    
+    def __init__(self, max_keys: int):
+        """
+        Initialize an empty bucket table.
+        
+        Args:
+            max_keys: Buckets kept before the least recently used is dropped
+        """
+        self.max_keys = max_keys
+        self._buckets = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def take(self, key: str, capacity: float, rate: float, now: float) -> float:
+        """
+        Take one token from a bucket.
+        
+        Args:
+            key: Bucket key
+            capacity: Bucket size (burst)
+            rate: Tokens added per second
+            now: Current time (time.time())
+        
+        Returns:
+            0 if a token was taken, else seconds until one is available
+        """
+        with self._lock:
+            tokens, updated_at = self._buckets.pop(key, (capacity, now))
+            tokens = min(capacity, tokens + (now - updated_at) * rate)
+            if tokens >= 1:
+                tokens -= 1
+                wait = 0.0
+            else:
+                wait = (1 - tokens) / rate
+            self._buckets[key] = (tokens, now)
+            if len(self._buckets) > self.max_keys:
+                # A spray of distinct usernames must not grow memory without bound
+                self._buckets.popitem(last=False)
+        return wait
+    
+    def evict(self, capacity: dict, rate: dict, now: float) -> int:
+        """
+        Drop buckets that have refilled completely (a full bucket is the same as none).
+        
+        Args:
+            capacity: Scope -> bucket size
+            rate: Scope -> tokens added per second
+            now: Current time (time.time())
+        
+        Returns:
+            Number of buckets dropped
+        """
+        with self._lock:
+            full = []
+            for key, (tokens, updated_at) in self._buckets.items():
+                scope = key.split(':', 1)[0]
+                if tokens + (now - updated_at) * rate[scope] >= capacity[scope]:
+                    full.append(key)
+            for key in full:
+                del self._buckets[key]
+        return len(full)
+    
+    def size(self) -> int:
+        """Return the number of buckets held."""
+        return len(self._buckets)
+
+class SqliteBuckets:
+    """
+    Token buckets in a small SQLite file next to the database.
+    
+    Every worker process on the host opens the same file, so a burst spread
+    over workers drains one bucket. The file is separate from feedback.db and
+    unsynced: its writes never take the feedback write lock, and losing it
+    only resets the limits.
+    """
+    
+    def __init__(self):
+        self._local = threading.local()
+    
+    def _connection(self) -> sqlite3.Connection:
+        """Return this thread's connection to the bucket file of the current DATABASE_PATH."""
+        path = database.DATABASE_PATH + '-ratelimit'
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or self._local.path != path:
+            conn = sqlite3.connect(path, timeout=Config.DB_BUSY_TIMEOUT_MS / 1000, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=OFF')
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS rate_limit_buckets (
+                    key TEXT PRIMARY KEY,
+                    tokens REAL NOT NULL,
+                    updated_at REAL NOT NULL,
+                    full_at REAL NOT NULL
+                ) WITHOUT ROWID
+            ''')
+            conn.execute('CREATE INDEX IF NOT EXISTS idx_rate_limit_buckets_full_at ON rate_limit_buckets(full_at)')
+            self._local.conn = conn
+            self._local.path = path
+        return conn
+    
+    def take(self, key: str, capacity: float, rate: float, now: float) -> float:
+        """Take one token from a bucket (see MemoryBuckets.take)."""
+        conn = self._connection()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            row = conn.execute(
+                'SELECT tokens, updated_at FROM rate_limit_buckets WHERE key = ?', (key,)
+            ).fetchone()
+            tokens = capacity if row is None else min(capacity, row[0] + (now - row[1]) * rate)
+            if tokens >= 1:
+                tokens -= 1
+                wait = 0.0
+            else:
+                wait = (1 - tokens) / rate
+            conn.execute(
+                'INSERT OR REPLACE INTO rate_limit_buckets (key, tokens, updated_at, full_at) VALUES (?, ?, ?, ?)',
+                (key, tokens, now, now + (capacity - tokens) / rate)
+            )
+            conn.execute('COMMIT')
+        except sqlite3.Error:
+            conn.execute('ROLLBACK')
+            raise
+        return wait
+    
+    def evict(self, capacity: dict, rate: dict, now: float) -> int:
+        """Drop buckets that have refilled completely (see MemoryBuckets.evict)."""
+        return self._connection().execute('DELETE FROM rate_limit_buckets WHERE full_at <= ?', (now,)).rowcount
+    
+    def size(self) -> int:
+        """Return the number of buckets held."""
+        return self._connection().execute('SELECT COUNT(*) FROM rate_limit_buckets').fetchone()[0]
+
+class RateLimiter:
+    """
+    Token-bucket limiter for the bcrypt-heavy auth routes.
+    
+    Every attempt takes a token from the bucket of the client IP and of the
+    username; an empty bucket rejects the request before any hashing. Buckets
+    refill continuously and are evicted once full again.
+    """
+    
+    SCOPES = ('ip', 'username')
+    
+    def __init__(self, backend: str = None):
+        """
+        Initialize the limiter.
+        
+        Args:
+            backend: 'memory' (per process) or 'sqlite' (shared by the worker processes on a host)
+        """
+        self.enabled = Config.RATE_LIMIT_ENABLED
+        self.backend = backend or Config.RATE_LIMIT_BACKEND
+        self.capacity = {'ip': Config.RATE_LIMIT_IP_BURST, 'username': Config.RATE_LIMIT_USERNAME_BURST}
+        self.rate = {
+            'ip': Config.RATE_LIMIT_IP_PER_MINUTE / 60,
+            'username': Config.RATE_LIMIT_USERNAME_PER_MINUTE / 60
+        }
+        self._buckets = MemoryBuckets(Config.RATE_LIMIT_MAX_KEYS) if self.backend == 'memory' else SqliteBuckets()
+        self._next_eviction = 0.0
+        self._lock = threading.Lock()
+        self._stats = {'allowed': 0, 'rejected_ip': 0, 'rejected_username': 0, 'errors': 0, 'evicted': 0}
+        self._rejections = {
+            scope: registry.counter('auth_rate_limited_total', 'Auth requests rejected by the rate limiter', scope=scope)
+            for scope in self.SCOPES
+        }
+    
+    @staticmethod
+    def client_ip(request) -> str:
+        """
+        Return the client address of a Flask or Quart request.
+        
+        With RATE_LIMIT_TRUSTED_PROXIES set, the address is read from
+        X-Forwarded-For as appended by the last trusted proxy.
+        """
+        hops = Config.RATE_LIMIT_TRUSTED_PROXIES
+        if hops:
+            forwarded = [part.strip() for part in request.headers.get('X-Forwarded-For', '').split(',') if part.strip()]
+            if len(forwarded) >= hops:
+                return forwarded[-hops]
+        return request.remote_addr or 'unknown'
+    
+    def check(self, ip: str, username=None, now: float = None) -> float:
+        """
+        Take a token for an auth attempt from the IP and username buckets.
+        
+        Args:
+            ip: Client address
+            username: Username the attempt is for, if any
+            now: Current time (default: time.time())
+        
+        Returns:
+            0 if the attempt may proceed, else seconds until it may be retried
+        """
+        if not self.enabled:
+            return 0.0
+        
+        now = time.time() if now is None else now
+        if now >= self._next_eviction:
+            self._evict(now)
+        
+        keys = [('ip', ip)]
+        if isinstance(username, str) and username.strip():
+            keys.append(('username', username.strip().lower()[:Config.RATE_LIMIT_MAX_USERNAME_LENGTH]))
+        
+        for scope, value in keys:
+            try:
+                wait = self._buckets.take(f'{scope}:{value}', self.capacity[scope], self.rate[scope], now)
+            except sqlite3.Error as e:
+                # Fail open: a broken limiter must not lock everyone out
+                with self._lock:
+                    self._stats['errors'] += 1
+                print(f"Rate limiter failed: {str(e)}")
+                return 0.0
+            if wait:
+                with self._lock:
+                    self._stats['rejected_' + scope] += 1
+                self._rejections[scope].inc()
+                return wait
+        
+        with self._lock:
+            self._stats['allowed'] += 1
+        return 0.0
+    
+    async def check_async(self, ip: str, username=None) -> float:
+        """Same as check; the SQLite backend runs on the DB executor."""
+        if self.backend == 'memory' or not self.enabled:
+            return self.check(ip, username)
+        from app.aio import run_db
+        return await run_db(self.check, ip, username)
+    
+    @staticmethod
+    def retry_after(wait: float) -> str:
+        """Format a wait in seconds as a Retry-After header value."""
+        return str(max(1, math.ceil(wait)))
+    
+    def _evict(self, now: float):
+        with self._lock:
+            if now < self._next_eviction:
+                return
+            self._next_eviction = now + Config.RATE_LIMIT_EVICT_INTERVAL_SECONDS
+        try:
+            evicted = self._buckets.evict(self.capacity, self.rate, now)
+        except sqlite3.Error as e:
+            print(f"Rate limiter eviction failed: {str(e)}")
+            return
+        with self._lock:
+            self._stats['evicted'] += evicted
+    
+    def stats(self) -> dict:
+        """
+        Return limiter settings and counters.
+        
+        Returns:
+            Dictionary with backend, limits, bucket count and allowed/rejected counts
+        """
+        with self._lock:
+            stats = dict(self._stats)
+        try:
+            stats['buckets'] = self._buckets.size()
+        except sqlite3.Error:
+            stats['buckets'] = None
+        stats.update({
+            'enabled': self.enabled,
+            'backend': self.backend,
+            'ip_burst': self.capacity['ip'],
+            'ip_per_minute': self.rate['ip'] * 60,
+            'username_burst': self.capacity['username'],
+            'username_per_minute': self.rate['username'] * 60
+        })
+        return stats
+
+rate_limiter = RateLimiter()
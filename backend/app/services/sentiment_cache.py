@@ -0,0 +1,217 @@
+import hashlib
+import re
+import sqlite3
+import threading
+import unicodedata
+from app.cache import TTLCache
+from app.database import get_db_connection
+from app.metrics import registry
+from config import Config
+
+_WHITESPACE = re.compile(r'\s+')
+
+class SentimentCache:
+    """
+    Content-addressed cache of sentiment labels.
+    
+    Labels are keyed by (classifier version, SHA-256 of the normalized text).
+    An in-process LRU sits in front of the sentiment_cache table, so repeated
+    comments skip scoring across batches, workers and restarts. When the
+    classifier version changes (library upgrade, scorer change, thresholds),
+    entries of the old versions are purged.
+    """
+    
+    def __init__(self, maxsize: int):
+        """
+        Initialize an empty cache.
+        
+        Args:
+            maxsize: Entries kept in the in-process LRU
+        """
+        self._memory = TTLCache(maxsize, float('inf'))
+        self._lock = threading.Lock()
+        self._versions = None
+        self._stats = {'memory_hits': 0, 'store_hits': 0, 'misses': 0, 'stored': 0, 'store_errors': 0, 'purged': 0}
+        self._lookups = {
+            result: registry.counter('sentiment_cache_lookups_total', 'Sentiment cache lookups by result', result=result)
+            for result in ('memory', 'store', 'miss')
+        }
+    
+    @staticmethod
+    def normalize(text: str) -> str:
+        """
+        Normalize text so trivially different copies share an entry.
+        
+        Case and runs of whitespace do not change TextBlob's polarity (both
+        classifiers lowercase and split on whitespace), so they are folded.
+        """
+        return _WHITESPACE.sub(' ', unicodedata.normalize('NFC', text or '')).strip().lower()
+    
+    @staticmethod
+    def text_hash(text: str) -> bytes:
+        """Return the 32-byte SHA-256 digest of the normalized text."""
+        return hashlib.sha256(SentimentCache.normalize(text).encode('utf-8')).digest()
+    
+    def sync_versions(self, versions: dict):
+        """
+        Make sure only the given classifier versions are cached.
+        
+        The first call in a process, and any call after a version change,
+        drops entries of every other version from memory and the table.
+        
+        Args:
+            versions: Classifier name -> current version string
+        """
+        current = frozenset(versions.values())
+        if current == self._versions:
+            return
+        
+        with self._lock:
+            if current == self._versions:
+                return
+            self._memory.clear()
+            
+            conn = get_db_connection('sentiment_cache')
+            try:
+                cursor = conn.cursor()
+                cursor.execute(
+                    f'DELETE FROM sentiment_cache WHERE version NOT IN ({",".join("?" * len(current))})',
+                    sorted(current)
+                )
+                conn.commit()
+                self._stats['purged'] += cursor.rowcount
+            except sqlite3.Error as e:
+                conn.rollback()
+                print(f"Failed to purge sentiment cache: {str(e)}")
+            finally:
+                conn.close()
+            self._versions = current
+    
+    def get_many(self, version: str, texts: list) -> list:
+        """
+        Look up cached labels, memory first, then one query per 500 misses.
+        
+        Args:
+            version: Classifier version the labels must come from
+            texts: Texts to look up
+        
+        Returns:
+            List with the cached label or None for each text
+        """
+        labels = [None] * len(texts)
+        missing = {}
+        memory_hits = 0
+        for i, text in enumerate(texts):
+            digest = self.text_hash(text)
+            label = self._memory.get((version, digest))
+            if label is None:
+                missing.setdefault(digest, []).append(i)
+            else:
+                labels[i] = label
+                memory_hits += 1
+        
+        store_hits = 0
+        if missing:
+            conn = get_db_connection('sentiment_cache')
+            try:
+                digests = list(missing)
+                for start in range(0, len(digests), 500):
+                    chunk = digests[start:start + 500]
+                    rows = conn.execute(
+                        'SELECT text_hash, sentiment FROM sentiment_cache '
+                        f'WHERE version = ? AND text_hash IN ({",".join("?" * len(chunk))})',
+                        [version, *chunk]
+                    ).fetchall()
+                    for row in rows:
+                        digest = bytes(row['text_hash'])
+                        self._memory.set((version, digest), row['sentiment'])
+                        for i in missing.pop(digest, ()):
+                            labels[i] = row['sentiment']
+                            store_hits += 1
+            except sqlite3.Error as e:
+                print(f"Sentiment cache lookup failed: {str(e)}")
+            finally:
+                conn.close()
+        
+        misses = len(texts) - memory_hits - store_hits
+        with self._lock:
+            self._stats['memory_hits'] += memory_hits
+            self._stats['store_hits'] += store_hits
+            self._stats['misses'] += misses
+        self._lookups['memory'].inc(memory_hits)
+        self._lookups['store'].inc(store_hits)
+        self._lookups['miss'].inc(misses)
+        return labels
+    
+    def get(self, version: str, text: str) -> str:
+        """Look up one cached label (None on a miss)."""
+        return self.get_many(version, [text])[0]
+    
+    def put_many(self, version: str, results: list):
+        """
+        Cache freshly scored labels in memory and the table.
+        
+        The write uses a side-pool connection, so callers must not hold an
+        open write transaction of their own (it would wait on the lock).
+        
+        Args:
+            version: Classifier version that produced the labels
+            results: List of (text, label) tuples
+        """
+        rows = {}
+        for text, label in results:
+            digest = self.text_hash(text)
+            self._memory.set((version, digest), label)
+            rows[digest] = label
+        if not rows:
+            return
+        
+        conn = get_db_connection('sentiment_cache')
+        try:
+            conn.executemany(
+                'INSERT OR IGNORE INTO sentiment_cache (version, text_hash, sentiment) VALUES (?, ?, ?)',
+                [(version, digest, label) for digest, label in rows.items()]
+            )
+            conn.commit()
+            with self._lock:
+                self._stats['stored'] += len(rows)
+        except sqlite3.Error as e:
+            conn.rollback()
+            with self._lock:
+                self._stats['store_errors'] += 1
+            print(f"Failed to store sentiment cache entries: {str(e)}")
+        finally:
+            conn.close()
+    
+    def put(self, version: str, text: str, label: str):
+        """Cache one freshly scored label."""
+        self.put_many(version, [(text, label)])
+    
+    def stats(self) -> dict:
+        """
+        Return hit ratios and table size.
+        
+        Returns:
+            Dictionary with hits by tier, misses, hit_ratio, the LRU stats and
+            the number of entries stored for the current versions
+        """
+        with self._lock:
+            stats = dict(self._stats)
+            versions = sorted(self._versions or ())
+        lookups = stats['memory_hits'] + stats['store_hits'] + stats['misses']
+        stats['lookups'] = lookups
+        stats['hit_ratio'] = round((stats['memory_hits'] + stats['store_hits']) / lookups, 4) if lookups else 0.0
+        stats['memory_hit_ratio'] = round(stats['memory_hits'] / lookups, 4) if lookups else 0.0
+        stats['memory'] = self._memory.stats()
+        stats['versions'] = versions
+        
+        conn = get_db_connection('sentiment_cache')
+        try:
+            stats['stored_entries'] = conn.execute('SELECT COUNT(*) FROM sentiment_cache').fetchone()[0]
+        except sqlite3.Error:
+            stats['stored_entries'] = None
+        finally:
+            conn.close()
+        return stats
+
+sentiment_cache = SentimentCache(Config.SENTIMENT_CACHE_SIZE)
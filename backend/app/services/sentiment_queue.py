@@ -0,0 +1,280 @@
+import queue
+import threading
+import time
+import app.database as database
+from app import partitions
+from app.database import get_db_connection
+from app.metrics import registry
+from app.services.sentiment_service import SentimentAnalysisService
+from config import Config
+
+try:
+    import fcntl
+except ImportError:
+    # No flock (Windows): every process requeues unscored feedback
+    fcntl = None
+
+class SentimentQueue:
+    """Background worker pool that classifies feedback sentiment in batches."""
+    
+    def __init__(self, workers: int = None, batch_size: int = None,
+                 batch_wait: float = None, maxsize: int = None):
+        """
+        Initialize the queue; worker threads start with start() or on first use.
+        
+        Args:
+            workers: Number of worker threads
+            batch_size: Maximum feedback items classified per batch
+            batch_wait: Seconds a worker waits to fill a batch after the first item
+            maxsize: Maximum number of queued items before enqueue() refuses
+        """
+        self.workers = workers or Config.SENTIMENT_WORKERS
+        self.batch_size = batch_size or Config.SENTIMENT_BATCH_SIZE
+        self.batch_wait = batch_wait if batch_wait is not None else Config.SENTIMENT_BATCH_WAIT_SECONDS
+        self._queue = queue.Queue(maxsize or Config.SENTIMENT_QUEUE_MAXSIZE)
+        self._threads = []
+        self._requeuer = None
+        self._requeue_lock = None
+        self._lock = threading.Lock()
+        self._stopping = threading.Event()
+        self._stats = {
+            'enqueued': 0,
+            'requeued': 0,
+            'rejected': 0,
+            'processed': 0,
+            'failed': 0,
+            'batches': 0,
+            'in_flight': 0,
+            'last_batch_size': 0,
+            'last_batch_seconds': 0.0,
+            'last_lag_seconds': 0.0,
+            'max_lag_seconds': 0.0
+        }
+    
+    def start(self, requeue: bool = False):
+        """
+        Start the worker threads.
+        
+        Called once per serving process at startup (after the fork under
+        gunicorn); enqueue() starts the workers too, but never requeues.
+        
+        Args:
+            requeue: Also requeue feedback left unscored, on a thread of its
+                own so startup does not wait for the scan (see requeue())
+        """
+        with self._lock:
+            if not self._threads:
+                self._stopping.clear()
+                for i in range(self.workers):
+                    thread = threading.Thread(
+                        target=self._run,
+                        name=f'sentiment-worker-{i}',
+                        daemon=True
+                    )
+                    thread.start()
+                    self._threads.append(thread)
+            if not requeue or self._requeuer is not None:
+                return
+            # Rows created from now on are queued by the request that wrote them
+            self._requeuer = threading.Thread(
+                target=self.requeue,
+                args=(partitions.utc_now(),),
+                name='sentiment-requeue',
+                daemon=True
+            )
+            self._requeuer.start()
+    
+    def stop(self, timeout: float = 5.0):
+        """
+        Stop the worker threads once the queue has drained, and give up the requeue lock.
+        
+        Args:
+            timeout: Seconds to wait for each worker to finish
+        """
+        self._stopping.set()
+        with self._lock:
+            threads, self._threads = self._threads, []
+            if self._requeuer is not None:
+                threads.insert(0, self._requeuer)
+                self._requeuer = None
+        for thread in threads:
+            thread.join(timeout)
+        with self._lock:
+            handle, self._requeue_lock = self._requeue_lock, None
+        if handle is not None:
+            handle.close()
+    
+    def enqueue(self, feedback_id: int, text: str) -> bool:
+        """
+        Queue a feedback item for background classification.
+        
+        Args:
+            feedback_id: ID of the feedback
+            text: Comment text to classify
+        
+        Returns:
+            True if queued, False if the queue is full
+        """
+        if not self._threads:
+            self.start()
+        
+        try:
+            self._queue.put_nowait((feedback_id, text, time.monotonic()))
+        except queue.Full:
+            with self._lock:
+                self._stats['rejected'] += 1
+            return False
+        
+        with self._lock:
+            self._stats['enqueued'] += 1
+        return True
+    
+    def requeue(self, created_before: str = None) -> int:
+        """
+        Requeue unscored feedback, unless another process serving the database has.
+        
+        The first process to get here holds the <database>-requeue lock until
+        it stops or exits, so the other workers of a prefork server do not
+        queue (and classify) the same rows again. A process started after
+        the holder exits takes the lock over and requeues what was lost.
+        
+        Args:
+            created_before: Only requeue rows created before this created_at
+        
+        Returns:
+            Number of rows queued, or None if another process holds the lock
+        """
+        if fcntl is not None:
+            handle = open(database.DATABASE_PATH + '-requeue', 'a')
+            try:
+                fcntl.flock(handle.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except OSError:
+                handle.close()
+                return None
+            with self._lock:
+                previous, self._requeue_lock = self._requeue_lock, handle
+            if previous is not None:
+                previous.close()
+        
+        queued = self.enqueue_unscored(created_before)
+        with self._lock:
+            self._stats['requeued'] += queued
+        return queued
+    
+    def enqueue_unscored(self, created_before: str = None) -> int:
+        """
+        Queue every feedback row that still has no sentiment.
+        
+        Covers items lost from the in-memory queue by a restart; servers call
+        requeue() instead, so that only one process does this.
+        
+        Args:
+            created_before: Only queue rows created before this created_at
+        
+        Returns:
+            Number of rows queued
+        """
+        conn = get_db_connection()
+        rows = []
+        
+        try:
+            # Oldest partition first, like the ids
+            for key in partitions.keys(newest_first=False):
+                with partitions.attached(conn, key) as schema:
+                    rows.extend(conn.execute(
+                        f'''SELECT id, comment FROM {schema}.feedback
+                            WHERE sentiment IS NULL AND (? IS NULL OR created_at < ?) ORDER BY id''',
+                        (created_before, created_before)
+                    ).fetchall())
+        except Exception as e:
+            print(f"Failed to load unscored feedback: {str(e)}")
+            return 0
+        finally:
+            conn.close()
+        
+        queued = 0
+        for row in rows:
+            if not self.enqueue(row['id'], row['comment']):
+                break
+            queued += 1
+        return queued
+    
+    def _next_batch(self) -> list:
+        """Block for one item, then collect more until full or batch_wait elapses."""
+        try:
+            batch = [self._queue.get(timeout=0.5)]
+        except queue.Empty:
+            return []
+        
+        deadline = time.monotonic() + self.batch_wait
+        while len(batch) < self.batch_size:
+            remaining = deadline - time.monotonic()
+            try:
+                if remaining > 0:
+                    batch.append(self._queue.get(timeout=remaining))
+                else:
+                    batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+    
+    def _run(self):
+        """Worker loop: classify batches and write them back in one transaction."""
+        while not (self._stopping.is_set() and self._queue.empty()):
+            batch = self._next_batch()
+            if not batch:
+                continue
+            
+            with self._lock:
+                self._stats['in_flight'] += len(batch)
+            started = time.monotonic()
+            
+            try:
+                sentiments = SentimentAnalysisService.analyze_batch([text for _, text, _ in batch])
+                results = [(feedback_id, sentiment) for (feedback_id, _, _), sentiment in zip(batch, sentiments)]
+                stored = SentimentAnalysisService.update_feedback_sentiments(results)
+                failed = len(batch) - stored
+            except Exception as e:
+                print(f"Sentiment batch failed: {str(e)}")
+                failed = len(batch)
+            
+            finished = time.monotonic()
+            lag = finished - min(enqueued_at for _, _, enqueued_at in batch)
+            with self._lock:
+                self._stats['in_flight'] -= len(batch)
+                self._stats['processed'] += len(batch) - failed
+                self._stats['failed'] += failed
+                self._stats['batches'] += 1
+                self._stats['last_batch_size'] = len(batch)
+                self._stats['last_batch_seconds'] = round(finished - started, 4)
+                self._stats['last_lag_seconds'] = round(lag, 4)
+                self._stats['max_lag_seconds'] = max(self._stats['max_lag_seconds'], round(lag, 4))
+            
+            for _ in batch:
+                self._queue.task_done()
+    
+    def join(self):
+        """Block until every queued item has been processed."""
+        self._queue.join()
+    
+    def status(self) -> dict:
+        """
+        Return queue depth, lag and throughput counters.
+        
+        Returns:
+            Dictionary with depth, oldest_pending_seconds, worker count and counters
+        """
+        with self._queue.mutex:
+            oldest = self._queue.queue[0][2] if self._queue.queue else None
+        
+        with self._lock:
+            status = dict(self._stats)
+            status['workers'] = len(self._threads)
+        
+        status['depth'] = self._queue.qsize()
+        status['oldest_pending_seconds'] = round(time.monotonic() - oldest, 4) if oldest else 0.0
+        return status
+
+# Shared queue used by the feedback routes
+sentiment_queue = SentimentQueue()
+registry.gauge('sentiment_queue_depth', 'Feedback items waiting for classification', sentiment_queue._queue.qsize)
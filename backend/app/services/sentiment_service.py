@@ -1,14 +1,93 @@
-from textblob import TextBlob
-from app.database import get_db_connection
+import importlib.metadata
+import time
+from app import partitions
+from app.data_version import data_version
+from app.metrics import registry
+from app.services.sentiment_cache import sentiment_cache
+from config import Config
+
+_textblob_version = None
+
+def textblob_version() -> str:
+    """
+    Return TextBlob's version from the installed package metadata.
+    
+    Importing textblob loads NLTK (about 0.3 s), which the batch scorer and
+    processes that never classify should not pay just to name a cache version.
+    
+    Raises:
+        ImportError: If textblob is not installed
+    """
+    global _textblob_version
+    if _textblob_version is None:
+        try:
+            _textblob_version = importlib.metadata.version('textblob')
+        except importlib.metadata.PackageNotFoundError:
+            raise ImportError('textblob is not installed')
+    return _textblob_version
 
 class SentimentAnalysisService:
     """Service for analyzing sentiment of feedback text."""
     
+    # Polarity thresholds for positive / negative classification
+    POSITIVE_THRESHOLD = 0.1
+    NEGATIVE_THRESHOLD = -0.1
+    
+    _textblob_seconds = registry.histogram('sentiment_textblob_seconds', 'Time TextBlob takes to score one text')
+    _batch_seconds = registry.histogram('sentiment_batch_seconds', 'Time the lexicon scorer takes per batch')
+    
     def __init__(self):
         """Initialize sentiment analysis service."""
         # TextBlob is ready to use without explicit initialization
         pass
     
+    @staticmethod
+    def warm_up():
+        """
+        Load what the first classification would otherwise pay for.
+        
+        Loads TextBlob's pattern lexicon and compiles the batch scorer's
+        arrays without touching the database or starting threads, so a
+        server can call it before forking workers that share the result.
+        """
+        from textblob import TextBlob
+        TextBlob('warm up').sentiment
+        try:
+            from app.services import lexicon_scorer
+        except ImportError:
+            return
+        lexicon_scorer.polarity_batch(['warm up'])
+    
+    @staticmethod
+    def classifier_versions() -> dict:
+        """
+        Return a version string per classifier for keying cached labels.
+        
+        Covers the TextBlob release (and with it the lexicon), the batch
+        scorer's VERSION and the thresholds, so changing any of them
+        invalidates previously cached labels.
+        
+        Returns:
+            Dictionary of classifier name ('textblob', 'lexicon') -> version
+        """
+        thresholds = f'{SentimentAnalysisService.POSITIVE_THRESHOLD}/{SentimentAnalysisService.NEGATIVE_THRESHOLD}'
+        versions = {'textblob': f'textblob-{textblob_version()}:{thresholds}'}
+        try:
+            from app.services import lexicon_scorer
+            versions['lexicon'] = f'lexicon-{lexicon_scorer.VERSION}+textblob-{textblob_version()}:{thresholds}'
+        except ImportError:
+            pass
+        return versions
+    
+    @staticmethod
+    def _cache_version(classifier: str) -> str:
+        """Return the classifier's cache version, or None when the cache is disabled."""
+        if not Config.SENTIMENT_CACHE_ENABLED:
+            return None
+        versions = SentimentAnalysisService.classifier_versions()
+        sentiment_cache.sync_versions(versions)
+        return versions.get(classifier)
+    
     @staticmethod
     def analyze_sentiment(text: str) -> str:
         """
@@ -24,23 +103,100 @@ class SentimentAnalysisService:
             if not text or not text.strip():
                 return 'neutral'
             
-            # Use TextBlob for sentiment analysis
+            # Identical comments were already scored
+            cache_version = SentimentAnalysisService._cache_version('textblob')
+            if cache_version:
+                cached = sentiment_cache.get(cache_version, text)
+                if cached is not None:
+                    return cached
+            
+            # Use TextBlob for sentiment analysis (imported on first use: it loads NLTK)
+            from textblob import TextBlob
+            started = time.perf_counter()
             blob = TextBlob(text)
             polarity = blob.sentiment.polarity
+            SentimentAnalysisService._textblob_seconds.observe(time.perf_counter() - started)
             
             # Classify based on polarity score
             # polarity ranges from -1 (negative) to 1 (positive)
-            if polarity > 0.1:
-                return 'positive'
-            elif polarity < -0.1:
-                return 'negative'
+            if polarity > SentimentAnalysisService.POSITIVE_THRESHOLD:
+                sentiment = 'positive'
+            elif polarity < SentimentAnalysisService.NEGATIVE_THRESHOLD:
+                sentiment = 'negative'
             else:
-                return 'neutral'
+                sentiment = 'neutral'
+            
+            if cache_version:
+                sentiment_cache.put(cache_version, text, sentiment)
+            return sentiment
                 
         except Exception as e:
             print(f"Sentiment analysis error: {str(e)}")
             return 'neutral'
     
+    @staticmethod
+    def analyze_batch(texts: list) -> list:
+        """
+        Classify many texts at once with the vectorized lexicon scorer.
+        
+        Labels match analyze_sentiment; falls back to it per text when NumPy
+        is not installed. Cached texts are not rescored, and each distinct
+        normalized text is scored once per batch.
+        
+        Args:
+            texts: List of texts to analyze
+            
+        Returns:
+            List of sentiment classifications, one per text
+        """
+        if not texts:
+            return []
+        
+        try:
+            from app.services import lexicon_scorer
+        except ImportError:
+            return [SentimentAnalysisService.analyze_sentiment(text) for text in texts]
+        
+        try:
+            cache_version = SentimentAnalysisService._cache_version('lexicon')
+            labels = sentiment_cache.get_many(cache_version, texts) if cache_version else [None] * len(texts)
+            
+            pending = {}
+            for text, label in zip(texts, labels):
+                if label is None:
+                    pending.setdefault(sentiment_cache.normalize(text), text or '')
+            
+            if pending:
+                started = time.perf_counter()
+                polarity = lexicon_scorer.polarity_batch(list(pending.values()))
+                scored = lexicon_scorer.classify(
+                    polarity,
+                    SentimentAnalysisService.POSITIVE_THRESHOLD,
+                    SentimentAnalysisService.NEGATIVE_THRESHOLD
+                )
+                SentimentAnalysisService._batch_seconds.observe(time.perf_counter() - started)
+                if cache_version:
+                    sentiment_cache.put_many(cache_version, list(zip(pending.values(), scored)))
+                pending = dict(zip(pending, scored))
+            
+            return [
+                label if label is not None else pending[sentiment_cache.normalize(text)]
+                for text, label in zip(texts, labels)
+            ]
+        except Exception as e:
+            print(f"Batch sentiment analysis error: {str(e)}")
+            return [SentimentAnalysisService.analyze_sentiment(text) for text in texts]
+    
+    @staticmethod
+    def get_cache_stats() -> dict:
+        """
+        Return sentiment cache hit ratios and size.
+        
+        Returns:
+            Dictionary of cache statistics
+        """
+        return sentiment_cache.stats()
+    
     @staticmethod
     def update_feedback_sentiment(feedback_id: int, sentiment: str) -> bool:
         """
@@ -56,23 +212,68 @@ class SentimentAnalysisService:
         if sentiment not in ['positive', 'negative', 'neutral']:
             return False
         
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        
         try:
-            cursor.execute(
-                'UPDATE feedback SET sentiment = ? WHERE id = ?',
-                (sentiment, feedback_id)
-            )
-            conn.commit()
+            # An id handed out before partitioning maps to the adopted row
+            feedback_id = partitions.resolve_ids([feedback_id]).get(feedback_id)
+            if feedback_id is None:
+                return False
+            with partitions.writing(partitions.key_for_id(feedback_id)) as conn:
+                cursor = conn.cursor()
+                cursor.execute(
+                    'UPDATE feedback SET sentiment = ? WHERE id = ?',
+                    (sentiment, feedback_id)
+                )
+                conn.commit()
+            if cursor.rowcount > 0:
+                data_version.bump()
             return cursor.rowcount > 0
             
         except Exception as e:
-            conn.rollback()
             print(f"Failed to update sentiment: {str(e)}")
             return False
-        finally:
-            conn.close()
+    
+    @staticmethod
+    def update_feedback_sentiments(results: list) -> int:
+        """
+        Update many feedback records with their sentiment, one transaction per partition.
+        
+        Args:
+            results: List of (feedback_id, sentiment) tuples
+            
+        Returns:
+            Number of feedback records updated
+        """
+        results = [(feedback_id, sentiment) for feedback_id, sentiment in results
+                   if sentiment in ['positive', 'negative', 'neutral']]
+        if not results:
+            return 0
+        
+        updated = 0
+        
+        try:
+            # Ids handed out before partitioning map to the adopted rows
+            current = partitions.resolve_ids([feedback_id for feedback_id, _ in results])
+            by_key = {}
+            for feedback_id, sentiment in results:
+                if feedback_id in current:
+                    feedback_id = current[feedback_id]
+                    by_key.setdefault(partitions.key_for_id(feedback_id), []).append((sentiment, feedback_id))
+            
+            for key, rows in by_key.items():
+                with partitions.writing(key) as conn:
+                    cursor = conn.cursor()
+                    cursor.executemany('UPDATE feedback SET sentiment = ? WHERE id = ?', rows)
+                    conn.commit()
+                    updated += cursor.rowcount
+            if updated > 0:
+                data_version.bump()
+            return updated
+            
+        except Exception as e:
+            print(f"Failed to update sentiments: {str(e)}")
+            if updated > 0:
+                data_version.bump()
+            return updated
     
     @staticmethod
     def analyze_and_store(feedback_id: int, text: str) -> str:
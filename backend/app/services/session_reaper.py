@@ -0,0 +1,140 @@
+import threading
+import time
+from datetime import datetime
+from app.database import get_db_connection
+from config import Config
+
+class SessionReaper:
+    """Background thread that deletes expired sessions in small batches."""
+    
+    def __init__(self, interval: float = None, batch_size: int = None, batch_pause: float = None):
+        """
+        Initialize the reaper; the thread starts on first use.
+        
+        Args:
+            interval: Seconds between sweeps
+            batch_size: Maximum rows deleted per transaction
+            batch_pause: Seconds to sleep between batches so other writers get the lock
+        """
+        self.interval = interval or Config.SESSION_REAP_INTERVAL_SECONDS
+        self.batch_size = batch_size or Config.SESSION_REAP_BATCH_SIZE
+        self.batch_pause = batch_pause if batch_pause is not None else Config.SESSION_REAP_BATCH_PAUSE_SECONDS
+        self._thread = None
+        self._lock = threading.Lock()
+        self._stopping = threading.Event()
+        self._stats = {
+            'sweeps': 0,
+            'deleted': 0,
+            'failed_sweeps': 0,
+            'last_sweep_deleted': 0,
+            'last_sweep_batches': 0,
+            'last_sweep_seconds': 0.0,
+            'last_sweep_at': None
+        }
+    
+    def start(self):
+        """Start the reaper thread if it is not already running."""
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._stopping.clear()
+            self._thread = threading.Thread(target=self._run, name='session-reaper', daemon=True)
+            self._thread.start()
+    
+    def stop(self, timeout: float = 5.0):
+        """
+        Stop the reaper thread.
+        
+        Args:
+            timeout: Seconds to wait for the thread to finish
+        """
+        self._stopping.set()
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread is not None:
+            thread.join(timeout)
+    
+    def reap_once(self) -> int:
+        """
+        Delete every session that has expired, one short transaction per batch.
+        
+        Returns:
+            Number of sessions deleted
+        """
+        started = time.monotonic()
+        deleted = 0
+        batches = 0
+        now = datetime.now()
+        
+        while True:
+            conn = get_db_connection()
+            cursor = conn.cursor()
+            
+            try:
+                cursor.execute('''
+                    DELETE FROM sessions WHERE id IN (
+                        SELECT id FROM sessions WHERE expires_at < ? ORDER BY expires_at LIMIT ?
+                    )
+                ''', (now, self.batch_size))
+                conn.commit()
+                count = cursor.rowcount
+            except Exception:
+                conn.rollback()
+                raise
+            finally:
+                conn.close()
+            
+            deleted += count
+            batches += 1
+            if count < self.batch_size or self._stopping.is_set():
+                break
+            time.sleep(self.batch_pause)
+        
+        with self._lock:
+            self._stats['deleted'] += deleted
+            self._stats['last_sweep_deleted'] = deleted
+            self._stats['last_sweep_batches'] = batches
+            self._stats['last_sweep_seconds'] = round(time.monotonic() - started, 4)
+            self._stats['last_sweep_at'] = now.isoformat(timespec='seconds')
+        return deleted
+    
+    def _run(self):
+        """Sweep immediately, then every interval until stopped."""
+        while not self._stopping.is_set():
+            try:
+                self.reap_once()
+            except Exception as e:
+                print(f"Session reaper sweep failed: {str(e)}")
+                with self._lock:
+                    self._stats['failed_sweeps'] += 1
+            
+            with self._lock:
+                self._stats['sweeps'] += 1
+            self._stopping.wait(self.interval)
+    
+    def status(self) -> dict:
+        """
+        Return sweep counters and the number of sessions left to reap.
+        
+        Returns:
+            Dictionary with running flag, counters and expired/total session counts
+        """
+        with self._lock:
+            status = dict(self._stats)
+            status['running'] = self._thread is not None
+        
+        conn = get_db_connection()
+        try:
+            row = conn.execute(
+                'SELECT COUNT(*) AS total, SUM(expires_at < ?) AS expired FROM sessions',
+                (datetime.now(),)
+            ).fetchone()
+            status['sessions'] = row['total']
+            status['expired_pending'] = row['expired'] or 0
+        finally:
+            conn.close()
+        
+        return status
+
+# Shared reaper started by AuthenticationService on first login
+session_reaper = SessionReaper()
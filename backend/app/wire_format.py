@@ -0,0 +1,135 @@
+import gzip
+from collections import namedtuple
+from config import Config
+
+try:
+    import brotli
+except ImportError:
+    # Optional: without it only gzip is offered
+    brotli = None
+
+try:
+    import msgpack
+except ImportError:
+    # Optional: without it only JSON is offered
+    msgpack = None
+
+JSON = 'application/json'
+MSGPACK = 'application/msgpack'
+
+# format query parameter -> media type (ndjson is streamed by the routes)
+FORMATS = {'json': JSON, 'msgpack': MSGPACK}
+
+# layout=rows is the list of objects; layout=columns sends parallel arrays
+# (see FeedbackService.to_columns)
+LAYOUTS = ('rows', 'columns')
+
+# Content encodings offered, most preferred first
+ENCODINGS = ('br', 'gzip')
+
+# Responses differ by these request headers
+VARY = 'Accept, Accept-Encoding'
+
+Representation = namedtuple('Representation', ['media_type', 'encoding'])
+
+def parse_layout(args) -> str:
+    """
+    Read the layout query parameter.
+    
+    Raises:
+        ValueError: If the layout is unknown
+    """
+    layout = args.get('layout', 'rows')
+    if layout not in LAYOUTS:
+        raise ValueError(f"layout must be one of: {', '.join(LAYOUTS)}")
+    return layout
+
+def negotiate(request) -> Representation:
+    """
+    Pick the media type and content encoding for a request.
+    
+    The format query parameter wins over the Accept header; MessagePack is
+    only chosen from Accept when msgpack is installed. The encoding is the
+    most preferred of br and gzip the client accepts (br needs brotli).
+    
+    Args:
+        request: Flask or Quart request
+    
+    Returns:
+        Representation (encoding None for identity)
+    
+    Raises:
+        ValueError: If the format is unknown or its library is not installed
+    """
+    file_format = request.args.get('format')
+    if file_format:
+        if file_format not in FORMATS:
+            raise ValueError(f"format must be one of: {', '.join(FORMATS)}, ndjson")
+        media_type = FORMATS[file_format]
+    else:
+        offered = [JSON, MSGPACK] if msgpack is not None else [JSON]
+        media_type = request.accept_mimetypes.best_match(offered, JSON)
+    if media_type == MSGPACK and msgpack is None:
+        raise ValueError('MessagePack responses require msgpack (pip install msgpack)')
+    
+    encoding = None
+    for candidate in ENCODINGS:
+        if candidate == 'br' and brotli is None:
+            continue
+        if request.accept_encodings[candidate]:
+            encoding = candidate
+            break
+    return Representation(media_type, encoding)
+
+def representation_etag(etag: str, representation: Representation, encoding: str = None) -> str:
+    """
+    Return the strong ETag of one representation of a data version.
+    
+    Every media type and content encoding gets its own tag, so a cache never
+    revalidates a gzip body against an identity one.
+    
+    Args:
+        etag: Data version ETag
+        representation: Negotiated representation
+        encoding: Content encoding actually applied (None for identity)
+    """
+    if representation.media_type == MSGPACK:
+        etag += '-msgpack'
+    if encoding:
+        etag += '-' + encoding
+    return etag
+
+def serialize(payload, media_type: str, dumps) -> bytes:
+    """
+    Encode a payload as compact JSON or MessagePack.
+    
+    Args:
+        payload: Response payload
+        media_type: JSON or MSGPACK
+        dumps: The app's JSON provider dumps
+    """
+    if media_type == MSGPACK:
+        return msgpack.packb(payload, use_bin_type=True)
+    return (dumps(payload, separators=(',', ':')) + '\n').encode('utf-8')
+
+def compress(body: bytes, encoding: str) -> tuple:
+    """
+    Compress a body for the negotiated encoding if it is large enough to pay off.
+    
+    Returns:
+        Tuple of (body, encoding applied or None)
+    """
+    if not encoding or len(body) < Config.COMPRESSION_MIN_BYTES:
+        return body, None
+    if encoding == 'br':
+        return brotli.compress(body, quality=Config.BROTLI_QUALITY), 'br'
+    return gzip.compress(body, compresslevel=Config.GZIP_LEVEL, mtime=0), 'gzip'
+
+def encode(payload, representation: Representation, dumps) -> tuple:
+    """
+    Serialize and compress a payload.
+    
+    Returns:
+        Tuple of (body, encoding applied or None)
+    """
+    return compress(serialize(payload, representation.media_type, dumps), representation.encoding)
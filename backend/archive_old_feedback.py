@@ -0,0 +1,38 @@
+import argparse
+from app import cold_archive
+from app.database import init_db
+from config import Config
+
+def archive_old_feedback(older_than_days: int = None, dry_run: bool = False) -> dict:
+    """Move every month older than the archive age into compressed cold segments."""
+    days = Config.COLD_ARCHIVE_AFTER_DAYS if older_than_days is None else older_than_days
+    eligible = cold_archive.eligible_keys(days)
+    if not eligible:
+        print(f"No months older than {days} days")
+        return {}
+    if dry_run:
+        print(f"Would archive: {', '.join(eligible)}")
+        return {}
+    
+    archived = cold_archive.archive_old(days)
+    print(f"✓ Archived {sum(archived.values())} feedback rows from {len(archived)} month(s)")
+    return archived
+
+def print_segments():
+    segments = cold_archive.segments()
+    if not segments:
+        print("Cold archive is empty")
+    for segment in segments:
+        print(f"  {segment['key']}  {segment['rows']:>10} rows  {segment['blocks']:>5} blocks  "
+              f"{segment['bytes'] / 1024:>10.1f} KiB")
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Move old feedback into the compressed cold archive.')
+    parser.add_argument('--older-than-days', type=int,
+                        help=f'Archive whole months older than this (default: {Config.COLD_ARCHIVE_AFTER_DAYS})')
+    parser.add_argument('--dry-run', action='store_true', help='Only list the months that would be archived')
+    args = parser.parse_args()
+    
+    init_db()
+    archive_old_feedback(args.older_than_days, args.dry_run)
+    print_segments()
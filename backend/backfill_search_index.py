@@ -0,0 +1,18 @@
+import time
+from app.database import init_db, has_search_index, rebuild_search_index
+
+def backfill_search_index():
+    """Create the feedback full-text index if needed and rebuild it from all feedback."""
+    init_db()
+    
+    if not has_search_index():
+        print("Full-text search (FTS5) is not available in this SQLite build")
+        return
+    
+    started = time.perf_counter()
+    count = rebuild_search_index()
+    elapsed = time.perf_counter() - started
+    print(f"✓ Indexed {count} feedback comments in {elapsed:.2f}s")
+
+if __name__ == '__main__':
+    backfill_search_index()
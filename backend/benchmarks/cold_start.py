@@ -0,0 +1,142 @@
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from datetime import datetime
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if BACKEND_DIR not in sys.path:
+    sys.path.insert(0, BACKEND_DIR)
+
+from benchmarks.run_benchmarks import RESULTS_DIR, git_commit
+
+# Entry point -> (code run in a fresh interpreter, budget in ms for the code,
+# modules it must not load). view_database.py and the other scripts only
+# need app.database; neither server should load the NLP stack before the
+# first classification, and the sync one has no use for asyncio.
+TARGETS = {
+    'scripts': ('import app.database', 60, ('flask', 'quart', 'textblob', 'nltk', 'numpy')),
+    'sync_app': ('from app import create_app; create_app()', 450, ('quart', 'textblob', 'nltk', 'numpy', 'asyncio')),
+    'async_app': ('from app.async_app import create_async_app; create_async_app()', 900, ('textblob', 'nltk', 'numpy'))
+}
+
+# Runs the target code and prints how long it took and what it loaded
+PROBE = '''
+import json, sys, time
+started = time.perf_counter()
+{code}
+print(json.dumps({{'ms': (time.perf_counter() - started) * 1000, 'modules': sorted(sys.modules)}}))
+'''
+
+def parse_importtime(stderr: str) -> list:
+    """
+    Parse `python -X importtime` output.
+    
+    Returns:
+        List of (module, self ms, cumulative ms, depth), in import order;
+        depth 0 is an import made by the probe itself
+    """
+    imports = []
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        depth = (len(name) - len(name.lstrip())) // 2
+        imports.append((name.strip(), int(self_us) / 1000, int(cumulative_us) / 1000, depth))
+    return imports
+
+def measure(code: str) -> dict:
+    """Run code in a fresh interpreter with -X importtime and collect its timings."""
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', PROBE.format(code=code)],
+        cwd=BACKEND_DIR, capture_output=True, text=True, check=True
+    )
+    probe = json.loads(result.stdout.strip().splitlines()[-1])
+    imports = parse_importtime(result.stderr)
+    # The probe's own json/time imports are top level, but negligible
+    return {
+        'ms': probe['ms'],
+        'import_ms': sum(cumulative for _, _, cumulative, depth in imports if depth == 0),
+        'modules': probe['modules'],
+        'imports': imports
+    }
+
+def report_target(name: str, runs: int, top: int, budget_scale: float) -> dict:
+    """Measure one entry point runs times and check it against its budget."""
+    code, budget_ms, forbidden = TARGETS[name]
+    samples = [measure(code) for _ in range(runs)]
+    median = sorted(samples, key=lambda sample: sample['ms'])[len(samples) // 2]
+    
+    # Heaviest imports of the median run, down to what the top level pulls in
+    heaviest = sorted(
+        (imp for imp in median['imports'] if imp[3] <= 1),
+        key=lambda imp: imp[2], reverse=True
+    )[:top]
+    loaded = [module for module in forbidden if module in median['modules']]
+    budget = budget_ms * budget_scale
+    ms = statistics.median(sample['ms'] for sample in samples)
+    return {
+        'code': code,
+        'ms': round(ms, 1),
+        'import_ms': round(statistics.median(sample['import_ms'] for sample in samples), 1),
+        'modules': len(median['modules']),
+        'budget_ms': round(budget, 1),
+        'forbidden_loaded': loaded,
+        'within_budget': ms <= budget and not loaded,
+        'heaviest': [
+            {'module': module, 'self_ms': round(self_ms, 2), 'cumulative_ms': round(cumulative_ms, 2)}
+            for module, self_ms, cumulative_ms, _ in heaviest
+        ]
+    }
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Report cold-start import time per entry point and check it against a budget.')
+    parser.add_argument('--targets', nargs='+', choices=list(TARGETS), default=list(TARGETS))
+    parser.add_argument('--runs', type=int, default=5, help='Fresh interpreters per target (the median is kept)')
+    parser.add_argument('--top', type=int, default=10, help='Heaviest imports listed per target')
+    parser.add_argument('--budget-scale', type=float, default=1.0,
+                        help='Multiply every budget, e.g. 2 on a slow machine')
+    parser.add_argument('--output', help='Results file (default: benchmarks/results/cold-start-<time>-<commit>.json)')
+    args = parser.parse_args()
+    
+    commit = git_commit()
+    results = {
+        'meta': {
+            'commit': commit,
+            'started_at': datetime.now().isoformat(timespec='seconds'),
+            'python': sys.version.split()[0],
+            'runs': args.runs
+        },
+        'targets': {}
+    }
+    
+    failed = []
+    for name in args.targets:
+        stats = report_target(name, args.runs, args.top, args.budget_scale)
+        results['targets'][name] = stats
+        status = 'ok' if stats['within_budget'] else 'OVER BUDGET'
+        print(f"\n{name}: {stats['ms']:.1f}ms (imports {stats['import_ms']:.1f}ms, {stats['modules']} modules), "
+              f"budget {stats['budget_ms']:.0f}ms  {status}")
+        if stats['forbidden_loaded']:
+            print(f"  loads {', '.join(stats['forbidden_loaded'])}, which it should defer")
+        for imp in stats['heaviest']:
+            print(f"  {imp['module']:<40} {imp['cumulative_ms']:>8.1f}ms  (self {imp['self_ms']:.1f}ms)")
+        if not stats['within_budget']:
+            failed.append(name)
+    
+    output = args.output or os.path.join(
+        RESULTS_DIR, f"cold-start-{datetime.now().strftime('%Y%m%d-%H%M%S')}-{commit}.json"
+    )
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w') as f:
+        json.dump(results, f, indent=2)
+    print(f"\n✓ Results written to {output}")
+    
+    if failed:
+        sys.exit(f"Cold start over budget: {', '.join(failed)}")
+
+if __name__ == '__main__':
+    main()
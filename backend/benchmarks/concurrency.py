@@ -0,0 +1,300 @@
+import argparse
+import http.client
+import json
+import os
+import random
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if BACKEND_DIR not in sys.path:
+    sys.path.insert(0, BACKEND_DIR)
+
+import app.database as database
+from app.database import init_db, close_all_pools
+from app.services.auth_service import AuthenticationService
+from app.services.password_hasher import password_hasher
+from app.services.rate_limiter import rate_limiter
+from app.services.session_reaper import session_reaper
+from benchmarks.run_benchmarks import RESULTS_DIR, git_commit, summarize
+from benchmarks.synthetic import seed_database, ASPECTS
+from config import Config
+
+# Request kinds of the mixed workload: (method, path, body) builders. login
+# is bcrypt-bound, list and stats are SQLite reads, submit is a write. Logins
+# use the upper half of the users, so the per-user session cap never evicts
+# the sessions submit uses (created for the lower half).
+REQUESTS = {
+    'login': lambda ctx, rng: ('POST', '/api/auth/login', {
+        'username': f'user{rng.randrange(ctx["users"] // 2, ctx["users"])}', 'password': ctx['password']}),
+    'list': lambda ctx, rng: ('GET', f'/api/feedback?session_token={ctx["admin_token"]}&limit=50', None),
+    'submit': lambda ctx, rng: ('POST', '/api/feedback', {
+        'session_token': rng.choice(ctx['tokens']), 'rating': rng.randint(1, 5),
+        'comment': f'{rng.choice(ASPECTS)} was fine under load'}),
+    'stats': lambda ctx, rng: ('GET', f'/api/admin/stats?session_token={ctx["admin_token"]}', None),
+    # Credential stuffing: wrong passwords for random users from one address
+    'stuffing': lambda ctx, rng: ('POST', '/api/auth/login', {
+        'username': f'user{rng.randrange(ctx["users"])}', 'password': 'not-the-password'})
+}
+DEFAULT_MIX = 'login=1,list=4,submit=3,stats=2'
+
+# Status of a served request when it is not 200
+EXPECTED_STATUS = {'stuffing': 401}
+
+# Each client sends from its own address (X-Forwarded-For, trusted with
+# --rate-limit); stuffing always comes from this one
+ATTACKER_ADDRESS = '203.0.113.7'
+
+def serve(mode: str, port: int, database_path: str, bcrypt_rounds: int, rate_limit: bool):
+    """Serve the app over HTTP in this process until it is terminated."""
+    database.DATABASE_PATH = database_path
+    password_hasher.rounds = bcrypt_rounds
+    rate_limiter.enabled = rate_limit
+    Config.RATE_LIMIT_TRUSTED_PROXIES = 1
+    
+    if mode == 'sync':
+        from werkzeug.serving import WSGIRequestHandler, make_server
+        from app import create_app
+        # Keep-alive, like the async server, so both modes pay the same connection costs
+        WSGIRequestHandler.protocol_version = 'HTTP/1.1'
+        make_server('127.0.0.1', port, create_app(), threaded=True).serve_forever()
+    else:
+        import asyncio
+        from hypercorn.asyncio import serve as hypercorn_serve
+        from hypercorn.config import Config as HypercornConfig
+        from app.async_app import create_async_app
+        hypercorn_config = HypercornConfig()
+        hypercorn_config.bind = [f'127.0.0.1:{port}']
+        hypercorn_config.accesslog = None
+        asyncio.run(hypercorn_serve(create_async_app(), hypercorn_config))
+
+def free_port() -> int:
+    """Ask the OS for an unused local port."""
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+def call(conn: http.client.HTTPConnection, method: str, path: str, body: dict = None, headers: dict = None) -> tuple:
+    """Send one request on a keep-alive connection and return (status, parsed JSON)."""
+    headers = dict(headers or {})
+    payload = None
+    if body is not None:
+        payload = json.dumps(body)
+        headers['Content-Type'] = 'application/json'
+    conn.request(method, path, body=payload, headers=headers)
+    response = conn.getresponse()
+    data = response.read()
+    return response.status, json.loads(data) if data else None
+
+def wait_until_ready(port: int, timeout: float = 30.0):
+    """Poll the server until it answers or the timeout passes."""
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            conn = http.client.HTTPConnection('127.0.0.1', port, timeout=5)
+            call(conn, 'GET', '/api/admin/stats')
+            conn.close()
+            return
+        except (ConnectionError, OSError):
+            if time.monotonic() > deadline:
+                raise RuntimeError(f'Server on port {port} did not start')
+            time.sleep(0.1)
+
+def run_clients(port: int, ctx: dict, mix: dict, clients: int, requests_per_client: int, seed: int) -> dict:
+    """
+    Fire the mixed workload from concurrent client threads.
+    
+    Args:
+        port: Server port
+        ctx: Tokens, user count and password for the request builders
+        mix: Request kind -> relative weight
+        clients: Number of concurrent clients (one keep-alive connection each)
+        requests_per_client: Requests each client sends
+        seed: Random seed; every mode gets the same request sequence
+    
+    Returns:
+        Overall and per-kind latency summaries; 429 and 503 responses count as rejected
+    """
+    kinds = list(mix)
+    weights = [mix[kind] for kind in kinds]
+    latencies = {kind: [] for kind in kinds}
+    errors = {kind: 0 for kind in kinds}
+    rejected = {kind: 0 for kind in kinds}
+    lock = threading.Lock()
+    start = threading.Barrier(clients + 1)
+    
+    def client(number: int):
+        rng = random.Random(seed * 1000 + number)
+        conn = http.client.HTTPConnection('127.0.0.1', port, timeout=120)
+        mine = {kind: [] for kind in kinds}
+        failed = {kind: 0 for kind in kinds}
+        shed = {kind: 0 for kind in kinds}
+        address = f'10.0.{number // 256}.{number % 256}'
+        start.wait()
+        for _ in range(requests_per_client):
+            kind = rng.choices(kinds, weights)[0]
+            method, path, body = REQUESTS[kind](ctx, rng)
+            headers = {'X-Forwarded-For': ATTACKER_ADDRESS if kind == 'stuffing' else address}
+            began = time.perf_counter()
+            try:
+                status, _ = call(conn, method, path, body, headers)
+            except (OSError, http.client.HTTPException, ValueError):
+                conn.close()
+                conn = http.client.HTTPConnection('127.0.0.1', port, timeout=120)
+                status = None
+            mine[kind].append(time.perf_counter() - began)
+            if status in (429, 503):
+                # Rate limiter or the bcrypt pool's fast reject: load shedding, not a failure
+                shed[kind] += 1
+            elif status not in (200, EXPECTED_STATUS.get(kind)):
+                failed[kind] += 1
+        conn.close()
+        with lock:
+            for kind in kinds:
+                latencies[kind].extend(mine[kind])
+                errors[kind] += failed[kind]
+                rejected[kind] += shed[kind]
+    
+    threads = [threading.Thread(target=client, args=(n,)) for n in range(clients)]
+    for thread in threads:
+        thread.start()
+    start.wait()
+    began = time.perf_counter()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - began
+    
+    everything = [value for values in latencies.values() for value in values]
+    return {
+        'overall': dict(summarize(everything, sum(errors.values()), elapsed), rejected=sum(rejected.values())),
+        'by_kind': {
+            kind: dict(summarize(latencies[kind], errors[kind], elapsed), rejected=rejected[kind])
+            for kind in kinds
+        }
+    }
+
+def benchmark_mode(mode: str, database_path: str, ctx: dict, args, mix: dict) -> dict:
+    """Start a server in the given mode, run the workload against it and stop it."""
+    port = free_port()
+    server = subprocess.Popen(
+        [sys.executable, '-m', 'benchmarks.concurrency', '--serve', mode, '--port', str(port),
+         '--database', database_path, '--bcrypt-rounds', str(args.bcrypt_rounds)]
+        + (['--rate-limit'] if args.rate_limit else []),
+        cwd=BACKEND_DIR, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    try:
+        wait_until_ready(port)
+        conn = http.client.HTTPConnection('127.0.0.1', port, timeout=30)
+        _, body = call(conn, 'POST', '/api/auth/admin/login', {
+            'username': Config.ADMIN_USERNAME, 'password': Config.ADMIN_PASSWORD})
+        conn.close()
+        ctx = dict(ctx, admin_token=body['session_token'])
+        
+        # Untimed round to warm the pools, page cache and TextBlob
+        run_clients(port, ctx, mix, min(args.clients, 4), args.warmup, args.seed + 1)
+        return run_clients(port, ctx, mix, args.clients, args.requests, args.seed)
+    finally:
+        server.terminate()
+        server.wait(timeout=30)
+
+def parse_mix(text: str) -> dict:
+    """Parse 'login=1,list=4' into {'login': 1, 'list': 4}."""
+    mix = {}
+    for part in text.split(','):
+        kind, _, weight = part.partition('=')
+        if kind not in REQUESTS:
+            raise SystemExit(f"Unknown request kind '{kind}' (expected one of {', '.join(REQUESTS)})")
+        mix[kind] = float(weight or 1)
+    return mix
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Compare the WSGI (Flask) and ASGI (Quart) modes under a concurrent mixed workload.')
+    parser.add_argument('--rows', type=int, default=10000, help='Feedback rows to seed')
+    parser.add_argument('--clients', type=int, nargs='+', default=[8, 32, 128],
+                        help='Concurrent client counts to run')
+    parser.add_argument('--requests', type=int, default=50, help='Requests per client')
+    parser.add_argument('--warmup', type=int, default=5, help='Untimed requests per warm-up client')
+    parser.add_argument('--mix', default=DEFAULT_MIX, help=f'Request kind weights (default: {DEFAULT_MIX})')
+    parser.add_argument('--modes', nargs='+', choices=('sync', 'async'), default=['sync', 'async'])
+    parser.add_argument('--seed', type=int, default=42, help='Random seed for the data and the workload')
+    parser.add_argument('--bcrypt-rounds', type=int, default=Config.BCRYPT_ROUNDS)
+    parser.add_argument('--rate-limit', action='store_true',
+                        help='Keep the auth rate limiter on (off by default: clients reuse users and addresses)')
+    parser.add_argument('--output', help='Results file (default: benchmarks/results/concurrency-<time>-<commit>.json)')
+    parser.add_argument('--serve', choices=('sync', 'async'), help=argparse.SUPPRESS)
+    parser.add_argument('--port', type=int, help=argparse.SUPPRESS)
+    parser.add_argument('--database', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    
+    if args.serve:
+        serve(args.serve, args.port, args.database, args.bcrypt_rounds, args.rate_limit)
+        return
+    
+    mix = parse_mix(args.mix)
+    password_hasher.rounds = args.bcrypt_rounds
+    workdir = tempfile.mkdtemp(prefix='feedback-concurrency-')
+    database.DATABASE_PATH = os.path.join(workdir, 'bench.db')
+    commit = git_commit()
+    results = {
+        'meta': {
+            'commit': commit,
+            'started_at': datetime.now().isoformat(timespec='seconds'),
+            'cpu_count': os.cpu_count(),
+            'rows': args.rows,
+            'requests_per_client': args.requests,
+            'mix': mix,
+            'bcrypt_rounds': args.bcrypt_rounds,
+            'rate_limit': args.rate_limit,
+            'db_pool_size': Config.DB_POOL_SIZE
+        },
+        'runs': []
+    }
+    
+    try:
+        init_db(verbose=False)
+        seeded = seed_database(args.rows, seed=args.seed)
+        conn = database.get_db_connection()
+        try:
+            tokens = [
+                AuthenticationService.create_session(conn.cursor(), user_id, False)
+                for user_id in range(1, seeded['users'] // 2 + 1)
+            ]
+            conn.commit()
+        finally:
+            conn.close()
+        session_reaper.stop()
+        close_all_pools()
+        ctx = {'tokens': tokens, 'users': seeded['users'], 'password': seeded['password']}
+        print(f"Seeded {args.rows} feedback rows, {seeded['users']} users")
+        
+        for clients in args.clients:
+            args.clients = clients
+            for mode in args.modes:
+                stats = benchmark_mode(mode, database.DATABASE_PATH, ctx, args, mix)
+                results['runs'].append({'mode': mode, 'clients': clients, **stats})
+                overall = stats['overall']
+                print(f"  {mode:<5} {clients:>4} clients  p50 {overall['p50_ms']:>9.2f}ms  "
+                      f"p95 {overall['p95_ms']:>9.2f}ms  p99 {overall['p99_ms']:>9.2f}ms  "
+                      f"{overall['throughput_rps']:>8.1f} req/s"
+                      + (f"  ({overall['rejected']} rejected)" if overall['rejected'] else '')
+                      + (f"  ({overall['errors']} errors)" if overall['errors'] else ''))
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+    
+    output = args.output or os.path.join(
+        RESULTS_DIR, f"concurrency-{datetime.now().strftime('%Y%m%d-%H%M%S')}-{commit}.json"
+    )
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w') as f:
+        json.dump(results, f, indent=2)
+    print(f"\n✓ Results written to {output}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,387 @@
+import argparse
+import json
+import math
+import os
+import platform
+import shutil
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if BACKEND_DIR not in sys.path:
+    sys.path.insert(0, BACKEND_DIR)
+
+import app.database as database
+from app import create_app, partitions
+from app.database import init_db, close_all_pools
+from app.replica import read_replica
+from app.services.auth_service import AuthenticationService
+from app.services.password_hasher import password_hasher
+from app.services.rate_limiter import rate_limiter
+from app.services.sentiment_queue import sentiment_queue
+from app.services.session_reaper import session_reaper
+from benchmarks.synthetic import seed_database, ASPECTS
+from config import Config
+
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'results')
+
+def _admin(ctx: dict) -> str:
+    return ctx['admin_token']
+
+def _user(ctx: dict, i: int) -> str:
+    return ctx['tokens'][i % len(ctx['tokens'])]
+
+def _feedback_list(query: str, headers: dict = None):
+    return lambda ctx, i: ('GET', f"/api/feedback?session_token={_admin(ctx)}&{query}",
+                           {'headers': headers} if headers else {})
+
+def _admin_get(path: str):
+    return lambda ctx, i: ('GET', f"{path}?session_token={_admin(ctx)}", {})
+
+def _revalidate(path: str):
+    # Conditional GET replaying the ETag of a priming GET, as a browser
+    # revalidating its copy; run_scenario fails unless it answers 304
+    def build(ctx: dict, i: int) -> tuple:
+        url = f"{path}?session_token={_admin(ctx)}"
+        if i == 0:
+            # Queued classifications would change the data (and the ETag) mid-run
+            sentiment_queue.join()
+            primed = ctx['client'].get(url)
+            ctx['etags'][path] = primed.headers['ETag']
+            primed.close()
+        return ('GET', url, {'headers': {'If-None-Match': ctx['etags'][path]}})
+    build.expected_status = 304
+    return build
+
+def _import_body(ctx: dict, i: int) -> tuple:
+    lines = '\n'.join(
+        json.dumps({'username': f'user{(i * 500 + n) % ctx["users"]}', 'rating': n % 5 + 1,
+                    'comment': f'{ASPECTS[n % len(ASPECTS)]} was imported from the survey'})
+        for n in range(500)
+    )
+    return ('POST', f"/api/feedback/import?session_token={_admin(ctx)}",
+            {'data': lines, 'content_type': 'application/x-ndjson'})
+
+# (name, kind, function(ctx, i) -> (method, url, client kwargs)). The kind picks
+# the iteration budget: 'light' requests are cheap lookups, 'auth' requests run
+# bcrypt, 'heavy' requests read or write whole tables.
+SCENARIOS = [
+    ('auth.register', 'auth', lambda ctx, i: ('POST', '/api/auth/register', {'json': {
+        'username': f'bench{ctx["run"]}_{i}', 'email': f'bench{ctx["run"]}_{i}@example.com',
+        'password': 'benchmark-password'}})),
+    ('auth.login', 'auth', lambda ctx, i: ('POST', '/api/auth/login', {'json': {
+        'username': f'user{i % ctx["users"]}', 'password': ctx['password']}})),
+    ('auth.admin_login', 'light', lambda ctx, i: ('POST', '/api/auth/admin/login', {'json': {
+        'username': Config.ADMIN_USERNAME, 'password': Config.ADMIN_PASSWORD}})),
+    ('auth.logout', 'light', lambda ctx, i: ('POST', '/api/auth/logout', {'json': {
+        'session_token': ctx['logout_tokens'].pop()}})),
+    ('feedback.submit', 'light', lambda ctx, i: ('POST', '/api/feedback', {'json': {
+        'session_token': _user(ctx, i), 'rating': i % 5 + 1,
+        'comment': f'{ASPECTS[i % len(ASPECTS)]} is great but could be faster'}})),
+    ('feedback.list_page', 'light', _feedback_list('limit=50')),
+    ('feedback.list_next_page', 'light', lambda ctx, i: (
+        'GET', f"/api/feedback?session_token={_admin(ctx)}&limit=50&cursor={ctx['cursor']}", {})),
+    ('feedback.filter_sentiment', 'light', _feedback_list('limit=50&sentiment=negative')),
+    ('feedback.filter_rating', 'light', _feedback_list('limit=50&rating=5')),
+    ('feedback.filter_sentiment_rating', 'light', _feedback_list('limit=50&sentiment=negative&rating=1')),
+    ('feedback.search', 'light', lambda ctx, i: (
+        'GET', f"/api/feedback?session_token={_admin(ctx)}&limit=50&search={ASPECTS[i % len(ASPECTS)].split()[-1]}", {})),
+    ('feedback.search_relevance', 'light', lambda ctx, i: (
+        'GET', f"/api/feedback?session_token={_admin(ctx)}&limit=50&sort=relevance"
+               f"&search={ASPECTS[i % len(ASPECTS)].split()[-1]}", {})),
+    ('feedback.list_all', 'heavy', _feedback_list('')),
+    ('feedback.list_all_not_modified', 'light', _revalidate('/api/feedback')),
+    ('feedback.list_all_columns', 'heavy', _feedback_list('layout=columns')),
+    ('feedback.list_all_gzip', 'heavy', _feedback_list('', {'Accept-Encoding': 'gzip'})),
+    ('feedback.list_all_msgpack_br', 'heavy', _feedback_list(
+        'layout=columns', {'Accept': 'application/msgpack', 'Accept-Encoding': 'br'})),
+    ('feedback.stream_ndjson', 'heavy', _feedback_list('format=ndjson')),
+    ('feedback.export_csv', 'heavy', lambda ctx, i: (
+        'GET', f"/api/feedback/export?session_token={_admin(ctx)}&format=csv", {})),
+    ('feedback.import', 'heavy', _import_body),
+    ('admin.stats', 'light', _admin_get('/api/admin/stats')),
+    ('admin.stats_not_modified', 'light', _revalidate('/api/admin/stats')),
+    ('admin.trends_hourly', 'light', lambda ctx, i: (
+        'GET', f"/api/admin/trends?session_token={_admin(ctx)}&granularity=hour&start={ctx['week_ago']}", {})),
+    ('admin.trends_daily', 'light', lambda ctx, i: (
+        'GET', f"/api/admin/trends?session_token={_admin(ctx)}&granularity=day&start={ctx['year_ago']}", {})),
+    ('admin.db_pool', 'light', _admin_get('/api/admin/db-pool')),
+    ('admin.session_cache', 'light', _admin_get('/api/admin/session-cache')),
+    ('admin.sentiment_queue', 'light', _admin_get('/api/admin/sentiment-queue')),
+    ('admin.sentiment_cache', 'light', _admin_get('/api/admin/sentiment-cache')),
+    ('admin.password_hashing', 'light', _admin_get('/api/admin/password-hashing')),
+    ('admin.rate_limits', 'light', _admin_get('/api/admin/rate-limits')),
+    ('admin.partitions', 'light', _admin_get('/api/admin/partitions')),
+    ('admin.sessions', 'light', _admin_get('/api/admin/sessions')),
+    ('admin.replica', 'light', _admin_get('/api/admin/replica')),
+    ('admin.metrics', 'light', _admin_get('/api/admin/metrics'))
+]
+
+def percentile(sorted_values: list, pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(pct / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+def summarize(latencies: list, errors: int, elapsed: float) -> dict:
+    """Latency percentiles (ms) and throughput for one scenario."""
+    values = sorted(latencies)
+    return {
+        'requests': len(values),
+        'errors': errors,
+        'p50_ms': round(percentile(values, 50) * 1000, 3),
+        'p95_ms': round(percentile(values, 95) * 1000, 3),
+        'p99_ms': round(percentile(values, 99) * 1000, 3),
+        'mean_ms': round(sum(values) / len(values) * 1000, 3) if values else 0.0,
+        'max_ms': round(values[-1] * 1000, 3) if values else 0.0,
+        'throughput_rps': round(len(values) / elapsed, 2) if elapsed > 0 else 0.0
+    }
+
+def run_scenario(client, ctx: dict, build, iterations: int, warmup: int) -> dict:
+    """
+    Issue warmup + iterations requests one after another, timing each full response.
+    
+    Raises:
+        AssertionError: If a scenario with an expected_status gets another status
+    """
+    expected_status = getattr(build, 'expected_status', None)
+    latencies = []
+    sizes = []
+    errors = 0
+    started = time.perf_counter()
+    
+    for i in range(warmup + iterations):
+        method, url, kwargs = build(ctx, i)
+        request_started = time.perf_counter()
+        response = client.open(url, method=method, **kwargs)
+        size = len(response.get_data())
+        latency = time.perf_counter() - request_started
+        ctx['seen'].add((method, url.split('?')[0]))
+        response.close()
+        if expected_status is not None and response.status_code != expected_status:
+            raise AssertionError(
+                f"{method} {url.split('?')[0]} answered {response.status_code}, expected {expected_status}"
+            )
+        
+        if i < warmup:
+            started = time.perf_counter()
+            continue
+        latencies.append(latency)
+        sizes.append(size)
+        if response.status_code >= 400:
+            errors += 1
+    
+    # Mean body size as sent (after compression)
+    response_bytes = round(sum(sizes) / len(sizes)) if sizes else 0
+    return dict(summarize(latencies, errors, time.perf_counter() - started), response_bytes=response_bytes)
+
+def admin_login(client) -> str:
+    """Log the admin in and return the session token."""
+    return client.post('/api/auth/admin/login', json={
+        'username': Config.ADMIN_USERNAME, 'password': Config.ADMIN_PASSWORD}).get_json()['session_token']
+
+def prepare_context(client, seeded: dict, iterations: dict, run: str) -> dict:
+    """Log the admin in and set up tokens and cursors the scenarios need."""
+    ctx = {
+        'client': client,
+        'etags': {},
+        'admin_token': admin_login(client),
+        'tokens': seeded['tokens'],
+        'users': seeded['users'],
+        'password': seeded['password'],
+        'run': run,
+        'seen': set()
+    }
+    
+    page = client.get(f"/api/feedback?session_token={ctx['admin_token']}&limit=50").get_json()
+    ctx['cursor'] = page.get('next_cursor') or ''
+    # Trend ranges over the seeded year: 168 hourly and 366 daily buckets
+    now = datetime.now(timezone.utc)
+    ctx['week_ago'] = (now - timedelta(days=7)).strftime('%Y-%m-%dT%H:%M:%S')
+    ctx['year_ago'] = (now - timedelta(days=365)).strftime('%Y-%m-%dT%H:%M:%S')
+    
+    # Sessions to log out, created outside the timed section
+    conn = database.get_db_connection()
+    try:
+        count = iterations['light'] + iterations['warmup']
+        ctx['logout_tokens'] = [
+            AuthenticationService.create_session(conn.cursor(), i % seeded['users'] + 1, False)
+            for i in range(count)
+        ]
+        conn.commit()
+    finally:
+        conn.close()
+    return ctx
+
+def uncovered_routes(app, seen: set) -> list:
+    """Return 'METHOD /rule' for every API route no scenario requested."""
+    adapter = app.url_map.bind('localhost')
+    covered = set()
+    for method, path in seen:
+        try:
+            rule, _ = adapter.match(path, method=method, return_rule=True)
+            covered.add((method, rule.rule))
+        except Exception:
+            pass
+    
+    missing = []
+    for rule in app.url_map.iter_rules():
+        if rule.endpoint == 'static':
+            continue
+        for method in sorted(rule.methods - {'HEAD', 'OPTIONS'}):
+            if (method, rule.rule) not in covered:
+                missing.append(f'{method} {rule.rule}')
+    return missing
+
+def benchmark_scale(rows: int, iterations: dict, seed: int, only: list = None) -> dict:
+    """Seed a fresh database with rows feedback and run every scenario against it."""
+    workdir = tempfile.mkdtemp(prefix='feedback-bench-')
+    original_path = database.DATABASE_PATH
+    database.DATABASE_PATH = os.path.join(workdir, 'bench.db')
+    
+    try:
+        init_db(verbose=False)
+        started = time.perf_counter()
+        seeded = seed_database(rows, seed=seed)
+        seed_seconds = time.perf_counter() - started
+        print(f"\nSeeded {rows} feedback rows, {seeded['users']} users in {seed_seconds:.1f}s")
+        
+        app = create_app()
+        client = app.test_client()
+        ctx = prepare_context(client, seeded, iterations, run=str(rows))
+        
+        results = {}
+        for name, kind, build in SCENARIOS:
+            if only and not any(name.startswith(prefix) for prefix in only):
+                continue
+            # auth.admin_login pushes earlier admin sessions past the per-account cap
+            ctx['admin_token'] = admin_login(client)
+            results[name] = run_scenario(client, ctx, build, iterations[kind], iterations['warmup'])
+            stats = results[name]
+            print(f"  {name:<34} p50 {stats['p50_ms']:>9.2f}ms  p95 {stats['p95_ms']:>9.2f}ms  "
+                  f"p99 {stats['p99_ms']:>9.2f}ms  {stats['throughput_rps']:>8.1f} req/s  "
+                  f"{stats['response_bytes']:>10} B"
+                  + (f"  ({stats['errors']} errors)" if stats['errors'] else ''))
+        
+        # Let queued sentiment work finish before the database goes away
+        sentiment_queue.join()
+        
+        return {
+            'rows': rows,
+            'users': seeded['users'],
+            'seed_seconds': round(seed_seconds, 2),
+            'database_bytes': os.path.getsize(database.DATABASE_PATH) + sum(
+                partition['bytes'] for partition in partitions.list_partitions()
+            ),
+            'scenarios': results,
+            'uncovered_routes': uncovered_routes(app, ctx['seen']) if not only else []
+        }
+        
+    finally:
+        session_reaper.stop()
+        read_replica.stop()
+        close_all_pools()
+        database.DATABASE_PATH = original_path
+        shutil.rmtree(workdir, ignore_errors=True)
+
+def git_commit() -> str:
+    """Short hash of the checked-out commit, or 'unknown' outside git."""
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=BACKEND_DIR,
+            capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+
+def compare(old_path: str, new_path: str):
+    """Print p50/p95/p99 and throughput changes between two result files."""
+    with open(old_path) as f:
+        old = json.load(f)
+    with open(new_path) as f:
+        new = json.load(f)
+    
+    print(f"{old['meta']['commit']} -> {new['meta']['commit']}")
+    old_scales = {scale['rows']: scale for scale in old['scales']}
+    for scale in new['scales']:
+        before = old_scales.get(scale['rows'])
+        if not before:
+            continue
+        print(f"\n{scale['rows']} rows")
+        for name, stats in scale['scenarios'].items():
+            if name not in before['scenarios']:
+                continue
+            changes = []
+            for metric in ('p50_ms', 'p95_ms', 'p99_ms', 'throughput_rps'):
+                old_value = before['scenarios'][name][metric]
+                change = (stats[metric] - old_value) / old_value * 100 if old_value else 0.0
+                changes.append(f"{metric} {stats[metric]:>9.2f} ({change:+6.1f}%)")
+            print(f"  {name:<34} " + '  '.join(changes))
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark every API route against synthetic data.')
+    parser.add_argument('--rows', type=int, nargs='+', default=[1000, 10000],
+                        help='Feedback rows per scale, e.g. 1000 10000 100000 1000000')
+    parser.add_argument('--iterations', type=int, default=200, help='Requests per light scenario')
+    parser.add_argument('--auth-iterations', type=int, default=20, help='Requests per bcrypt scenario')
+    parser.add_argument('--heavy-iterations', type=int, default=5, help='Requests per full-table scenario')
+    parser.add_argument('--warmup', type=int, default=3, help='Untimed requests before each scenario')
+    parser.add_argument('--seed', type=int, default=42, help='Random seed for the synthetic data')
+    parser.add_argument('--bcrypt-rounds', type=int, default=Config.BCRYPT_ROUNDS)
+    parser.add_argument('--only', nargs='+', help='Run only scenarios starting with these prefixes')
+    parser.add_argument('--output', help='Results file (default: benchmarks/results/<time>-<commit>.json)')
+    parser.add_argument('--compare', nargs=2, metavar=('OLD', 'NEW'), help='Diff two results files and exit')
+    args = parser.parse_args()
+    
+    if args.compare:
+        compare(*args.compare)
+        return
+    
+    password_hasher.rounds = args.bcrypt_rounds
+    # Every scenario comes from one client address and repeats logins per
+    # user; the limiter would answer most of them with 429
+    rate_limiter.enabled = False
+    iterations = {
+        'light': args.iterations,
+        'auth': args.auth_iterations,
+        'heavy': args.heavy_iterations,
+        'warmup': args.warmup
+    }
+    commit = git_commit()
+    results = {
+        'meta': {
+            'commit': commit,
+            'started_at': datetime.now().isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'sqlite': sqlite3.sqlite_version,
+            'platform': platform.platform(),
+            'cpu_count': os.cpu_count(),
+            'seed': args.seed,
+            'bcrypt_rounds': args.bcrypt_rounds,
+            'iterations': iterations
+        },
+        'scales': []
+    }
+    
+    for rows in args.rows:
+        results['scales'].append(benchmark_scale(rows, iterations, args.seed, args.only))
+    
+    output = args.output or os.path.join(
+        RESULTS_DIR, f"{datetime.now().strftime('%Y%m%d-%H%M%S')}-{commit}.json"
+    )
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w') as f:
+        json.dump(results, f, indent=2)
+    
+    missing = {route for scale in results['scales'] for route in scale['uncovered_routes']}
+    if missing:
+        print(f"\nRoutes without a scenario: {', '.join(sorted(missing))}")
+    print(f"\n✓ Results written to {output}")
+
+if __name__ == '__main__':
+    main()
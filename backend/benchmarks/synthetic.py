@@ -0,0 +1,141 @@
+import random
+import secrets
+from datetime import datetime, timedelta
+import bcrypt
+from app import partitions
+from app.database import get_db_connection
+from app.services.auth_service import AuthenticationService
+from app.services.password_hasher import password_hasher
+from app.services.sentiment_service import SentimentAnalysisService
+
+# Phrase banks for comments that read like real product feedback
+ASPECTS = [
+    'the checkout flow', 'customer support', 'the mobile app', 'delivery', 'the search page',
+    'the new dashboard', 'pricing', 'the onboarding emails', 'the refund process', 'login',
+    'the product quality', 'the packaging', 'notifications', 'the help center', 'the website'
+]
+POSITIVE = [
+    'is great', 'was really helpful', 'works perfectly', 'is fast and easy to use', 'exceeded my expectations',
+    'is excellent', 'was a pleasant surprise', 'feels very polished', 'is the best I have used', 'was amazing'
+]
+NEGATIVE = [
+    'is terrible', 'was slow and confusing', 'keeps crashing', 'is frustrating', 'was a complete waste of time',
+    'is awful', 'feels broken', 'was disappointing', 'is way too expensive', 'never works on the first try'
+]
+NEUTRAL = [
+    'is okay I guess', 'works as described', 'was average', 'could use some changes', 'is what I expected',
+    'took about a week', 'has a few options', 'was fine', 'is available in the settings', 'did the job'
+]
+OPENERS = ['', '', '', 'Honestly, ', 'Overall ', 'To be fair, ', 'I think ', 'Last time I checked ', 'Wow, ']
+CLOSERS = [
+    '', '', '.', '!', '. Thanks.', '. Will order again.', '. Please fix this.', ' :)', ' :(',
+    '. Not sure I would recommend it.', '. Keep it up!'
+]
+
+def make_comment(rng: random.Random, rating: int) -> str:
+    """Build a one to three sentence comment whose tone roughly follows the rating."""
+    if rating >= 4:
+        banks = [POSITIVE] * 4 + [NEUTRAL]
+    elif rating <= 2:
+        banks = [NEGATIVE] * 4 + [NEUTRAL]
+    else:
+        banks = [NEUTRAL] * 3 + [POSITIVE, NEGATIVE]
+    
+    sentences = []
+    for _ in range(rng.choice((1, 1, 2, 3))):
+        phrase = rng.choice(rng.choice(banks))
+        sentence = f'{rng.choice(OPENERS)}{rng.choice(ASPECTS)} {phrase}'
+        sentences.append(sentence[0].upper() + sentence[1:] + rng.choice(CLOSERS))
+    return ' '.join(sentences)
+
+def seed_database(feedback_rows: int, seed: int = 42, users: int = None, chunk_size: int = 20000) -> dict:
+    """
+    Fill the current database with synthetic users, sessions and feedback.
+    
+    Writes go straight to SQLite in executemany chunks, feedback into its
+    monthly partitions (the triggers keep the rollups and search index
+    current), and every user shares one password hash, made at the hasher's
+    current cost so logins never trigger a rehash.
+    
+    Args:
+        feedback_rows: Number of feedback rows to create
+        seed: Random seed; the same seed always produces the same data
+        users: Number of users (defaults to one per ten feedback rows)
+        chunk_size: Rows inserted per batch (one transaction per partition)
+    
+    Returns:
+        Dictionary with counts, the shared password and sample session tokens
+    """
+    rng = random.Random(seed)
+    users = users or max(10, feedback_rows // 10)
+    password = 'benchmark-password'
+    password_hash = bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt(rounds=password_hasher.rounds)).decode('utf-8')
+    now = datetime.now().replace(microsecond=0)
+    tokens = []
+    
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    
+    try:
+        cursor.executemany(
+            'INSERT INTO users (username, email, password_hash, created_at) VALUES (?, ?, ?, ?)',
+            [
+                (f'user{i}', f'user{i}@example.com', password_hash,
+                 (now - timedelta(days=400) + timedelta(seconds=i)).strftime('%Y-%m-%d %H:%M:%S'))
+                for i in range(users)
+            ]
+        )
+        conn.commit()
+        
+        # One session per user; a fifth of them already expired, for the reaper
+        sessions = []
+        for user_id in range(1, users + 1):
+            token = secrets.token_urlsafe(32)
+            expired = rng.random() < 0.2
+            expires_at = now + (timedelta(hours=-1) if expired else timedelta(hours=24))
+            sessions.append((user_id, AuthenticationService.hash_session_token(token), 0, expires_at))
+            if not expired and len(tokens) < 1000:
+                tokens.append(token)
+        cursor.executemany(
+            'INSERT INTO sessions (user_id, token_hash, is_admin, expires_at) VALUES (?, ?, ?, ?)',
+            sessions
+        )
+        conn.commit()
+        
+        # Feedback spread evenly over the last year, written oldest first like real traffic
+        start = now - timedelta(days=365)
+        step = 365 * 24 * 3600 / feedback_rows
+        for chunk_start in range(0, feedback_rows, chunk_size):
+            rows = []
+            for i in range(chunk_start, min(chunk_start + chunk_size, feedback_rows)):
+                rating = rng.choices((1, 2, 3, 4, 5), weights=(10, 10, 20, 30, 30))[0]
+                created_at = (start + timedelta(seconds=int(i * step))).strftime('%Y-%m-%d %H:%M:%S')
+                rows.append((rng.randint(1, users), rating, make_comment(rng, rating), created_at))
+            
+            sentiments = SentimentAnalysisService.analyze_batch([row[2] for row in rows])
+            by_key = {}
+            for (user_id, rating, comment, created_at), sentiment in zip(rows, sentiments):
+                by_key.setdefault(partitions.key_for(created_at), []).append(
+                    (user_id, rating, comment, sentiment, created_at)
+                )
+            for key, values in by_key.items():
+                with partitions.writing(key, create_missing=True) as partition:
+                    partition.executemany(
+                        'INSERT INTO feedback (user_id, rating, comment, sentiment, created_at) VALUES (?, ?, ?, ?, ?)',
+                        values
+                    )
+                    partition.commit()
+        
+        return {
+            'users': users,
+            'sessions': len(sessions),
+            'feedback': feedback_rows,
+            'password': password,
+            'tokens': tokens
+        }
+        
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
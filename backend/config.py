@@ -4,6 +4,111 @@ class Config:
     SECRET_KEY = os.environ.get('SECRET_KEY') or 'dev-secret-key-change-in-production'
     DATABASE_PATH = os.path.join(os.path.dirname(__file__), 'feedback.db')
     SESSION_EXPIRY_HOURS = 24
+    SESSION_CACHE_SIZE = 10000
+    SESSION_CACHE_TTL_SECONDS = 60
+    SESSION_MAX_PER_USER = 10
+    SESSION_REAP_INTERVAL_SECONDS = 300
+    SESSION_REAP_BATCH_SIZE = 500
+    SESSION_REAP_BATCH_PAUSE_SECONDS = 0.05
+    
+    # Password hashing: cost factor and the bounded bcrypt pool
+    BCRYPT_ROUNDS = int(os.environ.get('BCRYPT_ROUNDS', 12))
+    BCRYPT_WORKERS = max(1, (os.cpu_count() or 2) // 2)
+    BCRYPT_QUEUE_SIZE = 32
+    BCRYPT_TIMEOUT_SECONDS = 30
+    BCRYPT_RETRY_AFTER_SECONDS = 1
+    
+    # Login/registration rate limiting: token buckets per client IP and per
+    # username, checked before any bcrypt work. The sqlite backend shares the
+    # buckets between worker processes on one host.
+    RATE_LIMIT_ENABLED = os.environ.get('RATE_LIMIT_ENABLED', '1') == '1'
+    RATE_LIMIT_BACKEND = os.environ.get('RATE_LIMIT_BACKEND', 'memory')
+    RATE_LIMIT_IP_BURST = 20
+    RATE_LIMIT_IP_PER_MINUTE = 30
+    RATE_LIMIT_USERNAME_BURST = 5
+    RATE_LIMIT_USERNAME_PER_MINUTE = 5
+    RATE_LIMIT_MAX_KEYS = 100000
+    RATE_LIMIT_MAX_USERNAME_LENGTH = 150
+    RATE_LIMIT_EVICT_INTERVAL_SECONDS = 60
+    RATE_LIMIT_TRUSTED_PROXIES = int(os.environ.get('RATE_LIMIT_TRUSTED_PROXIES', 0))
+    
+    # Async (ASGI) serving mode: run_async.py
+    ASYNC_CPU_WORKERS = max(1, (os.cpu_count() or 2) // 2)
+    ASYNC_HOST = '127.0.0.1'
+    ASYNC_PORT = 5000
+    
+    # Production prefork server: gunicorn -c gunicorn.conf.py
+    PREFORK_HOST = os.environ.get('HOST', '127.0.0.1')
+    PREFORK_PORT = int(os.environ.get('PORT', 8000))
+    PREFORK_WORKERS = int(os.environ.get('WEB_CONCURRENCY', os.cpu_count() or 2))
+    PREFORK_THREADS = 4
+    
+    # Request, SQL, TextBlob and bcrypt timing (GET /api/admin/metrics)
+    METRICS_ENABLED = os.environ.get('METRICS_ENABLED', '1') == '1'
+    
+    # SQLite connection pool
+    DB_POOL_SIZE = int(os.environ.get('DB_POOL_SIZE', 8))
+    DB_SIDE_POOL_SIZE = 2
+    DB_POOL_TIMEOUT = 5.0
+    DB_BUSY_TIMEOUT_MS = 5000
+    DB_MMAP_SIZE = 64 * 1024 * 1024
+    
+    # Background sentiment classification
+    SENTIMENT_ASYNC = os.environ.get('SENTIMENT_ASYNC', '1') == '1'
+    SENTIMENT_WORKERS = 2
+    SENTIMENT_BATCH_SIZE = 64
+    SENTIMENT_BATCH_WAIT_SECONDS = 0.05
+    SENTIMENT_QUEUE_MAXSIZE = 10000
+    
+    # Memoized sentiment labels (in-process LRU over the sentiment_cache table)
+    SENTIMENT_CACHE_ENABLED = os.environ.get('SENTIMENT_CACHE_ENABLED', '1') == '1'
+    SENTIMENT_CACHE_SIZE = 50000
+    
+    # Monthly feedback partitions (one SQLite file per month, see app/partitions.py):
+    # rows moved per transaction when an unpartitioned feedback table is adopted
+    FEEDBACK_PARTITION_ADOPT_BATCH_SIZE = 5000
+    
+    # Cold archive: whole months older than this move into compressed,
+    # append-only segments (archive_old_feedback.py, see app/cold_archive.py)
+    COLD_ARCHIVE_AFTER_DAYS = int(os.environ.get('COLD_ARCHIVE_AFTER_DAYS', 365))
+    COLD_ARCHIVE_BLOCK_ROWS = 5000
+    COLD_ARCHIVE_COMPRESSION_LEVEL = 9
+    
+    # Read-only snapshot replica for admin list, search and stats reads (see
+    # app/replica.py), opt-in as its reads may lag by up to the staleness
+    # bound: the changed files are copied with the SQLite backup API when
+    # the data has changed; reads go to the primary while it lags more
+    REPLICA_ENABLED = os.environ.get('REPLICA_ENABLED', '0') == '1'
+    REPLICA_REFRESH_INTERVAL_SECONDS = 5
+    REPLICA_MAX_STALENESS_SECONDS = float(os.environ.get('REPLICA_MAX_STALENESS_SECONDS', 30))
+    REPLICA_RETAIN_SECONDS = 60
+    
+    # Feedback listing pagination
+    FEEDBACK_PAGE_DEFAULT_LIMIT = 50
+    FEEDBACK_PAGE_MAX_LIMIT = 1000
+    
+    # Dashboard trends (hourly/daily rollup buckets)
+    TRENDS_MAX_BUCKETS = 1000
+    TRENDS_DEFAULT_BUCKETS = {'hour': 48, 'day': 30}
+    
+    # Conditional GET (ETag from the data version) and serialized admin responses
+    RESPONSE_CACHE_SIZE = 256
+    RESPONSE_CACHE_TTL_SECONDS = 300
+    RESPONSE_CACHE_MAX_BODY_BYTES = 1024 * 1024
+    
+    # Response compression (gzip, or br when brotli is installed)
+    COMPRESSION_MIN_BYTES = 1024
+    GZIP_LEVEL = 5
+    BROTLI_QUALITY = 4
+    
+    # Bulk feedback import
+    IMPORT_BATCH_SIZE = 2000
+    IMPORT_MAX_BATCH_SIZE = 50000
+    IMPORT_MAX_REPORTED_ERRORS = 100
+    IMPORT_BODY_TIMEOUT_SECONDS = 60
+    
+    # Feedback export
+    EXPORT_CHUNK_SIZE = 5000
     
     # Admin credentials (static)
     ADMIN_USERNAME = 'admin'
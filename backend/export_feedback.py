@@ -0,0 +1,51 @@
+import argparse
+import os
+import time
+from app.database import init_db
+from app.services.export_service import FeedbackExportService
+
+def export_feedback(path: str, file_format: str = None, filters: dict = None, chunk_size: int = None) -> bool:
+    """Stream feedback matching the filters to a CSV, NDJSON or Parquet file."""
+    init_db()
+    
+    if not file_format:
+        extension = os.path.splitext(path)[1].lower().lstrip('.')
+        file_format = extension if extension in FeedbackExportService.FORMATS else 'csv'
+    
+    stats = {'rows': 0}
+    started = time.perf_counter()
+    try:
+        chunks = FeedbackExportService.export(filters, file_format, chunk_size, stats)
+    except ValueError as e:
+        print(f"✗ {e}")
+        return False
+    
+    written = 0
+    with open(path, 'wb') as output:
+        for chunk in chunks:
+            output.write(chunk)
+            written += len(chunk)
+    
+    elapsed = time.perf_counter() - started
+    rate = stats['rows'] / elapsed if elapsed > 0 else 0.0
+    print(f"✓ Exported {stats['rows']} feedback rows ({written / 1024:.1f} KiB, {file_format}) "
+          f"to {path} in {elapsed:.2f}s ({rate:.1f} rows/s)")
+    return True
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Export feedback as CSV, NDJSON or Parquet.')
+    parser.add_argument('path', help='Output file')
+    parser.add_argument('--format', choices=list(FeedbackExportService.FORMATS),
+                        help='Output format (default: from the file extension, else csv)')
+    parser.add_argument('--sentiment', choices=['positive', 'negative', 'neutral'])
+    parser.add_argument('--rating', type=int, choices=range(1, 6))
+    parser.add_argument('--search', help='Search term for comments or username')
+    parser.add_argument('--archived', action='store_true', help='Include feedback in the cold archive')
+    parser.add_argument('--chunk-size', type=int, help='Rows read and encoded per chunk')
+    args = parser.parse_args()
+    
+    filters = {key: value for key, value in (
+        ('sentiment', args.sentiment), ('rating', args.rating), ('search', args.search),
+        ('archived', args.archived)
+    ) if value}
+    raise SystemExit(0 if export_feedback(args.path, args.format, filters or None, args.chunk_size) else 1)
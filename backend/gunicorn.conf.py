@@ -0,0 +1,35 @@
+import os
+import time
+
+launched = time.time()
+
+# Share the login rate limiter between the workers
+os.environ.setdefault('RATE_LIMIT_BACKEND', 'sqlite')
+
+from config import Config
+
+wsgi_app = 'wsgi:app'
+bind = f'{Config.PREFORK_HOST}:{Config.PREFORK_PORT}'
+workers = Config.PREFORK_WORKERS
+worker_class = 'gthread'
+threads = Config.PREFORK_THREADS
+# Import wsgi (migrations and warm-up) once in the master, then fork
+preload_app = True
+
+def when_ready(server):
+    """Report what preloading cost."""
+    from wsgi import startup
+    server.log.info(
+        'Preloaded in %.2fs (imports %.2fs, migrations %.2fs, sentiment warm-up %.2fs, bcrypt %.0fms per hash)',
+        startup['total'], startup['imports'], startup['migrations'],
+        startup['sentiment_warm_up'], startup['bcrypt_hash'] * 1000
+    )
+
+def post_worker_init(worker):
+    """Start this worker's sentiment queue and report time-to-ready."""
+    # Threads do not survive the fork, so not in wsgi.preload(); the first
+    # worker to get here requeues feedback left unscored by the last run
+    if Config.SENTIMENT_ASYNC:
+        from app.services.sentiment_queue import sentiment_queue
+        sentiment_queue.start(requeue=True)
+    worker.log.info('Worker ready %.2fs after launch', time.time() - launched)
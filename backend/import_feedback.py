@@ -0,0 +1,51 @@
+import argparse
+import os
+from app.database import init_db
+from app.services.import_service import FeedbackImportService
+
+def print_report(report: dict):
+    """Print per-batch throughput and the rows that were rejected."""
+    print("\n" + "="*80)
+    print("IMPORT REPORT")
+    print("="*80)
+    print(f"{'Batch':>6} {'Rows':>8} {'Score (s)':>10} {'Insert (s)':>11} {'Rows/s':>10}")
+    for batch in report['batches']:
+        print(f"{batch['batch']:>6} {batch['rows']:>8} {batch['score_seconds']:>10.4f} "
+              f"{batch['insert_seconds']:>11.4f} {batch['rows_per_second']:>10.1f}")
+    
+    if report['errors']:
+        print("\nRejected rows:")
+        for error in report['errors']:
+            print(f"  line {error['line']}: {'; '.join(error['errors'])}")
+        if report['rejected'] > len(report['errors']):
+            print(f"  ... and {report['rejected'] - len(report['errors'])} more")
+    
+    print()
+    if report['success']:
+        print(f"✓ {report['message']} in {report['total_seconds']:.2f}s "
+              f"({report['rows_per_second']:.1f} rows/s)")
+    else:
+        print(f"✗ {report['message']}")
+
+def import_feedback(path: str, file_format: str = None, batch_size: int = None) -> bool:
+    """Import feedback from an NDJSON or CSV file."""
+    init_db()
+    
+    if not file_format:
+        file_format = 'csv' if os.path.splitext(path)[1].lower() == '.csv' else 'ndjson'
+    
+    with open(path, encoding='utf-8', newline='') as lines:
+        report = FeedbackImportService.import_feedback(lines, file_format, batch_size)
+    
+    print_report(report)
+    return report['success']
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Bulk import feedback from NDJSON or CSV.')
+    parser.add_argument('path', help='File with user_id or username, rating, comment and optional created_at')
+    parser.add_argument('--format', choices=FeedbackImportService.FORMATS,
+                        help='Input format (default: from the file extension)')
+    parser.add_argument('--batch-size', type=int, help='Rows per transaction')
+    args = parser.parse_args()
+    
+    raise SystemExit(0 if import_feedback(args.path, args.format, args.batch_size) else 1)
@@ -0,0 +1,72 @@
+import argparse
+import re
+from app import partitions
+from app.data_version import data_version
+from app.database import init_db
+
+def list_partitions():
+    """Print every live partition with its size and rows, then the archived ones."""
+    live = partitions.list_partitions()
+    if not live:
+        print("No feedback partitions")
+    for partition in live:
+        print(f"  {partition['key']}  {partition['total_feedback']:>10} rows  {partition['bytes'] / 1024:>10.1f} KiB")
+    archived = partitions.archived_keys()
+    if archived:
+        print(f"Archived: {', '.join(archived)}")
+
+def retire_before(key: str, drop: bool = False) -> int:
+    """Archive (or with drop, delete) every partition older than the YYYY-MM key."""
+    retired = 0
+    for old in partitions.keys(newest_first=False):
+        if old >= key:
+            break
+        if drop:
+            partitions.drop(old)
+            print(f"✓ Dropped {old}")
+        else:
+            print(f"✓ Archived {old} to {partitions.archive(old)}")
+        retired += 1
+    if retired:
+        data_version.bump()
+    else:
+        print(f"No partitions older than {key}")
+    return retired
+
+def restore(key: str) -> bool:
+    """Move an archived partition back into the live set."""
+    try:
+        restored = partitions.restore(key)
+    except ValueError as e:
+        print(f"✗ {e}")
+        return False
+    if not restored:
+        print(f"✗ No archived partition {key}")
+        return False
+    data_version.bump()
+    print(f"✓ Restored {key}")
+    return True
+
+def month(value: str) -> str:
+    if not re.match(r'^\d{4}-\d{2}$', value):
+        raise argparse.ArgumentTypeError('expected YYYY-MM')
+    return value
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='List, archive, drop or restore monthly feedback partitions.')
+    group = parser.add_mutually_exclusive_group()
+    group.add_argument('--archive-before', type=month, metavar='YYYY-MM',
+                       help='Move partitions older than this month out of the live set')
+    group.add_argument('--drop-before', type=month, metavar='YYYY-MM',
+                       help='Delete partitions older than this month')
+    group.add_argument('--restore', type=month, metavar='YYYY-MM', help='Bring an archived partition back')
+    args = parser.parse_args()
+    
+    init_db()
+    if args.archive_before:
+        retire_before(args.archive_before)
+    elif args.drop_before:
+        retire_before(args.drop_before, drop=True)
+    elif args.restore:
+        raise SystemExit(0 if restore(args.restore) else 1)
+    list_partitions()
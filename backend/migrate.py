@@ -0,0 +1,103 @@
+import sys
+from app import partitions
+from app.database import get_db_connection
+from app.migrations import MIGRATIONS, get_schema_version, migrate
+from app.services.feedback_service import FeedbackService
+
+def hot_queries(schema: str = 'main') -> list:
+    """
+    Return (label, sql, params) for the queries the indexes are meant to serve.
+    
+    Feedback queries run against the given schema, the attached newest
+    partition once feedback is partitioned.
+    """
+    cursor_token = FeedbackService.encode_cursor('2024-01-01 00:00:00', 1000)
+    listings = [
+        ('List feedback (first page)', None, None),
+        ('List feedback (next page)', None, cursor_token),
+        ('Filter by sentiment', {'sentiment': 'positive'}, None),
+        ('Filter by rating', {'rating': 5}, None),
+        ('Filter by sentiment and rating', {'sentiment': 'negative', 'rating': 1}, None)
+    ]
+    queries = []
+    for label, filters, cursor in listings:
+        sql, params = FeedbackService._build_feedback_query(filters, cursor, 50, schema)
+        queries.append((label, sql, params))
+    
+    queries.append((
+        'Dashboard stats recount',
+        f'''SELECT COUNT(*), SUM(rating), SUM(sentiment = 'positive'),
+                  SUM(sentiment = 'negative'), SUM(sentiment = 'neutral')
+           FROM {schema}.feedback''',
+        []
+    ))
+    queries.append(('Feedback by user', f'SELECT COUNT(*) FROM {schema}.feedback WHERE user_id = ?', [1]))
+    queries.append(('Expired sessions', 'SELECT id FROM sessions WHERE expires_at < ?', ['2024-01-01 00:00:00']))
+    queries.append(('Validate session', 'SELECT user_id FROM sessions WHERE token_hash = ?', [bytes(32)]))
+    queries.append(('Sessions over the per-user cap', 'SELECT id FROM sessions WHERE user_id IS ? ORDER BY id DESC', [1]))
+    queries.append((
+        'Trend range (hourly buckets)',
+        f'SELECT * FROM {schema}.feedback_trends WHERE granularity = ? AND bucket >= ? AND bucket <= ?',
+        ['hour', '2024-01-01 00:00:00', '2024-01-08 00:00:00']
+    ))
+    queries.append((
+        'Sentiment cache lookup',
+        'SELECT text_hash, sentiment FROM sentiment_cache WHERE version = ? AND text_hash IN (?, ?)',
+        ['textblob', bytes(32), bytes(32)]
+    ))
+    return queries
+
+def print_query_plans(title: str):
+    """Print EXPLAIN QUERY PLAN for every hot query."""
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    newest = partitions.keys()[:1]
+    
+    print("\n" + "="*80)
+    print(title)
+    print("="*80)
+    try:
+        if newest:
+            print(f"(feedback queries against partition {newest[0]})")
+            with partitions.attached(conn, newest[0]) as schema:
+                _explain(cursor, hot_queries(schema))
+        else:
+            _explain(cursor, hot_queries())
+    finally:
+        conn.close()
+
+def _explain(cursor, queries: list):
+    """Print the plan of each (label, sql, params) query."""
+    for label, sql, params in queries:
+        print(f"\n{label}:")
+        try:
+            cursor.execute('EXPLAIN QUERY PLAN ' + sql, params)
+            for row in cursor.fetchall():
+                print(f"  {row['detail']}")
+        except Exception as e:
+            print(f"  (not available: {e})")
+
+def run_migrations():
+    """Apply pending migrations, printing query plans before and after."""
+    version = get_schema_version()
+    latest = MIGRATIONS[-1][0]
+    print(f"Schema version: {version} (latest: {latest})")
+    
+    if version >= latest:
+        print("✓ Schema is up to date")
+        print_query_plans("QUERY PLANS")
+        return
+    
+    print_query_plans("QUERY PLANS BEFORE MIGRATION")
+    
+    print()
+    applied = migrate(verbose=True)
+    print(f"✓ Applied {len(applied)} migration(s), schema version is now {get_schema_version()}")
+    
+    print_query_plans("QUERY PLANS AFTER MIGRATION")
+
+if __name__ == '__main__':
+    if '--status' in sys.argv[1:]:
+        print(f"Schema version: {get_schema_version()} (latest: {MIGRATIONS[-1][0]})")
+    else:
+        run_migrations()
@@ -1,7 +1,10 @@
 import os
+import shutil
 import sqlite3
 
 DATABASE_PATH = os.path.join(os.path.dirname(__file__), 'feedback.db')
+PARTITIONS_PATH = DATABASE_PATH + '-partitions'
+REPLICA_PATH = DATABASE_PATH + '-replica'
 
 def reset_database():
     """Delete all data from all tables."""
@@ -20,6 +23,9 @@ def reset_database():
         cursor.execute('DELETE FROM sessions')
         cursor.execute('DELETE FROM feedback')
         cursor.execute('DELETE FROM users')
+        # Old -> partitioned ids of adopted feedback (schema version 8)
+        if cursor.execute("SELECT 1 FROM sqlite_master WHERE name = 'legacy_feedback_ids'").fetchone():
+            cursor.execute('DELETE FROM legacy_feedback_ids')
         
         # Reset auto-increment counters
         cursor.execute('DELETE FROM sqlite_sequence WHERE name="sessions"')
@@ -30,6 +36,12 @@ def reset_database():
         cursor.execute('PRAGMA foreign_keys = ON')
         
         conn.commit()
+        
+        # Feedback lives in the monthly partition files, archived ones included
+        shutil.rmtree(PARTITIONS_PATH, ignore_errors=True)
+        # The snapshot replica is rebuilt from the emptied database
+        shutil.rmtree(REPLICA_PATH, ignore_errors=True)
+        
         print("✓ Database reset successfully!")
         print("✓ All data deleted from users, feedback, and sessions tables")
         
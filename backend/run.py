@@ -1,11 +1,15 @@
 from app import create_app
 from app.database import init_db
+from app.services.sentiment_queue import sentiment_queue
+from config import Config
 
-# Initialize database
-init_db()
-
-# Create Flask app
+# Create Flask app (for production use gunicorn -c gunicorn.conf.py)
 app = create_app()
 
 if __name__ == '__main__':
+    # Initialize database
+    init_db()
+    # Classify feedback in the background, requeueing what the last run left unscored
+    if Config.SENTIMENT_ASYNC:
+        sentiment_queue.start(requeue=True)
     app.run(debug=True, port=5000)
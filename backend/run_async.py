@@ -0,0 +1,17 @@
+import asyncio
+from hypercorn.asyncio import serve
+from hypercorn.config import Config as HypercornConfig
+from app.async_app import create_async_app
+from app.database import init_db
+from config import Config
+
+# Initialize database
+init_db()
+
+# Create Quart app (also servable with: hypercorn run_async:app)
+app = create_async_app()
+
+if __name__ == '__main__':
+    hypercorn_config = HypercornConfig()
+    hypercorn_config.bind = [f'{Config.ASYNC_HOST}:{Config.ASYNC_PORT}']
+    asyncio.run(serve(app, hypercorn_config))
@@ -1,7 +1,10 @@
 import pytest
 import os
+import shutil
 import sqlite3
-from app.database import init_db, DATABASE_PATH
+from app.database import init_db, close_all_pools, DATABASE_PATH
+from app.data_version import data_version
+from app.replica import read_replica
 
 @pytest.fixture
 def test_db():
@@ -19,7 +22,18 @@ def test_db():
     
     yield test_db_path
     
-    # Cleanup: restore original path and remove test database
+    # Cleanup: stop the replica refresher, close pooled connections and the
+    # data version map, restore original path and remove test database
+    read_replica.stop()
+    close_all_pools()
+    data_version.close()
     app.database.DATABASE_PATH = original_path
-    if os.path.exists(test_db_path):
-        os.remove(test_db_path)
+    for base in (test_db_path, test_db_path + '-ratelimit'):
+        for path in (base, base + '-wal', base + '-shm'):
+            if os.path.exists(path):
+                os.remove(path)
+    for path in (test_db_path + '-version', test_db_path + '-requeue'):
+        if os.path.exists(path):
+            os.remove(path)
+    shutil.rmtree(test_db_path + '-partitions', ignore_errors=True)
+    shutil.rmtree(test_db_path + '-replica', ignore_errors=True)
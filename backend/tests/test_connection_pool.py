@@ -0,0 +1,90 @@
+import sqlite3
+import threading
+import pytest
+from app.database import ConnectionPool
+
+@pytest.fixture
+def pool(test_db):
+    """A two-connection pool on the test database that gives up waiting after 50ms."""
+    connection_pool = ConnectionPool(test_db, max_size=2, timeout=0.05)
+    yield connection_pool
+    connection_pool.close()
+
+class TestReuse:
+    """Released connections are handed out again instead of opening new ones."""
+    
+    def test_released_connection_is_reused(self, pool):
+        conn = pool.acquire()
+        pool.release(conn)
+        
+        assert pool.acquire() is conn
+        stats = pool.stats()
+        assert stats['created'] == 1
+        assert stats['reused'] == 1
+        assert stats['in_use'] == 1
+    
+    def test_uncommitted_work_is_rolled_back_on_release(self, pool):
+        conn = pool.acquire()
+        conn.execute("INSERT INTO users (username, email, password_hash) VALUES ('alice', 'a@example.com', 'x')")
+        pool.release(conn)
+        
+        conn = pool.acquire()
+        assert conn.execute('SELECT COUNT(*) FROM users').fetchone()[0] == 0
+
+class TestMaxSize:
+    """At max_size, acquire waits for a release and fails after the timeout."""
+    
+    def test_exhausted_pool_times_out(self, pool):
+        held = [pool.acquire(), pool.acquire()]
+        
+        with pytest.raises(sqlite3.OperationalError, match='exhausted'):
+            pool.acquire()
+        stats = pool.stats()
+        assert stats['created'] == 2
+        assert stats['waits'] == 1
+        assert stats['timeouts'] == 1
+        assert stats['in_use'] == len(held)
+    
+    def test_waiter_gets_the_released_connection(self, pool):
+        pool.timeout = 5
+        held = [pool.acquire(), pool.acquire()]
+        threading.Timer(0.05, pool.release, (held[0],)).start()
+        
+        assert pool.acquire() is held[0]
+        assert pool.stats()['created'] == 2
+
+class TestBrokenConnection:
+    """A connection that fails on release is discarded and replaced."""
+    
+    def test_broken_connection_is_discarded(self, pool):
+        conn = pool.acquire()
+        conn.execute('BEGIN')
+        conn.close()
+        pool.release(conn)
+        
+        stats = pool.stats()
+        assert stats['created'] == 0
+        assert stats['idle'] == 0
+        replacement = pool.acquire()
+        assert replacement is not conn
+        assert replacement.execute('SELECT 1').fetchone()[0] == 1
+
+class TestClose:
+    """A closed pool refuses checkouts and closes connections returned to it."""
+    
+    def test_acquire_raises_once_closed(self, pool):
+        pool.release(pool.acquire())
+        pool.close()
+        
+        with pytest.raises(sqlite3.OperationalError, match='closed'):
+            pool.acquire()
+        assert pool.stats()['idle'] == 0
+    
+    def test_connection_released_after_close_is_closed(self, pool):
+        conn = pool.acquire()
+        pool.close()
+        pool.release(conn)
+        
+        with pytest.raises(sqlite3.ProgrammingError):
+            conn.execute('SELECT 1')
+        assert pool.stats()['idle'] == 0
@@ -0,0 +1,57 @@
+import io
+import json
+from app import partitions
+from app.services.auth_service import AuthenticationService
+from app.services.feedback_service import FeedbackService
+from app.services.import_service import FeedbackImportService
+
+def ndjson(*records) -> io.StringIO:
+    return io.StringIO('\n'.join(json.dumps(record) for record in records) + '\n')
+
+class TestNormalizeRecord:
+    """Row validation for bulk imports."""
+    
+    def test_aware_created_at_is_converted_to_utc(self):
+        row, errors = FeedbackImportService.normalize_record(
+            {'username': 'alice', 'rating': 4, 'comment': 'Nice', 'created_at': '2024-03-31T23:30:00-05:00'}
+        )
+        assert errors == []
+        assert row[4] == '2024-04-01 04:30:00'
+        assert partitions.key_for(row[4]) == '2024-04'
+    
+    def test_naive_created_at_is_kept(self):
+        row, errors = FeedbackImportService.normalize_record(
+            {'username': 'alice', 'rating': 4, 'comment': 'Nice', 'created_at': '2024-03-31T23:30:00'}
+        )
+        assert row[4] == '2024-03-31 23:30:00'
+    
+    def test_non_string_username_is_rejected(self):
+        row, errors = FeedbackImportService.normalize_record({'username': 123, 'rating': 4, 'comment': 'Nice'})
+        assert row is None
+        assert errors == ['username must be a string']
+    
+    def test_non_scalar_user_id_is_rejected(self):
+        for user_id in ([1], {'id': 1}, 1.5, True):
+            row, errors = FeedbackImportService.normalize_record({'user_id': user_id, 'rating': 4, 'comment': 'Nice'})
+            assert row is None
+            assert errors == ['user_id must be an integer']
+
+class TestImportFeedback:
+    """One bad row is rejected without aborting the import."""
+    
+    def test_bad_identity_rows_are_rejected_individually(self, test_db):
+        AuthenticationService.register_user('alice', 'alice@example.com', 'Password123!')
+        report = FeedbackImportService.import_feedback(ndjson(
+            {'username': 'alice', 'rating': 5, 'comment': 'Great service', 'created_at': '2024-03-31T23:30:00-05:00'},
+            {'username': 123, 'rating': 4, 'comment': 'Nice'},
+            {'user_id': [1], 'rating': 4, 'comment': 'Nice'},
+            {'username': 'alice', 'rating': 2, 'comment': 'Slow delivery', 'created_at': '2024-03-15T12:00:00'}
+        ), 'ndjson')
+        
+        assert report['success']
+        assert report['imported'] == 2
+        assert report['rejected'] == 2
+        assert [error['line'] for error in report['errors']] == [2, 3]
+        
+        feedback = FeedbackService.get_all_feedback()
+        assert sorted(partitions.key_for_id(row['id']) for row in feedback) == ['2024-03', '2024-04']
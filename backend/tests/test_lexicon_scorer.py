@@ -0,0 +1,49 @@
+import numpy as np
+import pytest
+from hypothesis import given, strategies as st
+from app.services import lexicon_scorer
+
+# Comment-like text with the characters that trip up batch tokenizing
+comment_text = st.lists(
+    st.sampled_from([
+        'good', 'bad', 'great', 'awful', 'not', 'very', "isn't", ':)', '!', '.', '\x00', 'good\x00bad', '', 'the app'
+    ]),
+    max_size=8
+).map(' '.join) | st.text(max_size=20)
+
+class TestTextBlobParity:
+    """The vectorized scorer labels comments the way TextBlob does."""
+    
+    def test_reference_corpus_labels_match_textblob(self):
+        pytest.importorskip('textblob')
+        report = lexicon_scorer.verify_against_textblob()
+        assert report['mismatches'] == []
+        assert report['matches'] == report['total'] == len(lexicon_scorer.REFERENCE_CORPUS)
+    
+    def test_single_comments_match_textblob(self):
+        textblob = pytest.importorskip('textblob')
+        texts = ['Great service!', 'The app is not good', 'Terrible, awful support :(', 'It was okay', '']
+        expected = [textblob.TextBlob(text).sentiment.polarity for text in texts]
+        assert np.allclose(lexicon_scorer.polarity_batch(texts), expected)
+
+class TestBatchAlignment:
+    """One score per input, in input order, whatever the comments contain."""
+    
+    def test_nul_inside_a_comment_does_not_shift_labels(self):
+        texts = ['Great service!', 'bad\x00 worst', 'terrible awful', 'wonderful excellent', 'horrible']
+        polarity = lexicon_scorer.polarity_batch(texts)
+        assert len(polarity) == len(texts)
+        assert lexicon_scorer.classify(polarity) == ['positive', 'negative', 'negative', 'positive', 'negative']
+    
+    def test_empty_and_nul_only_comments(self):
+        texts = ['', '\x00', 'good', '', '\x00\x00', 'bad']
+        polarity = lexicon_scorer.polarity_batch(texts)
+        assert len(polarity) == len(texts)
+        assert lexicon_scorer.classify(polarity) == ['neutral', 'neutral', 'positive', 'neutral', 'neutral', 'negative']
+    
+    @given(st.lists(comment_text, max_size=12))
+    def test_batch_scores_equal_one_at_a_time_scores(self, texts):
+        polarity = lexicon_scorer.polarity_batch(texts)
+        assert len(polarity) == len(texts)
+        for text, score in zip(texts, polarity):
+            assert score == pytest.approx(lexicon_scorer.polarity_batch([text])[0])
@@ -0,0 +1,279 @@
+import pytest
+from app import cold_archive, partitions
+from app.database import get_db_connection
+from app.services.admin_service import AdminService
+from app.services.feedback_service import FeedbackService
+from app.services.sentiment_service import SentimentAnalysisService
+
+def add_user(username: str = 'alice') -> int:
+    conn = get_db_connection()
+    try:
+        cursor = conn.cursor()
+        cursor.execute(
+            'INSERT INTO users (username, email, password_hash) VALUES (?, ?, ?)',
+            (username, f'{username}@example.com', 'not-a-real-hash')
+        )
+        conn.commit()
+        return cursor.lastrowid
+    finally:
+        conn.close()
+
+def add_feedback(user_id: int, rows: list) -> list:
+    """Insert (rating, comment, sentiment, created_at) rows into their partitions; return the ids."""
+    ids = []
+    for rating, comment, sentiment, created_at in rows:
+        with partitions.writing(partitions.key_for(created_at), create_missing=True) as conn:
+            cursor = conn.execute(
+                'INSERT INTO feedback (user_id, rating, comment, sentiment, created_at) VALUES (?, ?, ?, ?, ?)',
+                (user_id, rating, comment, sentiment, created_at)
+            )
+            conn.commit()
+            ids.append(cursor.lastrowid)
+    return ids
+
+def daily_trends(start: str, end: str) -> dict:
+    trends = AdminService.get_feedback_trends('day', start, end)
+    return {bucket['bucket']: bucket['total_feedback'] for bucket in trends['buckets'] if bucket['total_feedback']}
+
+class TestMonthRouting:
+    """Rows land in the partition of their created_at month, which their id encodes."""
+    
+    def test_key_for_created_at(self):
+        assert partitions.key_for('2024-03-31 23:59:59') == '2024-03'
+        assert partitions.key_for('2024-04-01 00:00:00') == '2024-04'
+        with pytest.raises(ValueError):
+            partitions.key_for('zzzz')
+    
+    def test_key_for_id_round_trips_first_id(self):
+        for key in ('1999-12', '2024-01', '2024-12'):
+            assert partitions.key_for_id(partitions.first_id(key) + 1) == key
+            assert partitions.key_for_id(partitions.first_id(key) + partitions.ID_STRIDE - 1) == key
+    
+    def test_rows_are_stored_in_their_month(self, test_db):
+        user_id = add_user()
+        ids = add_feedback(user_id, [
+            (5, 'Great', 'positive', '2024-03-31 23:59:59'),
+            (1, 'Awful', 'negative', '2024-04-01 00:00:00'),
+            (3, 'Fine', 'neutral', '2024-03-01 00:00:00')
+        ])
+        
+        assert [partitions.key_for_id(feedback_id) for feedback_id in ids] == ['2024-03', '2024-04', '2024-03']
+        assert partitions.keys() == ['2024-04', '2024-03']
+        assert ids[2] == ids[0] + 1
+    
+    def test_new_feedback_goes_to_the_current_month(self, test_db):
+        user_id = add_user()
+        result = FeedbackService.create_feedback(user_id, 4, 'Quick delivery')
+        
+        assert result['success']
+        assert partitions.key_for_id(result['feedback_id']) == partitions.key_for(partitions.utc_now())
+
+class TestKeysetPagination:
+    """Cursor pages walk newest first across partition boundaries."""
+    
+    def test_pages_cross_month_boundaries(self, test_db):
+        user_id = add_user()
+        add_feedback(user_id, [
+            (4, f'Comment {i}', 'positive', created_at)
+            for i, created_at in enumerate([
+                '2024-01-15 10:00:00', '2024-02-01 00:00:00', '2024-02-29 23:59:59', '2024-02-29 23:59:59',
+                '2024-03-01 00:00:00', '2024-03-01 00:00:00', '2024-03-01 00:00:00', '2024-05-02 08:00:00'
+            ])
+        ])
+        expected = [(row['created_at'], row['id']) for row in FeedbackService.get_all_feedback()]
+        
+        seen = []
+        cursor = None
+        while True:
+            page = FeedbackService.get_feedback_page(None, 3, cursor)
+            seen.extend((row['created_at'], row['id']) for row in page['feedback'])
+            cursor = page['next_cursor']
+            if cursor is None:
+                break
+        
+        assert len(expected) == 8
+        assert seen == expected
+        assert expected == sorted(expected, reverse=True)
+    
+    def test_filtered_pages_skip_months_without_matches(self, test_db):
+        user_id = add_user()
+        add_feedback(user_id, [
+            (5, 'Great', 'positive', '2024-01-10 00:00:00'),
+            (1, 'Bad', 'negative', '2024-02-10 00:00:00'),
+            (1, 'Bad', 'negative', '2024-03-10 00:00:00'),
+            (5, 'Great', 'positive', '2024-04-10 00:00:00')
+        ])
+        
+        first = FeedbackService.get_feedback_page({'sentiment': 'positive'}, 1, None)
+        second = FeedbackService.get_feedback_page({'sentiment': 'positive'}, 1, first['next_cursor'])
+        
+        assert [row['created_at'] for row in first['feedback'] + second['feedback']] == [
+            '2024-04-10 00:00:00', '2024-01-10 00:00:00'
+        ]
+    
+    def test_tampered_cursor_is_rejected(self):
+        with pytest.raises(ValueError):
+            FeedbackService.decode_cursor(FeedbackService.encode_cursor('zzzz', 5))
+
+class TestRelevanceAcrossPartitions:
+    """Relevance ranks matches within a month; months stay newest first."""
+    
+    def add_matches(self):
+        user_id = add_user()
+        add_feedback(user_id, [
+            # A small month whose only match would win on its own bm25 scale
+            (4, 'Delivery was fine', 'positive', '2024-01-10 00:00:00'),
+            (4, 'Delivery delivery delivery', 'positive', '2024-02-10 00:00:00'),
+            (3, 'The app crashed twice before the delivery slot could be picked', 'neutral', '2024-02-11 00:00:00'),
+            (5, 'Friendly support team', 'positive', '2024-02-12 00:00:00'),
+            (2, 'Slow checkout', 'negative', '2024-02-13 00:00:00')
+        ])
+    
+    def test_months_are_newest_first_and_ranked_within(self, test_db):
+        self.add_matches()
+        
+        rows = FeedbackService.get_all_feedback({'search': 'delivery', 'sort': 'relevance'})
+        
+        assert [row['comment'] for row in rows] == [
+            'Delivery delivery delivery',
+            'The app crashed twice before the delivery slot could be picked',
+            'Delivery was fine'
+        ]
+    
+    def test_limit_stops_at_the_newest_months(self, test_db):
+        self.add_matches()
+        
+        page = FeedbackService.get_feedback_page({'search': 'delivery', 'sort': 'relevance'}, 2)
+        streamed = list(FeedbackService.iter_feedback({'search': 'delivery', 'sort': 'relevance'}, limit=2))
+        
+        assert [row['created_at'][:7] for row in page['feedback']] == ['2024-02', '2024-02']
+        assert page['next_cursor'] is None
+        assert streamed == page['feedback']
+
+class TestRollupsAcrossTiers:
+    """Dashboard stats and trends sum every partition and the cold archive."""
+    
+    ROWS = [
+        (5, 'Great', 'positive', '2020-01-05 09:00:00'),
+        (4, 'Good', 'positive', '2020-01-05 18:00:00'),
+        (1, 'Awful', 'negative', '2020-02-10 12:00:00'),
+        (3, 'Okay', 'neutral', '2020-03-01 00:00:00')
+    ]
+    
+    def test_stats_sum_partitions(self, test_db):
+        user_id = add_user()
+        add_feedback(user_id, self.ROWS)
+        stats = AdminService.get_dashboard_stats()
+        
+        assert stats['total_users'] == 1
+        assert stats['total_feedback'] == 4
+        assert stats['sentiment_distribution'] == {'positive': 2, 'negative': 1, 'neutral': 1}
+        assert stats['average_rating'] == 3.25
+    
+    def test_stats_and_trends_survive_archiving(self, test_db):
+        user_id = add_user()
+        add_feedback(user_id, self.ROWS)
+        recent = add_feedback(user_id, [(2, 'Slow', 'negative', partitions.utc_now())])
+        before = AdminService.get_dashboard_stats()
+        trends_before = daily_trends('2020-01-01T00:00:00Z', '2020-03-31T00:00:00Z')
+        
+        archived = cold_archive.archive_old(older_than_days=365, verbose=False)
+        
+        assert archived == {'2020-01': 2, '2020-02': 1, '2020-03': 1}
+        assert partitions.keys() == [partitions.key_for_id(recent[0])]
+        assert AdminService.get_dashboard_stats() == before
+        assert daily_trends('2020-01-01T00:00:00Z', '2020-03-31T00:00:00Z') == trends_before == {
+            '2020-01-05 00:00:00': 2, '2020-02-10 00:00:00': 1, '2020-03-01 00:00:00': 1
+        }
+    
+    def test_late_rows_in_an_archived_month_are_summed_with_it(self, test_db):
+        user_id = add_user()
+        add_feedback(user_id, self.ROWS)
+        cold_archive.archive_old(older_than_days=365, verbose=False)
+        late = add_feedback(user_id, [(1, 'Late', 'negative', '2020-01-05 23:00:00')])
+        
+        assert late[0] > cold_archive.max_id('2020-01')
+        stats = AdminService.get_dashboard_stats()
+        assert stats['total_feedback'] == 5
+        assert stats['sentiment_distribution'] == {'positive': 2, 'negative': 2, 'neutral': 1}
+        assert daily_trends('2020-01-01T00:00:00Z', '2020-01-31T00:00:00Z') == {'2020-01-05 00:00:00': 3}
+        
+        archived = FeedbackService.get_all_feedback({'archived': True})
+        assert late[0] in [row['id'] for row in archived]
+        assert len(archived) == 5
+        assert len(FeedbackService.get_all_feedback()) == 1
+
+class TestAdoptLegacyFeedback:
+    """Rows in the unpartitioned feedback table move into their months."""
+    
+    @staticmethod
+    def add_legacy(rows: list) -> list:
+        conn = get_db_connection()
+        try:
+            cursor = conn.cursor()
+            ids = []
+            for row in rows:
+                cursor.execute(
+                    'INSERT INTO main.feedback (user_id, rating, comment, sentiment, created_at) VALUES (?, ?, ?, ?, ?)',
+                    row
+                )
+                ids.append(cursor.lastrowid)
+            conn.commit()
+            return ids
+        finally:
+            conn.close()
+    
+    def test_legacy_rows_move_into_partitions(self, test_db):
+        user_id = add_user()
+        legacy = [
+            (user_id, 5, 'Great', 'positive', '2023-11-30 23:00:00'),
+            (user_id, 2, 'Meh', 'negative', '2023-12-01 01:00:00'),
+            (user_id, 4, 'Good', None, '2023-12-15 12:00:00')
+        ]
+        self.add_legacy(legacy)
+        before = AdminService.get_dashboard_stats()
+        
+        assert partitions.adopt_legacy_feedback(batch_size=2, verbose=False) == 3
+        assert partitions.adopt_legacy_feedback(verbose=False) == 0
+        
+        conn = get_db_connection()
+        try:
+            assert conn.execute('SELECT COUNT(*) FROM main.feedback').fetchone()[0] == 0
+        finally:
+            conn.close()
+        assert partitions.keys() == ['2023-12', '2023-11']
+        assert AdminService.get_dashboard_stats() == before
+        
+        rows = FeedbackService.get_all_feedback()
+        assert sorted(
+            (row['user_id'], row['rating'], row['comment'], row['sentiment'], row['created_at']) for row in rows
+        ) == sorted(legacy)
+        assert all(partitions.key_for_id(row['id']) == partitions.key_for(row['created_at']) for row in rows)
+    
+    def test_old_ids_resolve_to_the_adopted_rows(self, test_db):
+        user_id = add_user()
+        old_ids = self.add_legacy([
+            (user_id, 5, 'Great', None, '2023-11-30 23:00:00'),
+            (user_id, 1, 'Awful', None, '2023-12-01 01:00:00'),
+            (user_id, 3, 'Fine', None, '2023-12-02 01:00:00')
+        ])
+        partitions.adopt_legacy_feedback(batch_size=2, verbose=False)
+        by_comment = {row['comment']: row['id'] for row in FeedbackService.get_all_feedback()}
+        
+        current = partitions.resolve_ids(old_ids + [by_comment['Fine'], 999])
+        assert current == {
+            old_ids[0]: by_comment['Great'],
+            old_ids[1]: by_comment['Awful'],
+            old_ids[2]: by_comment['Fine'],
+            by_comment['Fine']: by_comment['Fine']
+        }
+        with pytest.raises(ValueError):
+            partitions.key_for_id(old_ids[0])
+        
+        # Sentiment jobs queued with the old ids before the move still land
+        assert SentimentAnalysisService.update_feedback_sentiment(old_ids[0], 'positive')
+        assert SentimentAnalysisService.update_feedback_sentiments([(old_ids[1], 'negative'), (999, 'neutral')]) == 1
+        assert not SentimentAnalysisService.update_feedback_sentiment(999, 'neutral')
+        assert {row['comment']: row['sentiment'] for row in FeedbackService.get_all_feedback()} == {
+            'Great': 'positive', 'Awful': 'negative', 'Fine': None
+        }
@@ -0,0 +1,80 @@
+import threading
+import pytest
+import app.routes.auth_routes as auth_routes
+import app.services.auth_service as auth_service
+from app import create_app
+from app.services.auth_service import AuthenticationService
+from app.services.password_hasher import PasswordHasher, PasswordHashingOverloaded
+
+@pytest.fixture
+def release():
+    """Event that unblocks the calls holding the hasher's slots."""
+    event = threading.Event()
+    yield event
+    event.set()
+
+@pytest.fixture
+def held():
+    """Futures of the blocked calls."""
+    return []
+
+@pytest.fixture
+def saturated(release, held):
+    """A one-thread hasher with one queue slot, both taken by blocked calls."""
+    hasher = PasswordHasher(workers=1, queue_size=1, rounds=4)
+    held.extend(hasher._submit(release.wait) for _ in range(2))
+    yield hasher
+    release.set()
+    for future in held:
+        future.result(timeout=5)
+
+class TestBoundedQueue:
+    """Calls beyond workers + queue_size fail fast instead of piling up."""
+    
+    def test_saturated_hasher_rejects_immediately(self, saturated):
+        with pytest.raises(PasswordHashingOverloaded):
+            saturated.hash('Password123!')
+        with pytest.raises(PasswordHashingOverloaded):
+            saturated.verify('Password123!', '$2b$04$' + 'a' * 53)
+        
+        stats = saturated.stats()
+        assert stats['pending'] == 2
+        assert stats['rejected'] == 2
+    
+    def test_slots_free_up_when_calls_finish(self, saturated, release, held):
+        release.set()
+        for future in held:
+            future.result(timeout=5)
+        
+        password_hash = saturated.hash('Password123!')
+        assert saturated.verify('Password123!', password_hash)
+        assert saturated.stats()['pending'] == 0
+    
+    def test_background_rehash_is_skipped_when_saturated(self, saturated):
+        assert not saturated.rehash_in_background('Password123!', lambda new_hash: None)
+        assert saturated.stats()['upgraded_hashes'] == 0
+
+class TestOverloadedRoutes:
+    """A saturated hasher answers 503 with Retry-After instead of queueing."""
+    
+    @pytest.fixture
+    def client(self, test_db, saturated, monkeypatch):
+        AuthenticationService.register_user('alice', 'alice@example.com', 'Password123!')
+        monkeypatch.setattr(auth_service, 'password_hasher', saturated)
+        monkeypatch.setattr(auth_routes.rate_limiter, 'enabled', False)
+        return create_app().test_client()
+    
+    def test_login_returns_503(self, client):
+        response = client.post('/api/auth/login', json={'username': 'alice', 'password': 'Password123!'})
+        
+        assert response.status_code == 503
+        assert response.headers['Retry-After'] == '1'
+        assert response.get_json()['success'] is False
+    
+    def test_register_returns_503(self, client):
+        response = client.post('/api/auth/register', json={
+            'username': 'bob', 'email': 'bob@example.com', 'password': 'Password123!'
+        })
+        
+        assert response.status_code == 503
+        assert response.headers['Retry-After'] == '1'
@@ -0,0 +1,164 @@
+import pytest
+import app.database as database
+import app.routes.auth_routes as auth_routes
+from app import create_app
+from app.services.rate_limiter import MemoryBuckets, RateLimiter, SqliteBuckets
+from config import Config
+
+@pytest.fixture
+def limiter(monkeypatch):
+    """A memory limiter allowing bursts of 3 per IP and 2 per username, 60 per minute."""
+    monkeypatch.setattr(Config, 'RATE_LIMIT_ENABLED', True)
+    monkeypatch.setattr(Config, 'RATE_LIMIT_IP_BURST', 3)
+    monkeypatch.setattr(Config, 'RATE_LIMIT_IP_PER_MINUTE', 60)
+    monkeypatch.setattr(Config, 'RATE_LIMIT_USERNAME_BURST', 2)
+    monkeypatch.setattr(Config, 'RATE_LIMIT_USERNAME_PER_MINUTE', 60)
+    return RateLimiter('memory')
+
+def drain(buckets, key: str, capacity: float, rate: float, now: float) -> list:
+    return [buckets.take(key, capacity, rate, now) for _ in range(int(capacity) + 1)]
+
+def client_ip(forwarded_for: str) -> str:
+    with create_app().test_request_context(
+        headers={'X-Forwarded-For': forwarded_for},
+        environ_base={'REMOTE_ADDR': '10.0.0.1'}
+    ):
+        from flask import request
+        return RateLimiter.client_ip(request)
+
+class TestMemoryBuckets:
+    """Buckets refill over time and are capped at max_keys."""
+    
+    def test_empty_bucket_waits_for_one_token(self):
+        buckets = MemoryBuckets(max_keys=10)
+        
+        assert drain(buckets, 'ip:a', 3, 0.5, now=1000.0) == [0.0, 0.0, 0.0, 2.0]
+        assert buckets.take('ip:a', 3, 0.5, now=1001.0) == pytest.approx(1.0)
+    
+    def test_bucket_refills_over_time(self):
+        buckets = MemoryBuckets(max_keys=10)
+        drain(buckets, 'ip:a', 3, 0.5, now=1000.0)
+        
+        assert buckets.take('ip:a', 3, 0.5, now=1002.0) == 0.0
+        assert buckets.take('ip:a', 3, 0.5, now=1002.0) > 0
+        # Never refills beyond the burst
+        assert drain(buckets, 'ip:a', 3, 0.5, now=2000.0) == [0.0, 0.0, 0.0, 2.0]
+    
+    def test_least_recently_used_bucket_is_dropped_at_max_keys(self):
+        buckets = MemoryBuckets(max_keys=2)
+        drain(buckets, 'ip:a', 1, 0.5, now=1000.0)
+        drain(buckets, 'ip:b', 1, 0.5, now=1000.0)
+        buckets.take('ip:a', 1, 0.5, now=1000.0)
+        buckets.take('ip:c', 1, 0.5, now=1000.0)
+        
+        assert buckets.size() == 2
+        # a is still empty; b was dropped and starts full again
+        assert buckets.take('ip:a', 1, 0.5, now=1000.0) > 0
+        assert buckets.take('ip:b', 1, 0.5, now=1000.0) == 0.0
+    
+    def test_evict_drops_full_buckets(self):
+        buckets = MemoryBuckets(max_keys=10)
+        buckets.take('ip:a', 3, 0.5, now=1000.0)
+        drain(buckets, 'username:b', 2, 0.1, now=1000.0)
+        
+        assert buckets.evict({'ip': 3, 'username': 2}, {'ip': 0.5, 'username': 0.1}, now=1002.0) == 1
+        assert buckets.size() == 1
+
+class TestSqliteBuckets:
+    """The SQLite backend behaves like the memory one and is shared through the file."""
+    
+    def test_empty_bucket_waits_and_refills(self, test_db):
+        buckets = SqliteBuckets()
+        
+        assert drain(buckets, 'ip:a', 3, 0.5, now=1000.0) == [0.0, 0.0, 0.0, 2.0]
+        assert buckets.take('ip:a', 3, 0.5, now=1002.0) == 0.0
+        assert buckets.take('ip:a', 3, 0.5, now=1002.0) > 0
+    
+    def test_bucket_is_shared_between_instances(self, test_db):
+        drain(SqliteBuckets(), 'ip:a', 3, 0.5, now=1000.0)
+        
+        # Another worker process opens the same file
+        assert SqliteBuckets().take('ip:a', 3, 0.5, now=1000.0) == 2.0
+    
+    def test_evict_drops_full_buckets(self, test_db):
+        buckets = SqliteBuckets()
+        buckets.take('ip:a', 3, 0.5, now=1000.0)
+        drain(buckets, 'username:b', 2, 0.1, now=1000.0)
+        
+        assert buckets.evict({'ip': 3, 'username': 2}, {'ip': 0.5, 'username': 0.1}, now=1002.0) == 1
+        assert buckets.size() == 1
+
+class TestRateLimiter:
+    """Attempts are limited per IP and per username, and allowed if the limiter breaks."""
+    
+    def test_ip_bucket_rejects_after_the_burst(self, limiter):
+        assert [limiter.check('203.0.113.9', now=1000.0) for _ in range(4)] == [0.0, 0.0, 0.0, 1.0]
+        assert limiter.check('203.0.113.9', now=1001.0) == 0.0
+        assert limiter.check('198.51.100.7', now=1001.0) == 0.0
+        assert limiter.stats()['rejected_ip'] == 1
+    
+    def test_username_bucket_applies_across_ips(self, limiter):
+        assert limiter.check('203.0.113.1', 'Alice', now=1000.0) == 0.0
+        assert limiter.check('203.0.113.2', ' alice ', now=1000.0) == 0.0
+        assert limiter.check('203.0.113.3', 'ALICE', now=1000.0) == 1.0
+        assert limiter.stats()['rejected_username'] == 1
+    
+    def test_disabled_limiter_allows_everything(self, limiter):
+        limiter.enabled = False
+        
+        assert [limiter.check('203.0.113.9', now=1000.0) for _ in range(10)] == [0.0] * 10
+    
+    def test_sqlite_error_fails_open(self, test_db, monkeypatch):
+        limiter = RateLimiter('sqlite')
+        monkeypatch.setattr(Config, 'RATE_LIMIT_ENABLED', True)
+        limiter.enabled = True
+        monkeypatch.setattr(database, 'DATABASE_PATH', '/nonexistent/feedback.db')
+        
+        assert limiter.check('203.0.113.9', 'alice', now=1000.0) == 0.0
+        assert limiter.stats()['errors'] == 1
+        assert limiter.stats()['buckets'] is None
+    
+    def test_retry_after_rounds_up_to_whole_seconds(self):
+        assert RateLimiter.retry_after(0.2) == '1'
+        assert RateLimiter.retry_after(2.01) == '3'
+
+class TestClientIp:
+    """Only the hops added by trusted proxies are read from X-Forwarded-For."""
+    
+    def test_header_is_ignored_without_trusted_proxies(self, monkeypatch):
+        monkeypatch.setattr(Config, 'RATE_LIMIT_TRUSTED_PROXIES', 0)
+        
+        assert client_ip('203.0.113.9') == '10.0.0.1'
+    
+    def test_spoofed_hops_before_the_trusted_proxy_are_ignored(self, monkeypatch):
+        monkeypatch.setattr(Config, 'RATE_LIMIT_TRUSTED_PROXIES', 1)
+        
+        assert client_ip('198.51.100.66, 192.0.2.1, 203.0.113.9') == '203.0.113.9'
+    
+    def test_address_appended_by_the_outer_proxy_of_two(self, monkeypatch):
+        monkeypatch.setattr(Config, 'RATE_LIMIT_TRUSTED_PROXIES', 2)
+        
+        assert client_ip('198.51.100.66, 203.0.113.9, 10.0.0.2') == '203.0.113.9'
+    
+    def test_short_header_falls_back_to_the_peer(self, monkeypatch):
+        monkeypatch.setattr(Config, 'RATE_LIMIT_TRUSTED_PROXIES', 2)
+        
+        assert client_ip('203.0.113.9') == '10.0.0.1'
+
+class TestAuthRoutes:
+    """An empty bucket answers 429 with Retry-After before any password hashing."""
+    
+    def test_login_is_rejected_with_retry_after(self, test_db, limiter, monkeypatch):
+        monkeypatch.setattr(auth_routes, 'rate_limiter', limiter)
+        client = create_app().test_client()
+        
+        statuses = [
+            client.post('/api/auth/login', json={'username': 'alice', 'password': 'wrong'}).status_code
+            for _ in range(2)
+        ]
+        response = client.post('/api/auth/login', json={'username': 'alice', 'password': 'wrong'})
+        
+        assert statuses == [401, 401]
+        assert response.status_code == 429
+        assert response.headers['Retry-After'] == '1'
+        assert not response.get_json()['success']
@@ -0,0 +1,189 @@
+import os
+import pytest
+import app.database as database
+from app import replica as replica_module
+from app.data_version import data_version
+from app.database import get_db_connection
+from app.replica import SnapshotReplica
+from app.services.feedback_service import FeedbackService
+from config import Config
+
+def add_user(username: str) -> int:
+    conn = get_db_connection()
+    try:
+        cursor = conn.cursor()
+        cursor.execute(
+            'INSERT INTO users (username, email, password_hash) VALUES (?, ?, ?)',
+            (username, f'{username}@example.com', 'not-a-real-hash')
+        )
+        conn.commit()
+        data_version.bump()
+        return cursor.lastrowid
+    finally:
+        conn.close()
+
+def generations() -> list:
+    return sorted(name for name in os.listdir(replica_module.directory()) if name.startswith('gen-'))
+
+def main_inode(manifest: dict) -> int:
+    return os.stat(SnapshotReplica._main_path(manifest)).st_ino
+
+@pytest.fixture
+def replica(test_db, monkeypatch):
+    """A replica refreshed by the test itself, with superseded generations deleted at once."""
+    monkeypatch.setattr(Config, 'REPLICA_ENABLED', True)
+    snapshot = SnapshotReplica(interval=3600, max_staleness=30, retain=0)
+    monkeypatch.setattr(snapshot, 'start', lambda: None)
+    yield snapshot
+    snapshot.stop()
+
+class TestRefresh:
+    """Refreshes build a new generation only when the data has changed."""
+    
+    def test_reads_use_the_primary_until_the_first_build(self, replica):
+        FeedbackService.create_feedback(add_user('alice'), 5, 'Great')
+        
+        with replica.reading() as manifest:
+            assert manifest is None
+            assert database.database_path() == database.DATABASE_PATH
+        
+        assert replica.refresh()
+        with replica.reading() as manifest:
+            assert manifest['version'] == data_version.current()
+            assert database.database_path() == SnapshotReplica._main_path(manifest)
+            assert [row['comment'] for row in FeedbackService.get_all_feedback()] == ['Great']
+    
+    def test_unchanged_data_is_only_confirmed(self, replica):
+        replica.refresh()
+        first = replica.manifest()
+        
+        assert not replica.refresh()
+        assert replica.manifest()['generation'] == first['generation']
+        assert replica.manifest()['as_of'] >= first['as_of']
+    
+    def test_new_data_swaps_the_generation(self, replica):
+        user_id = add_user('alice')
+        FeedbackService.create_feedback(user_id, 5, 'Great')
+        replica.refresh()
+        first = replica.manifest()
+        FeedbackService.create_feedback(user_id, 1, 'Awful')
+        
+        # Within the staleness bound the old generation still answers
+        with replica.reading() as manifest:
+            assert manifest['generation'] == first['generation']
+            assert len(FeedbackService.get_all_feedback()) == 1
+        
+        assert replica.refresh()
+        with replica.reading() as manifest:
+            assert manifest['generation'] != first['generation']
+            assert manifest['version'] == data_version.current()
+            assert sorted(row['comment'] for row in FeedbackService.get_all_feedback()) == ['Awful', 'Great']
+    
+    def test_main_file_is_copied_only_when_users_change(self, replica):
+        user_id = add_user('alice')
+        FeedbackService.create_feedback(user_id, 5, 'Great')
+        replica.refresh()
+        first = main_inode(replica.manifest())
+        
+        # Feedback and sessions: only the month's partition is copied
+        FeedbackService.create_feedback(user_id, 4, 'Good')
+        conn = get_db_connection()
+        try:
+            conn.execute(
+                "INSERT INTO sessions (user_id, token_hash, expires_at) VALUES (?, x'00', '2999-01-01')",
+                (user_id,)
+            )
+            conn.commit()
+        finally:
+            conn.close()
+        assert replica.refresh()
+        second = main_inode(replica.manifest())
+        assert second == first
+        assert replica.status()['last_build_copied'] == 1
+        
+        add_user('bob')
+        assert replica.refresh()
+        assert main_inode(replica.manifest()) != second
+        assert replica.status()['last_build_copied'] == 1
+        with replica.reading():
+            conn = get_db_connection()
+            try:
+                assert conn.execute('SELECT COUNT(*) FROM users').fetchone()[0] == 2
+            finally:
+                conn.close()
+
+class TestStalenessFallback:
+    """Reads go to the primary once the snapshot lags more than the bound."""
+    
+    def test_current_snapshot_has_no_lag(self, replica):
+        replica.refresh()
+        assert replica.lag() == 0.0
+    
+    def test_lagging_snapshot_falls_back_to_the_primary(self, replica):
+        user_id = add_user('alice')
+        FeedbackService.create_feedback(user_id, 5, 'Great')
+        replica.refresh()
+        FeedbackService.create_feedback(user_id, 1, 'Awful')
+        replica.max_staleness = 0
+        
+        assert replica.lag() > 0
+        with replica.reading() as manifest:
+            assert manifest is None
+            assert database.database_path() == database.DATABASE_PATH
+            assert len(FeedbackService.get_all_feedback()) == 2
+        
+        status = replica.status()
+        assert not status['serving']
+        assert status['primary_reads'] == 1
+        assert status['replica_reads'] == 0
+    
+    def test_disabled_replica_reads_the_primary(self, replica, monkeypatch):
+        replica.refresh()
+        monkeypatch.setattr(Config, 'REPLICA_ENABLED', False)
+        
+        with replica.reading() as manifest:
+            assert manifest is None
+
+class TestRetiredGenerations:
+    """Superseded generations are deleted once no read uses them."""
+    
+    def test_superseded_generation_is_deleted(self, replica):
+        user_id = add_user('alice')
+        replica.refresh()
+        FeedbackService.create_feedback(user_id, 5, 'Great')
+        replica.refresh()
+        
+        assert generations() == [replica.manifest()['generation']]
+    
+    def test_pinned_generation_is_kept_until_its_read_ends(self, replica):
+        user_id = add_user('alice')
+        replica.refresh()
+        first = replica.manifest()['generation']
+        
+        FeedbackService.create_feedback(user_id, 5, 'Great')
+        with replica.reading():
+            replica.refresh()
+            assert first in generations()
+            assert len(FeedbackService.get_all_feedback()) == 0
+        
+        replica.refresh()
+        assert generations() == [replica.manifest()['generation']]
+        with replica.reading():
+            assert len(FeedbackService.get_all_feedback()) == 1
+    
+    def test_generation_is_kept_for_the_retention_period(self, replica):
+        user_id = add_user('alice')
+        replica.retain = 3600
+        replica.refresh()
+        first = replica.manifest()['generation']
+        FeedbackService.create_feedback(user_id, 5, 'Great')
+        replica.refresh()
+        
+        assert generations() == sorted([first, replica.manifest()['generation']])
+    
+    def test_abandoned_staging_directory_is_deleted(self, replica):
+        replica.refresh()
+        os.makedirs(os.path.join(replica_module.directory(), 'gen-1.tmp'))
+        replica.refresh()
+        
+        assert generations() == [replica.manifest()['generation']]
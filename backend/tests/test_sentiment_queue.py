@@ -0,0 +1,126 @@
+import pytest
+from app import partitions
+from app.database import get_db_connection
+from app.services.feedback_service import FeedbackService
+from app.services.sentiment_queue import SentimentQueue
+from app.services.sentiment_service import SentimentAnalysisService
+
+def add_user() -> int:
+    conn = get_db_connection()
+    try:
+        cursor = conn.cursor()
+        cursor.execute(
+            'INSERT INTO users (username, email, password_hash) VALUES (?, ?, ?)',
+            ('alice', 'alice@example.com', 'not-a-real-hash')
+        )
+        conn.commit()
+        return cursor.lastrowid
+    finally:
+        conn.close()
+
+def add_unscored(user_id: int, comments: list, created_at: str = '2024-03-01 12:00:00') -> list:
+    ids = []
+    with partitions.writing(partitions.key_for(created_at), create_missing=True) as conn:
+        for comment in comments:
+            cursor = conn.execute(
+                'INSERT INTO feedback (user_id, rating, comment, created_at) VALUES (?, ?, ?, ?)',
+                (user_id, 4, comment, created_at)
+            )
+            ids.append(cursor.lastrowid)
+        conn.commit()
+    return ids
+
+def sentiments() -> dict:
+    return {row['comment']: row['sentiment'] for row in FeedbackService.get_all_feedback()}
+
+@pytest.fixture
+def classified(monkeypatch):
+    """Record every comment the workers classify."""
+    texts = []
+    analyze_batch = SentimentAnalysisService.analyze_batch
+    
+    def recording(batch):
+        texts.extend(batch)
+        return analyze_batch(batch)
+    
+    monkeypatch.setattr(SentimentAnalysisService, 'analyze_batch', staticmethod(recording))
+    return texts
+
+@pytest.fixture
+def queues():
+    """Queues to stop (and release the requeue lock of) after the test."""
+    started = []
+
+    def new_queue() -> SentimentQueue:
+        started.append(SentimentQueue(workers=2, batch_wait=0))
+        return started[-1]
+
+    yield new_queue
+    for sentiment_queue in started:
+        sentiment_queue.stop()
+
+class TestSubmittedFeedback:
+    """A submitted comment is classified once, by the queue it was enqueued on."""
+    
+    def test_submitted_row_is_classified_exactly_once(self, test_db, classified, queues):
+        user_id = add_user()
+        sentiment_queue = queues()
+        sentiment_queue.start(requeue=True)
+        
+        result = FeedbackService.create_feedback(user_id, 5, 'Great service, really good')
+        assert sentiment_queue.enqueue(result['feedback_id'], 'Great service, really good')
+        sentiment_queue._requeuer.join()
+        sentiment_queue.join()
+        
+        assert classified == ['Great service, really good']
+        assert sentiments() == {'Great service, really good': 'positive'}
+        assert sentiment_queue.status()['requeued'] == 0
+    
+    def test_enqueue_does_not_requeue(self, test_db, classified, queues):
+        user_id = add_user()
+        add_unscored(user_id, ['Left over from the last run'])
+        sentiment_queue = queues()
+        
+        result = FeedbackService.create_feedback(user_id, 1, 'Terrible and awful')
+        sentiment_queue.enqueue(result['feedback_id'], 'Terrible and awful')
+        sentiment_queue.join()
+        
+        assert classified == ['Terrible and awful']
+        assert sentiments()['Left over from the last run'] is None
+
+class TestRequeue:
+    """Unscored rows are requeued at startup by one process only."""
+    
+    def test_unscored_rows_are_requeued_at_startup(self, test_db, classified, queues):
+        add_unscored(add_user(), ['Good', 'Bad'])
+        sentiment_queue = queues()
+        sentiment_queue.start(requeue=True)
+        sentiment_queue._requeuer.join()
+        sentiment_queue.join()
+        
+        assert sorted(classified) == ['Bad', 'Good']
+        assert sentiments() == {'Good': 'positive', 'Bad': 'negative'}
+        assert sentiment_queue.status()['requeued'] == 2
+    
+    def test_only_the_first_process_requeues(self, test_db, classified, queues):
+        add_unscored(add_user(), ['Good', 'Bad'])
+        first, second = queues(), queues()
+        
+        assert first.requeue() == 2
+        # flock is per open file, so a second queue stands in for another worker
+        assert second.requeue() is None
+        first.join()
+        second.join()
+        assert sorted(classified) == ['Bad', 'Good']
+        
+        # Once the holder stops, a restarted worker takes over
+        first.stop()
+        add_unscored(1, ['Okay'])
+        assert second.requeue() == 1
+    
+    def test_rows_created_after_startup_are_left_to_their_request(self, test_db, queues):
+        user_id = add_user()
+        add_unscored(user_id, ['Old'], created_at='2024-03-01 12:00:00')
+        add_unscored(user_id, ['New'], created_at='2024-03-01 12:00:01')
+        
+        assert queues().enqueue_unscored(created_before='2024-03-01 12:00:01') == 1
@@ -0,0 +1,111 @@
+import pytest
+from app.cache import TTLCache
+from app.database import get_db_connection
+from app.services.auth_service import AuthenticationService
+
+class Clock:
+    """Manually advanced stand-in for time.monotonic."""
+    
+    def __init__(self):
+        self.now = 1000.0
+    
+    def __call__(self) -> float:
+        return self.now
+
+@pytest.fixture
+def clock():
+    return Clock()
+
+@pytest.fixture
+def session_cache(monkeypatch, clock):
+    """A fresh session cache with a 60 second TTL on the fake clock."""
+    cache = TTLCache(10, 60, clock=clock)
+    monkeypatch.setattr(AuthenticationService, '_session_cache', cache)
+    return cache
+
+def login(username: str = 'alice') -> str:
+    AuthenticationService.register_user(username, f'{username}@example.com', 'Password123!')
+    return AuthenticationService.login_user(username, 'Password123!')['session_token']
+
+def delete_sessions():
+    conn = get_db_connection()
+    try:
+        conn.execute('DELETE FROM sessions')
+        conn.commit()
+    finally:
+        conn.close()
+
+class TestTTLCache:
+    """Entries expire after their TTL and the least recently used go first."""
+    
+    def test_entry_expires_after_ttl(self, clock):
+        cache = TTLCache(10, 60, clock=clock)
+        cache.set('a', 1)
+        
+        clock.now += 59
+        assert cache.get('a') == 1
+        clock.now += 1
+        assert cache.get('a') is None
+        assert cache.stats()['expirations'] == 1
+    
+    def test_entry_ttl_is_capped_at_the_default(self, clock):
+        cache = TTLCache(10, 60, clock=clock)
+        cache.set('short', 1, ttl=5)
+        cache.set('long', 2, ttl=3600)
+        
+        clock.now += 5
+        assert cache.get('short') is None
+        clock.now += 55
+        assert cache.get('long') is None
+    
+    def test_least_recently_used_entry_is_evicted(self, clock):
+        cache = TTLCache(2, 60, clock=clock)
+        cache.set('a', 1)
+        cache.set('b', 2)
+        cache.get('a')
+        cache.set('c', 3)
+        
+        assert cache.get('b') is None
+        assert cache.get('a') == 1
+        assert cache.stats()['evictions'] == 1
+    
+    def test_expired_entries_are_purged_before_evicting(self, clock):
+        cache = TTLCache(2, 60, clock=clock)
+        cache.set('a', 1, ttl=5)
+        cache.set('b', 2)
+        clock.now += 5
+        cache.set('c', 3)
+        
+        assert cache.get('b') == 2
+        assert cache.stats()['evictions'] == 0
+
+class TestSessionCache:
+    """Validated sessions are served from the cache until they expire or log out."""
+    
+    def test_validated_session_is_served_from_the_cache(self, test_db, session_cache):
+        token = login()
+        assert AuthenticationService.validate_session(token)['valid']
+        
+        # The row is gone, but the cached entry still answers within the TTL
+        delete_sessions()
+        assert AuthenticationService.validate_session(token)['valid']
+        assert session_cache.stats()['hits'] == 1
+    
+    def test_cached_session_expires_after_ttl(self, test_db, session_cache, clock):
+        token = login()
+        AuthenticationService.validate_session(token)
+        delete_sessions()
+        
+        clock.now += 60
+        assert AuthenticationService.cached_session(token) is None
+        assert not AuthenticationService.validate_session(token)['valid']
+    
+    def test_logout_invalidates_the_cached_session(self, test_db, session_cache):
+        token = login()
+        AuthenticationService.validate_session(token)
+        
+        assert AuthenticationService.logout(token)['success']
+        assert AuthenticationService.cached_session(token) is None
+        assert not AuthenticationService.validate_session(token)['valid']
+        assert session_cache.stats()['size'] == 0
+
@@ -0,0 +1,140 @@
+import hashlib
+import sqlite3
+from datetime import datetime, timedelta
+import pytest
+from app.cache import TTLCache
+from app import migrations
+from app.database import get_db_connection
+from app.services.auth_service import AuthenticationService
+from app.services.password_hasher import password_hasher
+from app.services.session_reaper import SessionReaper
+from config import Config
+
+@pytest.fixture
+def auth(test_db, monkeypatch):
+    """Cheap bcrypt and an empty session cache."""
+    monkeypatch.setattr(password_hasher, 'rounds', 4)
+    monkeypatch.setattr(AuthenticationService, '_session_cache', TTLCache(100, 60))
+    AuthenticationService.register_user('alice', 'alice@example.com', 'Password123!')
+
+def login() -> str:
+    return AuthenticationService.login_user('alice', 'Password123!')['session_token']
+
+def add_sessions(expires_at: list, user_id: int = 1):
+    conn = get_db_connection()
+    try:
+        conn.executemany(
+            'INSERT INTO sessions (user_id, token_hash, expires_at) VALUES (?, ?, ?)',
+            [(user_id, hashlib.sha256(str(i).encode()).digest(), when) for i, when in enumerate(expires_at)]
+        )
+        conn.commit()
+    finally:
+        conn.close()
+
+def session_rows() -> list:
+    conn = get_db_connection()
+    try:
+        return conn.execute('SELECT user_id, token_hash, expires_at FROM sessions ORDER BY id').fetchall()
+    finally:
+        conn.close()
+
+class TestSessionReaper:
+    """Expired sessions are deleted in batches; live ones are kept."""
+    
+    def test_expired_sessions_are_deleted_in_batches(self, test_db):
+        now = datetime.now()
+        add_sessions([now - timedelta(hours=1)] * 5 + [now + timedelta(hours=1)] * 2)
+        reaper = SessionReaper(interval=3600, batch_size=2, batch_pause=0)
+        
+        assert reaper.reap_once() == 5
+        status = reaper.status()
+        assert status['last_sweep_batches'] == 3
+        assert status['sessions'] == 2
+        assert status['expired_pending'] == 0
+        assert all(datetime.fromisoformat(row['expires_at']) > now for row in session_rows())
+    
+    def test_sweep_with_nothing_expired_deletes_nothing(self, test_db):
+        add_sessions([datetime.now() + timedelta(hours=1)])
+        
+        assert SessionReaper(batch_pause=0).reap_once() == 0
+        assert len(session_rows()) == 1
+
+class TestSessionCap:
+    """Each account keeps only its newest SESSION_MAX_PER_USER sessions."""
+    
+    def test_oldest_sessions_are_evicted(self, auth, monkeypatch):
+        monkeypatch.setattr(Config, 'SESSION_MAX_PER_USER', 2)
+        tokens = [login() for _ in range(3)]
+        
+        assert [AuthenticationService.validate_session(token)['valid'] for token in tokens] == [False, True, True]
+        assert len(session_rows()) == 2
+    
+    def test_evicted_session_is_dropped_from_the_cache(self, auth, monkeypatch):
+        monkeypatch.setattr(Config, 'SESSION_MAX_PER_USER', 1)
+        first = login()
+        assert AuthenticationService.validate_session(first)['valid']
+        
+        second = login()
+        assert AuthenticationService.cached_session(first) is None
+        assert not AuthenticationService.validate_session(first)['valid']
+        assert AuthenticationService.validate_session(second)['valid']
+    
+    def test_cap_is_per_account(self, auth, monkeypatch):
+        monkeypatch.setattr(Config, 'SESSION_MAX_PER_USER', 1)
+        AuthenticationService.register_user('bob', 'bob@example.com', 'Password123!')
+        alice = login()
+        bob = AuthenticationService.login_user('bob', 'Password123!')['session_token']
+        
+        assert AuthenticationService.validate_session(alice)['valid']
+        assert AuthenticationService.validate_session(bob)['valid']
+
+class TestTokenStorage:
+    """Only the SHA-256 digest of a session token is stored."""
+    
+    def test_token_is_stored_as_its_digest(self, auth):
+        token = login()
+        
+        [row] = session_rows()
+        assert bytes(row['token_hash']) == hashlib.sha256(token.encode('utf-8')).digest()
+        assert token.encode('utf-8') not in bytes(row['token_hash'])
+    
+    def test_stored_digest_is_not_a_token(self, auth):
+        login()
+        [row] = session_rows()
+        
+        assert not AuthenticationService.validate_session(bytes(row['token_hash']).hex())['valid']
+    
+    def test_old_plaintext_token_no_longer_validates(self, auth):
+        # A row written before tokens were hashed, holding the token itself
+        token = AuthenticationService.generate_session_token()
+        add_sessions([datetime.now() + timedelta(hours=1)])
+        conn = get_db_connection()
+        try:
+            conn.execute('UPDATE sessions SET token_hash = ?', (token.encode('utf-8'),))
+            conn.commit()
+        finally:
+            conn.close()
+        
+        assert not AuthenticationService.validate_session(token)['valid']
+        assert not AuthenticationService.logout(token)['success']
+    
+    def test_migration_hashes_existing_tokens_in_place(self):
+        conn = sqlite3.connect(':memory:')
+        conn.execute('''
+            CREATE TABLE sessions (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                user_id INTEGER,
+                session_token TEXT UNIQUE NOT NULL,
+                is_admin BOOLEAN DEFAULT 0,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                expires_at TIMESTAMP NOT NULL
+            )
+        ''')
+        conn.execute("INSERT INTO sessions (user_id, session_token, expires_at) VALUES (1, 'old-token', '2999-01-01')")
+        
+        migrations._compact_session_tokens(conn.cursor())
+        
+        assert conn.execute('SELECT token_hash FROM sessions').fetchall() == [
+            (AuthenticationService.hash_session_token('old-token'),)
+        ]
+        assert 'session_token' not in [column[1] for column in conn.execute('PRAGMA table_info(sessions)')]
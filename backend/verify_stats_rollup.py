@@ -0,0 +1,44 @@
+import sys
+from app.database import init_db
+from app.services.admin_service import AdminService
+
+def verify_stats_rollup(repair=False):
+    """Compare the dashboard_stats rollup with a full recount, optionally repairing it."""
+    init_db()
+    result = AdminService.verify_stats_rollup(repair=repair)
+    
+    if result['consistent']:
+        print("✓ Dashboard rollup matches the feedback and users tables")
+        return True
+    
+    print("✗ Dashboard rollup has drifted:")
+    for name, values in result['drift'].items():
+        print(f"  {name}: rollup={values['rollup']} actual={values['actual']}")
+    if result['repaired']:
+        print("✓ Rollup rebuilt from scratch")
+    else:
+        print("Run with --repair to rebuild it")
+    return False
+
+def verify_trend_rollup(repair=False):
+    """Compare the hourly/daily feedback_trends buckets with a full recount, optionally repairing them."""
+    result = AdminService.verify_trend_rollup(repair=repair)
+    
+    if result['consistent']:
+        print("✓ Trend rollup matches the feedback table")
+        return True
+    
+    print(f"✗ Trend rollup has drifted in {result['drifted_buckets']} buckets:")
+    for drift in result['drift']:
+        print(f"  {drift['granularity']} {drift['bucket']}: rollup={drift['rollup']} actual={drift['actual']}")
+    if result['repaired']:
+        print("✓ Trend rollup rebuilt from scratch")
+    else:
+        print("Run with --repair to rebuild it")
+    return False
+
+if __name__ == '__main__':
+    repair = '--repair' in sys.argv[1:]
+    consistent = verify_stats_rollup(repair=repair)
+    consistent = verify_trend_rollup(repair=repair) and consistent
+    sys.exit(0 if consistent else 1)
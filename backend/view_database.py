@@ -1,5 +1,7 @@
 import sqlite3
 from app.database import get_db_connection
+from app.services.admin_service import AdminService
+from app.services.feedback_service import FeedbackService
 
 def view_all_data():
     """View all data from the database."""
@@ -20,13 +22,8 @@ def view_all_data():
     print("\n" + "="*80)
     print("FEEDBACK TABLE")
     print("="*80)
-    cursor.execute('''
-        SELECT f.id, u.username, f.rating, f.comment, f.sentiment, f.created_at 
-        FROM feedback f 
-        JOIN users u ON f.user_id = u.id
-        ORDER BY f.created_at DESC
-    ''')
-    feedback = cursor.fetchall()
+    # Feedback is spread over the monthly partition files
+    feedback = list(FeedbackService.iter_feedback())
     if feedback:
         for fb in feedback:
             print(f"\nID: {fb['id']}")
@@ -53,31 +50,15 @@ def view_all_data():
     print("\n" + "="*80)
     print("STATISTICS")
     print("="*80)
-    cursor.execute('SELECT COUNT(*) as count FROM users')
-    user_count = cursor.fetchone()['count']
-    print(f"Total Users: {user_count}")
+    stats = AdminService.get_dashboard_stats()
+    print(f"Total Users: {stats['total_users']}")
+    print(f"Total Feedback: {stats['total_feedback']}")
+    print(f"Average Rating: {stats['average_rating']:.2f}")
     
-    cursor.execute('SELECT COUNT(*) as count FROM feedback')
-    feedback_count = cursor.fetchone()['count']
-    print(f"Total Feedback: {feedback_count}")
-    
-    cursor.execute('SELECT AVG(rating) as avg_rating FROM feedback')
-    avg_rating = cursor.fetchone()['avg_rating']
-    if avg_rating:
-        print(f"Average Rating: {avg_rating:.2f}")
-    else:
-        print("Average Rating: 0.00")
-    
-    cursor.execute('''
-        SELECT sentiment, COUNT(*) as count 
-        FROM feedback 
-        WHERE sentiment IS NOT NULL 
-        GROUP BY sentiment
-    ''')
-    sentiments = cursor.fetchall()
     print("\nSentiment Distribution:")
-    for sent in sentiments:
-        print(f"  {sent['sentiment'].capitalize()}: {sent['count']}")
+    for sentiment, count in stats['sentiment_distribution'].items():
+        if count:
+            print(f"  {sentiment.capitalize()}: {count}")
     
     conn.close()
 